@@ -0,0 +1,56 @@
+"""JSONコーデックのベンチマーク
+
+サーバー一覧の1ページ(100件)を読み込み、モデルに変換するまでの時間をコーデックごとに計測します。
+
+    $ python benchmarks/bench_codec.py
+
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from vpsc.codec import CODECS  # noqa: E402
+from vpsc.models.generated import Server  # noqa: E402
+
+RESPONSES = os.path.join(os.path.dirname(__file__), "..", "tests", "responses")
+
+
+def build_page(size: int = 100) -> bytes:
+    with open(os.path.join(RESPONSES, "server_200.json"), encoding="utf-8") as f:
+        server = json.load(f)
+    results = []
+    for i in range(size):
+        item = json.loads(json.dumps(server))
+        item.update(id=i, name=f"server-{i:04d}", description=f"説明 {i}")
+        item["ipv4"].update(address=f"198.51.{i // 256}.{i % 256}", hostname=f"os3-{i}.vs.sakura.ne.jp")
+        results.append(item)
+    page = {"count": size, "next": None, "previous": None, "results": results}
+    return json.dumps(page, ensure_ascii=False).encode("utf-8")
+
+
+def main(number: int = 200):
+    page = build_page()
+    print(f"page size: {len(page)} bytes, {number} iterations")
+    timings = {}
+    for name, codec_class in CODECS.items():
+        try:
+            codec = codec_class()
+        except ImportError:
+            print(f"{name:8} not installed")
+            continue
+        decode = timeit.timeit(lambda: codec.loads(page), number=number) / number
+        full = timeit.timeit(lambda: [Server(**item) for item in codec.loads(page)["results"]], number=number) / number
+        timings[name] = decode, full
+    base_decode, base_full = timings["json"]
+    for name, (decode, full) in timings.items():
+        print(
+            f"{name:8} decode {decode * 1e6:8.1f} us (x{base_decode / decode:.2f})"
+            f"  decode+validate {full * 1e6:8.1f} us (x{base_full / full:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
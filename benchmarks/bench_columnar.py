@@ -0,0 +1,62 @@
+"""列指向スナップショットのベンチマーク
+
+サーバー一覧(10000件)からゾーン・プランごとのCPUコア数とメモリの合計を求める時間を、
+モデルを作って集計する場合とスナップショットで集計する場合で比較します。
+
+    $ python benchmarks/bench_columnar.py
+
+"""
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_codec import build_page  # noqa: E402
+from vpsc.codec import get_codec  # noqa: E402
+from vpsc.columnar import SERVER_COLUMNS, Snapshot, _numpy  # noqa: E402
+from vpsc.models.generated import Server  # noqa: E402
+
+ZONES = ["tk1", "tk2", "is1", "os3"]
+PLANS = ["1G", "2G", "4G", "8G", "16G"]
+
+
+def build_items(size: int) -> list:
+    items = get_codec().loads(build_page(size))["results"]
+    for i, item in enumerate(items):
+        item["zone"] = dict(item["zone"], code=ZONES[i % len(ZONES)])
+        item["contract"] = dict(item["contract"], plan_name=PLANS[i % len(PLANS)])
+        item["cpu_cores"] = 1 + i % 8
+    return items
+
+
+def with_models(items: list) -> dict:
+    totals = defaultdict(lambda: [0, 0])
+    for server in (Server(**item) for item in items):
+        total = totals[(server.zone.code, server.contract.plan_name)]
+        total[0] += server.cpu_cores
+        total[1] += server.memory_mebibytes
+    return totals
+
+
+def with_snapshot(items: list) -> dict:
+    snapshot = Snapshot.from_items(items, SERVER_COLUMNS)
+    return snapshot.group_by("zone", "plan", cpu_cores="sum", memory_mebibytes="sum")
+
+
+def main(size: int = 10000):
+    items = build_items(size)
+    print(f"{size} items, numpy: {'yes' if _numpy() is not None else 'no'}")
+    for name, run in [("models", with_models), ("snapshot", with_snapshot)]:
+        start = time.perf_counter()
+        run(items)
+        print(f"{name:10} {(time.perf_counter() - start) * 1e3:8.2f} ms")
+    snapshot = Snapshot.from_items(items, SERVER_COLUMNS)
+    start = time.perf_counter()
+    snapshot.group_by("zone", "plan", cpu_cores="sum", memory_mebibytes="sum")
+    print(f"{'group_by':10} {(time.perf_counter() - start) * 1e3:8.2f} ms (snapshot already built)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""コンパクトモデルのベンチマーク
+
+サーバー一覧(1000件)を保持する場合のメモリ使用量と、デコード方法ごとの変換時間を計測します。
+
+    $ python benchmarks/bench_compact.py
+
+"""
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_codec import build_page  # noqa: E402
+from vpsc.codec import get_codec  # noqa: E402
+from vpsc.decode import Decoder  # noqa: E402
+from vpsc.models.generated import Server  # noqa: E402
+
+
+def retained(decoder: Decoder, page: bytes) -> int:
+    """
+    1ページ分を変換して保持した場合のメモリ使用量。変換後に不要になった辞書は含めない
+    """
+    codec = get_codec("json")
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = codec.loads(page)["results"]
+    decoded = [decoder(item) for item in items]
+    del items
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del decoded
+    return size
+
+
+def main(size: int = 1000, number: int = 20):
+    page = build_page(size)
+    items = get_codec("json").loads(page)["results"]
+    print(f"{size} items, {number} iterations")
+    base = None
+    for mode in ("validate", "trusted", "compact", "dict"):
+        decoder = Decoder(Server, mode)
+        elapsed = timeit.timeit(lambda: [decoder(item) for item in items], number=number) / number
+        memory = retained(decoder, page)
+        base = base or (elapsed, memory)
+        print(
+            f"{mode:10} {elapsed * 1e3:8.2f} ms (x{base[0] / elapsed:5.2f})"
+            f"  {memory / 1024:9.1f} KiB (x{base[1] / memory:5.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
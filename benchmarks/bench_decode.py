@@ -0,0 +1,34 @@
+"""デコード方法のベンチマーク
+
+サーバー一覧の1ページ(100件)を、デコード方法ごとにモデルへ変換する時間を計測します。
+
+    $ python benchmarks/bench_decode.py
+
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_codec import build_page  # noqa: E402
+from vpsc.codec import get_codec  # noqa: E402
+from vpsc.decode import Decoder  # noqa: E402
+from vpsc.models.generated import Server  # noqa: E402
+
+
+def main(number: int = 200):
+    items = get_codec("json").loads(build_page())["results"]
+    print(f"{len(items)} items, {number} iterations")
+    timings = {}
+    for mode, sample in [("validate", 0), ("trusted", 0), ("trusted", 10), ("dict", 0)]:
+        decoder = Decoder(Server, mode, sample=sample)
+        elapsed = min(timeit.repeat(lambda: [decoder(item) for item in items], number=number, repeat=5)) / number
+        timings[f"{mode}" + (f" (1/{sample})" if sample else "")] = elapsed
+    base = timings["validate"]
+    for name, elapsed in timings.items():
+        print(f"{name:16} {elapsed * 1e6:9.1f} us (x{base / elapsed:.2f})")
+
+
+if __name__ == "__main__":
+    main()
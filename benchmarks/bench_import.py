@@ -0,0 +1,62 @@
+"""起動時間のベンチマーク
+
+コマンドの起動にかかる時間を、何もインポートしない Python の起動時間との差で測ります。
+ヘルプの表示が閾値(ミリ秒)より遅い場合は終了コード1で終了するため、起動時間の悪化を検出できます。
+
+    $ python benchmarks/bench_import.py
+    $ python benchmarks/bench_import.py 150
+
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+RUN_COMMAND = "import sys; from vpsc.commands import entry_point; sys.argv[0] = 'vpsc'; entry_point()"
+
+# (名前, python -c に渡すコード, コマンドの引数, 閾値で確認するか)
+SCENARIOS = [
+    ("vpsc --help", RUN_COMMAND, ["--help"], True),
+    ("vpsc server --help", RUN_COMMAND, ["server", "--help"], True),
+    ("vpsc server power-status --help", RUN_COMMAND, ["server", "power-status", "--help"], True),
+    ("import vpsc.client", "import vpsc.client", [], False),
+]
+
+
+def startup(code: str, args: list, repeat: int) -> float:
+    """
+    起動から終了までの時間(最小値)
+
+    :param code: 実行するコード
+    :param args: 引数
+    :param repeat: 繰り返す回数
+    :return: 秒
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT, VPS_API_KEY="bench")
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code, *args], env=env, stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(threshold_ms: float = 100, repeat: int = 10) -> int:
+    base = startup("pass", [], repeat)
+    print(f"{'python':34} {base * 1e3:8.2f} ms")
+    failed = []
+    for name, code, args, checked in SCENARIOS:
+        elapsed = (startup(code, args, repeat) - base) * 1e3
+        print(f"{name:34} {elapsed:+8.2f} ms")
+        if checked and elapsed > threshold_ms:
+            failed.append(name)
+    if failed:
+        print(f"slower than {threshold_ms} ms: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*map(float, sys.argv[1:2])))
@@ -0,0 +1,63 @@
+"""インターンのベンチマーク
+
+サーバー一覧(1000件)を2回取得して両方を保持した場合のメモリ使用量と変換時間を、
+値をまとめる場合とまとめない場合で比較します。
+
+    $ python benchmarks/bench_intern.py
+
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_codec import build_page  # noqa: E402
+from vpsc.codec import get_codec  # noqa: E402
+from vpsc.decode import Decoder  # noqa: E402
+from vpsc.intern import Interner  # noqa: E402
+from vpsc.models.generated import Server  # noqa: E402
+
+
+def poll(mode: str, interner, page: bytes, polls: int = 2) -> list:
+    codec = get_codec("json")
+    kept = []
+    for _ in range(polls):
+        decoder = Decoder(Server, mode, interner=interner)
+        kept.append([decoder(item) for item in codec.loads(page)["results"]])
+    return kept
+
+
+def retained(mode: str, page: bytes, intern: bool):
+    """
+    取得にかかった時間と、取得した一覧を保持するメモリ使用量。値をまとめる場合はまとめた値の表も含める
+    """
+    start = time.perf_counter()
+    poll(mode, Interner() if intern else None, page)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    interner = Interner() if intern else None
+    kept = poll(mode, interner, page)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept, interner
+    return elapsed, size
+
+
+def main(size: int = 1000):
+    page = build_page(size)
+    print(f"{size} items x 2 polls")
+    for mode in ("validate", "dict", "compact"):
+        for intern in (False, True):
+            elapsed, memory = retained(mode, page, intern)
+            label = f"{mode}{' + intern' if intern else ''}"
+            print(f"{label:18} {elapsed * 1e3:8.2f} ms  {memory / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""射影のベンチマーク
+
+1000件のサーバー一覧をモデルに変換する時間とピークメモリを、全項目と射影で比較します。
+
+    $ python benchmarks/bench_projection.py
+
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_codec import build_page  # noqa: E402
+from vpsc.codec import get_codec  # noqa: E402
+from vpsc.models.generated import Server  # noqa: E402
+from vpsc.projection import project  # noqa: E402
+
+FIELDS = ["id", "name", "power_status", "zone.code"]
+
+
+def measure(model, items):
+    tracemalloc.start()
+    start = time.perf_counter()
+    servers = [model(**item) for item in items]
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del servers
+    return elapsed, peak
+
+
+def main():
+    items = get_codec("json").loads(build_page(1000))["results"]
+    for name, model in [("full", Server), (f"fields={FIELDS}", project(Server, FIELDS))]:
+        elapsed, peak = measure(model, items)
+        print(f"{name:50} {elapsed * 1e3:7.1f} ms  peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
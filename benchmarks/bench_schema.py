@@ -0,0 +1,67 @@
+"""スキーマ作成のベンチマーク
+
+新しいプロセスで生成したモデルをインポートし、サーバー・NFSサーバー・APIキーを1件ずつ検証するまでの時間を、
+スキーマキャッシュを使わない場合と使う場合で比較します。
+
+    $ python benchmarks/bench_schema.py
+
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+CODE = """
+import json, sys, time
+start = time.perf_counter()
+from vpsc.models.generated import ApiKey, NfsServer, Server
+from vpsc.schema_cache import SchemaCache
+imported = time.perf_counter()
+cache = SchemaCache(sys.argv[1]) if sys.argv[1] else None
+if cache is not None:
+    cache.load()
+loaded = time.perf_counter()
+for model, name in ((Server, "server_200"), (NfsServer, "nfs_server_200"), (ApiKey, "apikey_200")):
+    with open(f"tests/responses/{name}.json") as f:
+        model.model_validate(json.load(f))
+validated = time.perf_counter()
+if cache is not None:
+    cache.save()
+print(json.dumps([imported - start, loaded - imported, validated - loaded]))
+"""
+
+
+def run(path: str, repeat: int) -> list:
+    """
+    各段階の時間(最小値)
+
+    :param path: スキーマキャッシュのファイル。空の場合は使わない
+    :param repeat: 繰り返す回数
+    :return: インポート、キャッシュの読み込み、検証の秒数
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    timings = []
+    for _ in range(repeat):
+        res = subprocess.run(
+            [sys.executable, "-c", CODE, path], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        timings.append(json.loads(res.stdout))
+    return [min(values) for values in zip(*timings)]
+
+
+def main(repeat: int = 10):
+    path = os.path.join(tempfile.mkdtemp(), "schemas.pickle")
+    # 1回目のプロセスでスキーマを保存する
+    run(path, 1)
+    print(f"{'':12} {'import':>10} {'load':>10} {'validate':>10}")
+    for name, cache in [("no cache", ""), ("cache", path)]:
+        timings = run(cache, repeat)
+        print(f"{name:12} " + " ".join(f"{value * 1e3:7.2f} ms" for value in timings))
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
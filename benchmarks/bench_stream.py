@@ -0,0 +1,71 @@
+"""ストリーミング読み込みのベンチマーク
+
+サーバー一覧の1ページを、全体を受信してから読み込む場合とストリーミングで読み込む場合で比較します。
+受信は16KBごとに1ミリ秒かかるものとし、最初の要素を取得するまでの時間、全体の時間、
+読み込み中のメモリ使用量のピークを計測します。
+
+    $ python benchmarks/bench_stream.py
+
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_codec import build_page  # noqa: E402
+from vpsc.codec import get_codec  # noqa: E402
+from vpsc.decode import Decoder  # noqa: E402
+from vpsc.models.generated import Server  # noqa: E402
+from vpsc.stream import StreamingPage  # noqa: E402
+
+CHUNK_SIZE = 16384
+
+
+def receive(page: bytes, delay: float):
+    for i in range(0, len(page), CHUNK_SIZE):
+        if delay:
+            time.sleep(delay)
+        yield page[i : i + CHUNK_SIZE]
+
+
+def buffered(page: bytes, codec, decoder, delay: float):
+    data = codec.loads(b"".join(receive(page, delay)))
+    for item in data["results"]:
+        yield decoder(item)
+
+
+def streaming(page: bytes, codec, decoder, delay: float):
+    for item in StreamingPage(receive(page, delay)).results():
+        yield decoder(item)
+
+
+def measure(reader, page: bytes, codec, decoder, delay: float):
+    start = time.perf_counter()
+    items = reader(page, codec, decoder, delay)
+    next(items)
+    first = time.perf_counter() - start
+    for _ in items:
+        pass
+    total = time.perf_counter() - start
+    tracemalloc.start()
+    for _ in reader(page, codec, decoder, 0):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak
+
+
+def main(size: int = 1000, delay: float = 0.001):
+    page = build_page(size)
+    codec = get_codec()
+    decoder = Decoder(Server)
+    print(f"page size: {len(page)} bytes ({size} items), codec: {codec.name}")
+    for name, reader in [("buffered", buffered), ("streaming", streaming)]:
+        first, total, peak = measure(reader, page, codec, decoder, delay)
+        print(f"{name:10} first {first * 1e3:7.2f} ms  total {total * 1e3:7.2f} ms  peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
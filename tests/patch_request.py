@@ -1,5 +1,7 @@
+import json
 import os
 import re
+from typing import Optional
 from unittest import mock
 
 import requests
@@ -7,6 +9,21 @@ import requests
 path = os.path.dirname(os.path.realpath(__file__))
 
 
+def load_response(response_name: str) -> dict:
+    filename = response_name if re.match(r".+\.json$", response_name) else f"{response_name}.json"
+    with open(f"{path}/responses/{filename}", mode="r") as f:
+        return json.load(f)
+
+
+def build_response(status_code: int, data: Optional[dict] = None, headers: Optional[dict] = None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(data).encode("utf-8") if data is not None else b""
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    return response
+
+
 def patch_request(response_name: str):
     def _decorate(func):
         def loader(*args, **kwargs):
@@ -17,10 +34,31 @@ def patch_request(response_name: str):
             response.status_code = int(response_name.split("_")[-1])
             response._content = "\n".join(data).encode("utf-8")
 
-            with mock.patch("requests.request", return_value=response) as patched:
+            with mock.patch("requests.Session.request", return_value=response) as patched:
                 kwargs["patched"] = patched
                 func(*args, **kwargs)
 
         return loader
 
     return _decorate
+
+
+def patch_async_request(response_name: str):
+    def _decorate(func):
+        async def loader(*args, **kwargs):
+            import httpx
+
+            filename = response_name if re.match(r".+\.json$", response_name) else f"{response_name}.json"
+            with open(f"{path}/responses/{filename}", mode="r") as f:
+                data = f.readlines()
+            response = httpx.Response(
+                status_code=int(response_name.split("_")[-1]), content="\n".join(data).encode("utf-8")
+            )
+
+            with mock.patch("httpx.AsyncClient.request", return_value=response) as patched:
+                kwargs["patched"] = patched
+                await func(*args, **kwargs)
+
+        return loader
+
+    return _decorate
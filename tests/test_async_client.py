@@ -0,0 +1,98 @@
+import unittest
+from unittest import mock
+
+from vpsc.models.custom import UpdateServer
+from vpsc.client import APIConfig
+from vpsc.exceptions import APIException
+from tests.patch_request import patch_async_request
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        from vpsc.async_client import AsyncClient
+
+        self.client = AsyncClient(config=APIConfig(api_key="test"))
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    @patch_async_request("server_200")
+    async def test_get_server(self, patched):
+        server = await self.client.get_server(server_id=1)
+        assert 0 == server.id
+        patched.assert_called_once_with(
+            method="get",
+            url=f"{self.client.config.host}/servers/1",
+            headers={"Authorization": f"Bearer {self.client.config.api_key}"},
+        )
+
+    @patch_async_request("servers_200")
+    async def test_get_servers(self, patched):
+        servers = self.client.get_servers()
+        patched.assert_not_called()
+        result = [server async for server in servers]
+        assert 1 == len(result)
+        assert 0 == result[0].id
+        assert 1 == servers.count
+        patched.assert_called_once_with(
+            method="get",
+            url=f"{self.client.config.host}/servers",
+            headers={"Authorization": f"Bearer {self.client.config.api_key}"},
+        )
+
+    @patch_async_request("servers_200")
+    async def test_get_servers_per_page(self, patched):
+        assert 1 == len([server async for server in self.client.get_servers(per_page="auto")])
+        assert {"per_page": 100} == patched.call_args.kwargs["params"]
+
+    @patch_async_request("servers_200")
+    async def test_get_servers_query(self, patched):
+        servers = self.client.get_servers(sort="name", limit=5, zone_code="tk1")
+        assert 1 == len([server async for server in servers])
+        assert {"ordering": "name", "zone_code": "tk1", "per_page": 5} == patched.call_args.kwargs["params"]
+        assert [] == [server async for server in self.client.get_servers(zone_code="is1")]
+
+    @patch_async_request("empty_list_200")
+    async def test_get_switches_empty(self, patched):
+        result = [switch async for switch in self.client.get_switches()]
+        assert [] == result
+
+    @patch_async_request("server_200")
+    async def test_update_server(self, patched):
+        data = UpdateServer(name="name_test", description="description_test")
+        result = await self.client.update_server(server_id=0, data=data)
+        assert 0 == result.id
+        patched.assert_called_once_with(
+            method="put",
+            url=f"{self.client.config.host}/servers/0",
+            headers={"Authorization": f"Bearer {self.client.config.api_key}", "content-type": "application/json"},
+            content=data.model_dump_json(exclude_unset=True).encode("utf-8"),
+        )
+
+    @patch_async_request("status_202")
+    async def test_power_on_server(self, patched):
+        result = await self.client.power_on_server(server_id=0)
+        assert result is None
+
+    async def test_pagination(self):
+        first = httpx.Response(
+            200, json={"count": 2, "next": "https://example.com/servers?page=2", "previous": None, "results": []}
+        )
+        second = httpx.Response(200, json={"count": 2, "next": None, "previous": None, "results": []})
+        with mock.patch("httpx.AsyncClient.request", side_effect=[first, second]) as patched:
+            assert [] == [item async for item in self.client.get_permissions()]
+            assert 2 == patched.call_count
+            assert "https://example.com/servers?page=2" == patched.call_args.kwargs["url"]
+
+    async def test_error(self):
+        response = httpx.Response(404, json={"code": "not_found", "message": "見つかりませんでした。"})
+        with mock.patch("httpx.AsyncClient.request", return_value=response):
+            with self.assertRaises(APIException) as e:
+                await self.client.get_switch(switch_id=0)
+            assert 404 == e.exception.status
@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from vpsc.bulk import run_bulk
+from vpsc.client import Client, APIConfig
+from vpsc.exceptions import APIException
+from vpsc.models.custom import ShutdownServer
+from tests.patch_request import build_response
+
+
+class TestRunBulk(unittest.TestCase):
+    def test_results(self):
+        def operate(resource_id):
+            if resource_id == 2:
+                raise APIException(409, {"code": "conflict"})
+            if resource_id == 3:
+                raise requests.Timeout()
+            return resource_id * 10
+
+        results = run_bulk(operate, [1, 2, 3, 4])
+        assert [1, 2, 3, 4] == [result.id for result in results]
+        assert ["success", "error", "timeout", "success"] == [result.status for result in results]
+        assert 10 == results[0].result
+        assert 409 == results[1].error.status
+        assert results[0].ok
+        assert not results[1].ok
+
+    def test_concurrency(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def operate(resource_id):
+            with lock:
+                running.append(resource_id)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(resource_id)
+
+        results = run_bulk(operate, range(20), concurrency=3)
+        assert 20 == len(results)
+        assert max(peak) <= 3
+
+    def test_timeout(self):
+        event = threading.Event()
+        self.addCleanup(event.set)
+
+        def operate(resource_id):
+            if resource_id == 1:
+                event.wait(5)
+            return resource_id
+
+        results = run_bulk(operate, [0, 1], concurrency=2, timeout=0.1)
+        assert ["success", "timeout"] == [result.status for result in results]
+
+
+class TestBulkPower(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(config=APIConfig(api_key="test"))
+
+    def test_power_on_servers(self):
+        responses = {
+            f"{self.client.config.host}/servers/1/power-on": build_response(202),
+            f"{self.client.config.host}/servers/2/power-on": build_response(409, {"code": "conflict"}),
+        }
+        with mock.patch("requests.Session.request", side_effect=lambda **kwargs: responses[kwargs["url"]]):
+            results = self.client.power_on_servers([1, 2])
+        assert ["success", "error"] == [result.status for result in results]
+
+    def test_shutdown_servers(self):
+        with mock.patch("requests.Session.request", return_value=build_response(202)) as patched:
+            results = self.client.shutdown_servers([1, 2, 3], force=True, concurrency=2)
+        assert all(result.ok for result in results)
+        assert 3 == patched.call_count
+        data = ShutdownServer(force=True).model_dump_json(exclude_unset=True).encode("utf-8")
+        assert all(call.kwargs["data"] == data for call in patched.call_args_list)
+
+    def test_force_reboot_servers(self):
+        with mock.patch("requests.Session.request", return_value=build_response(202)) as patched:
+            results = self.client.force_reboot_servers([5])
+        assert [5] == [result.id for result in results]
+        assert f"{self.client.config.host}/servers/5/force-reboot" == patched.call_args.kwargs["url"]
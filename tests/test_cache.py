@@ -0,0 +1,116 @@
+import unittest
+from unittest import mock
+
+from vpsc.cache import ResponseCache
+from vpsc.client import Client, APIConfig
+from vpsc.models.custom import UpdateServer
+from tests.patch_request import build_response, load_response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl=10, ttls={"/permissions": 3600, "/servers/*/limitation": 600}, clock=clock)
+        assert 3600 == cache.ttl_for("/permissions")
+        assert 600 == cache.ttl_for("/servers/1/limitation")
+        assert 10 == cache.ttl_for("/servers/1")
+
+        entry = cache.set("key", "/servers/1", {"id": 1})
+        assert cache.is_fresh(entry)
+        clock.now = 11
+        assert not cache.is_fresh(entry)
+        cache.touch("key")
+        assert cache.is_fresh(entry)
+
+    def test_lru(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", "/servers/1", {})
+        cache.set("b", "/servers/2", {})
+        cache.get("a")
+        cache.set("c", "/servers/3", {})
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert 2 == len(cache)
+
+    def test_invalidate(self):
+        cache = ResponseCache()
+        for path in ["/servers", "/servers/1", "/servers/1/limitation", "/servers/10", "/switches/1"]:
+            cache.set(path, path, {})
+        cache.invalidate("/servers/1/ipv4-ptr")
+        assert cache.get("/servers") is None
+        assert cache.get("/servers/1") is None
+        assert cache.get("/servers/1/limitation") is None
+        assert cache.get("/servers/10") is not None
+        assert cache.get("/switches/1") is not None
+
+    def test_key(self):
+        assert "https://example.com/servers" == ResponseCache.key("https://example.com/servers")
+        assert "https://example.com/servers?a=1&per_page=10" == ResponseCache.key(
+            "https://example.com/servers", {"per_page": 10, "a": 1}
+        )
+
+
+class TestClientCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.client = Client(
+            config=APIConfig(api_key="test"),
+            cache=ResponseCache(ttl=30, ttls={"/permissions": 3600}, clock=self.clock),
+        )
+
+    def test_hit(self):
+        with mock.patch(
+            "requests.Session.request", return_value=build_response(200, load_response("server_200"))
+        ) as patched:
+            assert 0 == self.client.get_server(server_id=0).id
+            assert 0 == self.client.get_server(server_id=0).id
+            assert 1 == patched.call_count
+
+            self.clock.now = 31
+            self.client.get_server(server_id=0)
+            assert 2 == patched.call_count
+
+    def test_revalidate(self):
+        responses = [
+            build_response(200, load_response("server_200"), {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024"}),
+            build_response(304),
+        ]
+        with mock.patch("requests.Session.request", side_effect=responses) as patched:
+            self.client.get_server(server_id=0)
+            self.clock.now = 31
+            assert 0 == self.client.get_server(server_id=0).id
+            headers = patched.call_args.kwargs["headers"]
+            assert '"v1"' == headers["If-None-Match"]
+            assert "Mon, 01 Jan 2024" == headers["If-Modified-Since"]
+            # 再検証後は有効期限が延びる
+            self.client.get_server(server_id=0)
+            assert 2 == patched.call_count
+
+    def test_invalidate_on_update(self):
+        response = build_response(200, load_response("server_200"))
+        with mock.patch("requests.Session.request", return_value=response) as patched:
+            self.client.get_server(server_id=0)
+            self.client.update_server(server_id=0, data=UpdateServer(name="name", description="description"))
+            self.client.get_server(server_id=0)
+            assert 3 == patched.call_count
+
+    def test_list(self):
+        response = build_response(200, load_response("servers_200"))
+        with mock.patch("requests.Session.request", return_value=response) as patched:
+            assert 1 == len(list(self.client.get_servers()))
+            assert 1 == len(list(self.client.get_servers()))
+            assert 1 == patched.call_count
+
+    def test_disabled(self):
+        client = Client(config=APIConfig(api_key="test"))
+        assert client.cache is None
+        client = Client(config=APIConfig(api_key="test", cache_enabled=True, cache_ttls={"/permissions": 60}))
+        assert 60 == client.cache.ttl_for("/permissions")
@@ -0,0 +1,43 @@
+import importlib.util
+import json
+import unittest
+
+from vpsc.client import Client, APIConfig
+from vpsc.codec import StdlibCodec, OrjsonCodec, get_codec
+from tests.patch_request import patch_request
+
+has_orjson = importlib.util.find_spec("orjson") is not None
+
+
+class TestCodec(unittest.TestCase):
+    def test_stdlib(self):
+        codec = get_codec("json")
+        assert isinstance(codec, StdlibCodec)
+        data = {"name": "サーバー", "ids": [1, 2], "next": None}
+        assert data == codec.loads(json.dumps(data).encode("utf-8"))
+
+    @unittest.skipIf(not has_orjson, "orjson is not installed")
+    def test_orjson(self):
+        codec = get_codec("orjson")
+        assert {"name": "サーバー"} == codec.loads('{"name": "サーバー"}'.encode("utf-8"))
+
+    @unittest.skipIf(has_orjson, "orjson is installed")
+    def test_not_installed(self):
+        with self.assertRaises(ImportError):
+            get_codec("orjson")
+
+    def test_auto(self):
+        codec = get_codec("auto")
+        assert isinstance(codec, OrjsonCodec if has_orjson else StdlibCodec)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_codec("msgspec")
+
+
+class TestClientCodec(unittest.TestCase):
+    @patch_request("servers_200")
+    def test_stdlib(self, patched):
+        client = Client(config=APIConfig(api_key="test", json_codec="json"))
+        assert "json" == client.client.codec.name
+        assert [0] == [server.id for server in client.get_servers()]
@@ -0,0 +1,163 @@
+import importlib.util
+import unittest
+from unittest import mock
+
+from vpsc import columnar
+from vpsc.client import Client, APIConfig
+from vpsc.columnar import SERVER_COLUMNS, Snapshot, server_snapshot
+from tests.patch_request import load_response, patch_request
+
+has_numpy = importlib.util.find_spec("numpy") is not None
+has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+
+
+def server(server_id: int, zone: str, plan: str, cores: int, memory: int, storage=(("ssd", 100),)) -> dict:
+    item = load_response("server_200")
+    item.update(id=server_id, cpu_cores=cores, memory_mebibytes=memory)
+    item["zone"] = {"code": zone, "name": zone}
+    item["contract"] = dict(item["contract"], plan_name=plan)
+    item["storage"] = [{"port": i, "type": kind, "size_gibibytes": size} for i, (kind, size) in enumerate(storage)]
+    return item
+
+
+ITEMS = [
+    server(1, "tk1", "1G", 2, 1024),
+    server(2, "is1", "2G", 3, 2048, storage=(("ssd", 100), ("hdd", 400))),
+    server(3, "tk1", "2G", 3, 2048),
+    server(4, "tk1", "1G", 2, 1024),
+]
+
+
+class SnapshotTestMixin:
+    def setUp(self):
+        self.snapshot = Snapshot.from_items(ITEMS, SERVER_COLUMNS)
+
+    def test_columns(self):
+        assert 4 == len(self.snapshot)
+        assert [1, 2, 3, 4] == list(self.snapshot.column("id"))
+        assert ["tk1", "is1"] == self.snapshot.categories("zone")
+        assert [0, 1, 0, 0] == list(self.snapshot.column("zone"))
+        assert ["tk1", "is1", "tk1", "tk1"] == self.snapshot.values("zone")
+        assert [100, 500, 100, 100] == list(self.snapshot.column("storage_gibibytes"))
+        assert [0, 400, 0, 0] == list(self.snapshot.column("hdd_gibibytes"))
+
+    def test_group_by(self):
+        grouped = self.snapshot.group_by("zone", cpu_cores="sum", memory_mebibytes="sum")
+        assert {
+            "tk1": {"count": 3, "cpu_cores": 7, "memory_mebibytes": 4096},
+            "is1": {"count": 1, "cpu_cores": 3, "memory_mebibytes": 2048},
+        } == grouped
+
+    def test_group_by_keys(self):
+        grouped = self.snapshot.group_by("zone", "plan", cpu_cores="max", storage_gibibytes="mean")
+        assert {
+            ("tk1", "1G"): {"count": 2, "cpu_cores": 2, "storage_gibibytes": 100},
+            ("tk1", "2G"): {"count": 1, "cpu_cores": 3, "storage_gibibytes": 100},
+            ("is1", "2G"): {"count": 1, "cpu_cores": 3, "storage_gibibytes": 500},
+        } == grouped
+
+    def test_group_by_int(self):
+        grouped = self.snapshot.group_by("cpu_cores", memory_mebibytes="min")
+        assert {2: {"count": 2, "memory_mebibytes": 1024}, 3: {"count": 2, "memory_mebibytes": 2048}} == grouped
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.snapshot.group_by("zone", name="sum")
+        with self.assertRaises(ValueError):
+            self.snapshot.group_by("zone", cpu_cores="median")
+        with self.assertRaises(ValueError):
+            self.snapshot.group_by("rack")
+        with self.assertRaises(ValueError):
+            self.snapshot.group_by()
+
+    def test_extend_error(self):
+        item = server(5, "os3", "4G", 4, 4096)
+        del item["memory_mebibytes"]
+        with self.assertRaises(KeyError):
+            self.snapshot.extend([server(6, "tk1", "1G", 2, 1024), item])
+        # 途中で失敗した場合はどの列にも追加しない
+        assert 4 == len(self.snapshot)
+        assert 4 == len(self.snapshot.column("cpu_cores"))
+        assert ["tk1", "is1"] == self.snapshot.categories("zone")
+        grouped = self.snapshot.group_by("zone", memory_mebibytes="sum")
+        assert {"count": 3, "memory_mebibytes": 4096} == grouped["tk1"]
+
+    def test_column_copy(self):
+        cores = self.snapshot.column("cpu_cores")
+        zones = self.snapshot.column("zone")
+        self.snapshot.append(server(5, "os3", "4G", 4, 4096))
+        assert 4 == len(cores) == len(zones)
+        assert [2, 3, 3, 2, 4] == list(self.snapshot.column("cpu_cores"))
+        assert ["tk1", "is1", "os3"] == self.snapshot.categories("zone")
+
+    def test_empty(self):
+        assert {} == Snapshot(SERVER_COLUMNS).group_by("zone", cpu_cores="sum")
+
+
+class TestSnapshot(SnapshotTestMixin, unittest.TestCase):
+    pass
+
+
+@unittest.skipIf(not has_numpy, "numpy is not installed")
+class TestSnapshotWithoutNumpy(SnapshotTestMixin, unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(columnar, "_numpy", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.snapshot = Snapshot.from_items(ITEMS, SERVER_COLUMNS)
+
+    @unittest.skipIf(has_numpy, "numpy is installed")
+    def test_numpy_not_installed(self):
+        with self.assertRaises(ImportError):
+            self.snapshot.to_numpy()
+
+    @unittest.skipIf(not has_numpy, "numpy is not installed")
+    def test_numpy(self):
+        arrays = self.snapshot.to_numpy()
+        assert 10 == int(arrays["cpu_cores"].sum())
+        assert "int32" == str(arrays["zone"].dtype)
+
+    @unittest.skipIf(has_pyarrow, "pyarrow is installed")
+    def test_arrow_not_installed(self):
+        with self.assertRaises(ImportError):
+            self.snapshot.to_arrow()
+
+    @unittest.skipIf(not has_pyarrow, "pyarrow is not installed")
+    def test_arrow(self):
+        table = self.snapshot.to_arrow()
+        assert 4 == table.num_rows
+        assert ["tk1", "is1", "tk1", "tk1"] == table.column("zone").to_pylist()
+
+
+class TestServerSnapshot(unittest.TestCase):
+    @patch_request("servers_200")
+    def test_server_snapshot(self, patched):
+        client = Client(config=APIConfig(api_key="test"))
+        snapshot = server_snapshot(client, zone_code="tk1")
+        expected = [item for item in load_response("servers_200")["results"] if item["zone"]["code"] == "tk1"]
+        assert [item["id"] for item in expected] == list(snapshot.column("id"))
+        assert 100 == patched.call_args.kwargs["params"]["per_page"]
+
+    @patch_request("servers_200")
+    def test_page_dicts(self, patched):
+        client = Client(config=APIConfig(api_key="test"))
+        codec = client.client.codec
+        pages = []
+
+        def loads(content):
+            pages.append(type(codec).loads(codec, content))
+            return pages[-1]
+
+        with mock.patch.object(codec, "loads", side_effect=loads), mock.patch.object(
+            Snapshot, "from_items"
+        ) as from_items:
+            server_snapshot(client)
+            items = list(from_items.call_args.args[0])
+        # 受信したページの辞書をそのまま列にする
+        assert all(item is result for item, result in zip(items, pages[0]["results"]))
+        assert len(pages[0]["results"]) == len(items)
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# コマンドを実行してから、読み込まれたモジュールを表示する
+CODE = """
+import sys
+from vpsc.commands import entry_point
+sys.argv[0] = "vpsc"
+try:
+    entry_point()
+except SystemExit:
+    pass
+print(",".join(sorted(sys.modules)), file=sys.stderr)
+"""
+
+HEAVY_MODULES = ["requests", "pydantic", "pydantic_settings", "vpsc.client", "vpsc.models.generated"]
+
+
+def loaded_modules(*args: str) -> set:
+    env = dict(os.environ, PYTHONPATH=ROOT, VPS_API_KEY="test", VPS_HOST="http://127.0.0.1:9")
+    res = subprocess.run([sys.executable, "-c", CODE, *args], env=env, capture_output=True, text=True, check=True)
+    return set(res.stderr.strip().splitlines()[-1].split(","))
+
+
+class TestCommandImport(unittest.TestCase):
+    def test_help(self):
+        for args in (["--help"], ["server", "--help"], ["server", "power-status", "--help"]):
+            modules = loaded_modules(*args)
+            assert [] == [name for name in HEAVY_MODULES if name in modules], args
+
+    def test_usage_error(self):
+        modules = loaded_modules("server", "power-status", "-id")
+        assert [] == [name for name in HEAVY_MODULES if name in modules]
+
+    def test_command(self):
+        modules = loaded_modules("server", "power-status", "-id", "1")
+        assert "vpsc.client" in modules
+        # 一覧のキャッシュや compact の型は使わないため読み込まない
+        assert "vpsc.disk_cache" not in modules
+        assert "vpsc.models.compact" not in modules
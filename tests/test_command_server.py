@@ -1,9 +1,15 @@
+import json
+import time
 import unittest
 from unittest import mock
 
 from click.testing import CliRunner
 
 from vpsc.commands import vpsc
+from vpsc.disk_cache import CachedListing
+from vpsc.models.generated import Server, NfsServer
+from vpsc.watch import WatchEvent
+from tests.patch_request import load_response
 
 
 class TestCommandServer(unittest.TestCase):
@@ -20,14 +26,61 @@ class TestCommandServer(unittest.TestCase):
         self.addCleanup(patcher.stop)
         self.mock_print = patcher.start()
 
+        patcher = mock.patch("vpsc.commands.InventoryCache")
+        self.addCleanup(patcher.stop)
+        self.mock_cache_class = patcher.start()
+        self.mock_cache = self.mock_cache_class.return_value
+        self.mock_cache.load.return_value = None
+
         self.runner = CliRunner()
 
     def test_list(self):
-        self.mock_client.get_servers.return_value = ["result"]
+        self.mock_cache.refresh.return_value = load_response("servers_200")["results"]
         result = self.runner.invoke(vpsc, ["server", "list"])
         assert 0 == result.exit_code
-        self.mock_client.get_servers.assert_called()
-        self.mock_print.assert_called_once_with("result")
+        self.mock_cache.refresh.assert_called_once_with("servers", self.mock_client)
+        self.mock_print.assert_called_once_with(Server.model_validate(load_response("servers_200")["results"][0]))
+
+    def test_list_cached(self):
+        items = load_response("servers_200")["results"]
+        self.mock_cache.load.return_value = CachedListing(fetched_at=time.time() - 10, items=items)
+        result = self.runner.invoke(vpsc, ["server", "list"])
+        assert 0 == result.exit_code
+        self.mock_cache.refresh.assert_not_called()
+        self.mock_cache.refresh_in_background.assert_not_called()
+        self.mock_print.assert_called_once_with(Server.model_validate(items[0]))
+
+    def test_list_stale(self):
+        items = load_response("servers_200")["results"]
+        self.mock_cache.load.return_value = CachedListing(fetched_at=time.time() - 10, items=items)
+        result = self.runner.invoke(vpsc, ["server", "list", "--max-age", "5"])
+        assert 0 == result.exit_code
+        self.mock_cache.refresh.assert_not_called()
+        self.mock_cache.refresh_in_background.assert_called_once_with("servers")
+        self.mock_print.assert_called_once_with(Server.model_validate(items[0]))
+
+    def test_list_refresh(self):
+        items = load_response("servers_200")["results"]
+        self.mock_cache.load.return_value = CachedListing(fetched_at=time.time(), items=items)
+        self.mock_cache.refresh.return_value = items
+        result = self.runner.invoke(vpsc, ["server", "list", "--refresh"])
+        assert 0 == result.exit_code
+        self.mock_cache.refresh.assert_called_once_with("servers", self.mock_client)
+        self.mock_cache.refresh_in_background.assert_not_called()
+
+    def test_list_watch(self):
+        server = Server.model_validate(load_response("servers_200")["results"][0])
+        self.mock_client.watch_servers.return_value = [
+            WatchEvent("added", server.id, server),
+            WatchEvent("changed", server.id, server, {"name": ("old", "new")}),
+        ]
+        result = self.runner.invoke(vpsc, ["server", "list", "--watch", "--interval", "2"])
+        assert 0 == result.exit_code
+        self.mock_client.watch_servers.assert_called_once_with(interval=2)
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        assert ["added", "changed"] == [line["type"] for line in lines]
+        assert server.id == lines[0]["resource"]["id"]
+        assert {"name": {"before": "old", "after": "new"}} == lines[1]["changes"]
 
     def test_list_id(self):
         self.mock_client.get_server.return_value = "result"
@@ -41,6 +94,7 @@ class TestCommandServer(unittest.TestCase):
         result = self.runner.invoke(vpsc, ["server", "update", "-id", "12345", "-n", "name", "-d", "description"])
         assert 0 == result.exit_code
         self.mock_client.update_server.assert_called_once_with(server_id=12345, data=mock.ANY)
+        self.mock_cache.invalidate.assert_called_once_with("servers")
         self.mock_print.assert_called_once_with("result")
 
     def test_update_server_empty(self):
@@ -69,14 +123,18 @@ class TestCommandServer(unittest.TestCase):
         assert 2 == result.exit_code
 
     def test_power_on_server(self):
-        patcher = mock.patch("vpsc.commands.sleep")
-        self.addCleanup(patcher.stop)
-        patcher.start()
-
-        self.mock_client.get_server_power_status.return_value = "result"
+        self.mock_client.wait_for_power_status.return_value = "result"
         result = self.runner.invoke(vpsc, ["server", "power-on", "-id", "12345"])
         assert 0 == result.exit_code
         self.mock_client.power_on_server.assert_called_once_with(server_id=12345)
+        self.mock_client.wait_for_power_status.assert_called_once_with(server_id=12345, target="power_on", timeout=300)
+        self.mock_print.assert_called_once_with("result")
+
+    def test_power_on_server_no_wait(self):
+        self.mock_client.get_server_power_status.return_value = "result"
+        result = self.runner.invoke(vpsc, ["server", "power-on", "-id", "12345", "--no-wait"])
+        assert 0 == result.exit_code
+        self.mock_client.wait_for_power_status.assert_not_called()
         self.mock_client.get_server_power_status.assert_called_once_with(server_id=12345)
         self.mock_print.assert_called_once_with("result")
 
@@ -85,24 +143,16 @@ class TestCommandServer(unittest.TestCase):
         assert 2 == result.exit_code
 
     def test_shutdown_server(self):
-        patcher = mock.patch("vpsc.commands.sleep")
-        self.addCleanup(patcher.stop)
-        patcher.start()
-
-        self.mock_client.get_server_power_status.return_value = "result"
-        result = self.runner.invoke(vpsc, ["server", "shutdown", "-id", "12345"])
+        self.mock_client.wait_for_power_status.return_value = "result"
+        result = self.runner.invoke(vpsc, ["server", "shutdown", "-id", "12345", "--timeout", "60"])
         assert 0 == result.exit_code
         self.mock_client.shutdown_server.assert_called_once_with(server_id=12345, force=False)
-        self.mock_client.get_server_power_status.assert_called_once_with(server_id=12345)
+        self.mock_client.wait_for_power_status.assert_called_once_with(server_id=12345, target="power_off", timeout=60)
         self.mock_print.assert_called_once_with("result")
 
     def test_shutdown_server_force(self):
-        patcher = mock.patch("vpsc.commands.sleep")
-        self.addCleanup(patcher.stop)
-        patcher.start()
-
         self.mock_client.get_server_power_status.return_value = "result"
-        result = self.runner.invoke(vpsc, ["server", "shutdown", "-id", "12345", "-f"])
+        result = self.runner.invoke(vpsc, ["server", "shutdown", "-id", "12345", "-f", "--no-wait"])
         assert 0 == result.exit_code
         self.mock_client.shutdown_server.assert_called_once_with(server_id=12345, force=True)
         self.mock_client.get_server_power_status.assert_called_once_with(server_id=12345)
@@ -165,11 +215,19 @@ class TestCommandNfsServer(unittest.TestCase):
         self.addCleanup(patcher.stop)
         self.mock_print = patcher.start()
 
+        patcher = mock.patch("vpsc.commands.InventoryCache")
+        self.addCleanup(patcher.stop)
+        self.mock_cache_class = patcher.start()
+        self.mock_cache = self.mock_cache_class.return_value
+        self.mock_cache.load.return_value = None
+
         self.runner = CliRunner()
 
     def test_list(self):
-        self.mock_client.get_nfs_servers.return_value = ["result"]
+        self.mock_cache.refresh.return_value = load_response("nfs_servers_200")["results"]
         result = self.runner.invoke(vpsc, ["nfs-server", "list"])
         assert 0 == result.exit_code
-        self.mock_client.get_nfs_servers.assert_called()
-        self.mock_print.assert_called_once_with("result")
+        self.mock_cache.refresh.assert_called_once_with("nfs-servers", self.mock_client)
+        self.mock_print.assert_called_once_with(
+            NfsServer.model_validate(load_response("nfs_servers_200")["results"][0])
+        )
@@ -0,0 +1,83 @@
+import unittest
+
+from pydantic import ValidationError
+
+from vpsc.client import Client, APIConfig
+from vpsc.decode import Decoder
+from vpsc.models import compact, generated
+from vpsc.models.gen_compact import generate
+from tests.patch_request import load_response, patch_request
+
+ROLE = {
+    "id": 1,
+    "name": "operator",
+    "description": "",
+    "permission_filtering": "enabled",
+    "allowed_permissions": ["get-server-list"],
+    "resource_filtering": "enabled",
+    "allowed_resources": {"servers": [1, 2]},
+}
+
+
+class TestCompact(unittest.TestCase):
+    def assert_lossless(self, name: str, data: dict):
+        model = getattr(generated, name)(**data)
+        value = getattr(compact, name).from_dict(data)
+        assert model == compact.to_model(value)
+        assert value == compact.from_model(model)
+
+    def test_lossless(self):
+        self.assert_lossless("Server", load_response("server_200"))
+        self.assert_lossless("NfsServer", load_response("nfs_server_200"))
+        self.assert_lossless("Switch", load_response("switch_200"))
+        self.assert_lossless("Switch", dict(load_response("switch_200"), external_connection=None))
+        self.assert_lossless("ApiKey", load_response("apikey_200"))
+        self.assert_lossless("Role", ROLE)
+        self.assert_lossless("Permission", {"code": "get-server-list", "name": "一覧", "category": "server"})
+
+    def test_nested(self):
+        data = load_response("server_200")
+        server = compact.Server.from_dict(data)
+        assert data["zone"]["code"] == server.zone.code
+        assert isinstance(server.storage, tuple)
+        assert data["storage"][0]["size_gibibytes"] == server.storage[0].size_gibibytes
+        role = compact.Role.from_dict(ROLE)
+        assert (1, 2) == role.allowed_resources.servers
+        assert role.allowed_resources.switches is None
+
+    def test_read_only(self):
+        server = compact.Server.from_dict(load_response("server_200"))
+        with self.assertRaises(AttributeError):
+            server.name = "changed"
+
+    def test_generated_up_to_date(self):
+        namespace = {"__name__": "vpsc.models.compact_check", "__package__": "vpsc.models"}
+        exec(compile(generate(), "compact.py", "exec"), namespace)
+        for value, model in compact.MODELS.items():
+            assert namespace[value.__name__]._fields == value._fields
+            assert namespace[value.__name__].__annotations__ == value.__annotations__
+            assert tuple(model.model_fields) == value._fields
+
+
+class TestDecodeCompact(unittest.TestCase):
+    def test_decoder(self):
+        data = load_response("server_200")
+        assert compact.Server.from_dict(data) == Decoder(generated.Server, "compact")(data)
+
+    def test_fallback(self):
+        decoder = Decoder(generated.ServerPowerStatus, "compact")
+        assert "validate" == decoder.mode
+        assert isinstance(decoder(load_response("server_power_status_200")), generated.ServerPowerStatus)
+
+    def test_sample(self):
+        data = dict(load_response("server_200"), power_status="new_status")
+        decoder = Decoder(generated.Server, "compact", sample=2)
+        with self.assertRaises(ValidationError):
+            decoder(data)
+        assert "new_status" == decoder(data).power_status
+
+    @patch_request("servers_200")
+    def test_client(self, patched):
+        client = Client(config=APIConfig(api_key="test"))
+        servers = list(client.get_servers(decode="compact"))
+        assert [compact.Server.from_dict(item) for item in load_response("servers_200")["results"]] == servers
@@ -0,0 +1,96 @@
+import unittest
+
+from pydantic import ValidationError
+
+from vpsc.client import Client, APIConfig
+from vpsc.decode import Decoder, construct
+from vpsc.models.generated import Server, Switch, InvalidParameterDetail, ProblemDetails400
+from tests.patch_request import load_response, patch_request
+
+
+class TestConstruct(unittest.TestCase):
+    def test_nested(self):
+        data = load_response("server_200")
+        server = construct(Server, data)
+        assert Server(**data) == server
+        assert "tk1" == server.zone.code
+        assert 100 == server.storage[0].size_gibibytes
+
+    def test_optional_nested(self):
+        data = load_response("switch_200")
+        assert Switch(**data) == construct(Switch, data)
+        assert construct(Switch, dict(data, external_connection=None)).external_connection is None
+
+    def test_root_model(self):
+        detail = construct(InvalidParameterDetail, [{"code": "required", "message": "必須です"}])
+        assert "required" == detail.root[0].code
+
+    def test_defaults(self):
+        problem = construct(ProblemDetails400, {"message": "Invalid input."})
+        assert problem.code is None
+        assert {"message"} == problem.model_fields_set
+
+    def test_missing(self):
+        data = load_response("server_200")
+        del data["zone"]
+        server = construct(Server, dict(data, ipv4="not a model"))
+        # スキーマに合わない場合も組み立てる
+        assert "not a model" == server.ipv4
+        assert "zone" not in server.model_fields_set
+        assert "tk1" == construct(Server, load_response("server_200")).zone.code
+
+    def test_not_validated(self):
+        server = construct(Server, dict(load_response("server_200"), power_status="new_status"))
+        assert "new_status" == server.power_status
+
+
+class TestDecoder(unittest.TestCase):
+    def setUp(self):
+        self.invalid = dict(load_response("server_200"), power_status="new_status")
+
+    def test_validate(self):
+        with self.assertRaises(ValidationError):
+            Decoder(Server)(self.invalid)
+
+    def test_dict(self):
+        assert self.invalid is Decoder(Server, "dict")(self.invalid)
+        assert self.invalid is Decoder(None, "trusted")(self.invalid)
+
+    def test_sample(self):
+        decoder = Decoder(Server, "trusted", sample=3)
+        valid = load_response("server_200")
+        results = []
+        for item in [self.invalid, valid, self.invalid, self.invalid]:
+            try:
+                results.append(decoder(item).power_status)
+            except ValidationError:
+                results.append("error")
+        # 1件目と4件目だけ検証する
+        assert ["error", "power_on", "new_status", "error"] == results
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            Decoder(Server, "fast")
+
+
+class TestClientDecode(unittest.TestCase):
+    @patch_request("servers_200")
+    def test_per_call(self, patched):
+        client = Client(config=APIConfig(api_key="test"))
+        assert [load_response("servers_200")["results"][0]] == list(client.get_servers(decode="dict"))
+
+    @patch_request("servers_200")
+    def test_cached_not_shared(self, patched):
+        client = Client(config=APIConfig(api_key="test", cache_enabled=True))
+        first = list(client.get_servers(decode="dict"))
+        first[0]["options"].append("changed")
+        second = list(client.get_servers(decode="dict"))
+        assert 1 == patched.call_count
+        assert load_response("servers_200")["results"] == second
+
+    @patch_request("server_200")
+    def test_config(self, patched):
+        client = Client(config=APIConfig(api_key="test", decode="trusted"))
+        server = client.get_server(server_id=0)
+        assert isinstance(server, Server)
+        assert Server(**load_response("server_200")) == server
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from vpsc.client import APIConfig
+from vpsc.disk_cache import REFRESH_TIMEOUT, InventoryCache
+from vpsc.models.generated import Server
+from tests.patch_request import load_response
+
+
+class TestInventoryCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.sqlite3")
+        self.config = APIConfig(api_key="test")
+        self.cache = InventoryCache(self.path, self.config)
+
+    def test_store(self):
+        assert self.cache.load("servers") is None
+        self.cache.store("servers", [{"id": 1}])
+        cached = self.cache.load("servers")
+        assert [{"id": 1}] == cached.items
+        assert 0 <= cached.age < 5
+
+        # 別プロセスから開いても同じ内容を参照できる
+        assert [{"id": 1}] == InventoryCache(self.path, self.config).load("servers").items
+
+        self.cache.invalidate("servers")
+        assert self.cache.load("servers") is None
+
+    def test_namespace(self):
+        self.cache.store("servers", [{"id": 1}])
+        other = InventoryCache(self.path, APIConfig(api_key="other"))
+        assert other.load("servers") is None
+
+    def test_refresh(self):
+        client = mock.MagicMock()
+        client.get_servers.return_value = iter(load_response("servers_200")["results"])
+        items = self.cache.refresh("servers", client)
+        client.get_servers.assert_called_once_with(decode="dict")
+        assert 0 == items[0]["id"]
+        assert items == self.cache.load("servers").items
+        assert 0 == Server.model_validate(items[0]).id
+
+    def test_refresh_in_background(self):
+        with mock.patch("vpsc.disk_cache.subprocess.Popen") as popen:
+            assert self.cache.refresh_in_background("servers")
+        args = popen.call_args.args[0]
+        assert ["-m", "vpsc.disk_cache", "servers"] == args[1:]
+        assert popen.call_args.kwargs["start_new_session"]
+
+    def test_refresh_in_background_once(self):
+        with mock.patch("vpsc.disk_cache.subprocess.Popen") as popen:
+            assert self.cache.refresh_in_background("servers")
+            # 更新中は別のプロセスからも更新を始めない
+            assert not InventoryCache(self.path, self.config).refresh_in_background("servers")
+            assert InventoryCache(self.path, APIConfig(api_key="other")).refresh_in_background("servers")
+            assert 2 == popen.call_count
+
+            # 更新が終わると次の更新を始められる
+            self.cache.store("servers", [{"id": 1}])
+            assert self.cache.refresh_in_background("servers")
+            assert 3 == popen.call_count
+
+    def test_refresh_in_background_timeout(self):
+        with mock.patch("vpsc.disk_cache.subprocess.Popen") as popen:
+            assert self.cache.refresh_in_background("servers")
+            with mock.patch("vpsc.disk_cache.time.time", return_value=time.time() + REFRESH_TIMEOUT + 1):
+                # 更新が終わらなかった場合は、時間が経てば次の更新を始める
+                assert self.cache.refresh_in_background("servers")
+        assert 2 == popen.call_count
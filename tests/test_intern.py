@@ -0,0 +1,77 @@
+import unittest
+
+from vpsc.client import Client, APIConfig
+from vpsc.decode import Decoder
+from vpsc.intern import Interner
+from vpsc.models import compact
+from vpsc.models.generated import Server
+from tests.patch_request import load_response, patch_request
+
+
+class TestInterner(unittest.TestCase):
+    def test_scalar(self):
+        interner = Interner()
+        first = "".join(["tk", "1"])
+        second = "".join(["tk", "1"])
+        assert first is not second
+        assert interner.scalar(first) is interner.scalar(second)
+        assert 1 is interner.scalar(1)
+        assert interner.scalar(True) is True
+        assert isinstance(interner.scalar(1.0), float)
+        assert interner.scalar(None) is None
+
+    def test_json(self):
+        interner = Interner()
+        first, second = load_response("server_200"), load_response("server_200")
+        assert first["zone"]["name"] is not second["zone"]["name"]
+        interner.json(first)
+        interner.json(second)
+        assert first["zone"]["name"] is second["zone"]["name"]
+        assert first["ipv4"]["nameservers"][0] is second["ipv4"]["nameservers"][0]
+        assert first["zone"] is not second["zone"]
+
+    def test_frozen(self):
+        interner = Interner()
+        first = interner.frozen(compact.Server.from_dict(load_response("server_200")))
+        second = interner.frozen(compact.Server.from_dict(dict(load_response("server_200"), id=2)))
+        assert first is not second
+        assert first.zone is second.zone
+        assert first.storage is second.storage
+        assert first.ipv4 is second.ipv4
+        assert isinstance(first.zone, compact.Zone)
+
+    def test_frozen_keeps_types(self):
+        interner = Interner()
+        data = {"plan_code": 1, "plan_name": "plan", "service_code": "100"}
+        contract = interner.frozen(compact.Contract.from_dict(data))
+        nfs_contract = interner.frozen(compact.Contract1.from_dict(data))
+        assert isinstance(contract, compact.Contract)
+        assert isinstance(nfs_contract, compact.Contract1)
+
+    def test_max_size(self):
+        interner = Interner(max_size=2)
+        interner.scalar("a")
+        interner.scalar("b")
+        interner.scalar("c")
+        assert 1 == len(interner)
+
+    def test_decoder(self):
+        decoder = Decoder(Server, "validate", interner=Interner())
+        first = decoder(load_response("server_200"))
+        second = decoder(load_response("server_200"))
+        assert first.contract.plan_name is second.contract.plan_name
+        assert first.zone is not second.zone
+
+
+class TestClientIntern(unittest.TestCase):
+    def test_disabled(self):
+        assert Client(config=APIConfig(api_key="test")).interner is None
+
+    @patch_request("servers_200")
+    def test_across_polls(self, patched):
+        client = Client(config=APIConfig(api_key="test", intern=True))
+        first = list(client.get_servers(decode="compact"))
+        second = list(client.get_servers(decode="compact"))
+        assert first == second
+        assert first[0] is second[0]
+        assert first[0].zone is second[0].zone
@@ -0,0 +1,112 @@
+import copy
+import unittest
+from unittest import mock
+
+from vpsc.client import Client, APIConfig
+from vpsc.exceptions import APIException
+from vpsc.inventory import Inventory
+from tests.patch_request import build_response, load_response
+
+
+class TestInventory(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(config=APIConfig(api_key="test"))
+        server = load_response("servers_200")["results"][0]
+        other = copy.deepcopy(server)
+        other.update(id=1, name="web")
+        other["ipv4"].update(address="198.51.100.3", hostname="web.example.jp")
+        other["zone"]["code"] = "is1"
+        self.servers = [dict(server, id=5), other]
+        nfs_server = dict(load_response("nfs_servers_200")["results"][0], id=7)
+        switch = dict(
+            load_response("switches_200")["results"][0], id=1, server_interfaces=[11], nfs_server_interfaces=[20]
+        )
+        self.listings = {
+            "/servers": self.servers,
+            "/nfs-servers": [nfs_server],
+            "/switches": [switch],
+            "/servers/5/interfaces": [],
+            "/servers/1/interfaces": load_response("server_interfaces_200")["results"],
+            "/nfs-servers/7/interfaces": load_response("nfs_server_interfaces_200")["results"],
+        }
+        patcher = mock.patch("requests.Session.request", side_effect=self.respond)
+        self.addCleanup(patcher.stop)
+        self.patched = patcher.start()
+
+    def respond(self, **kwargs):
+        path = kwargs["url"][len(self.client.config.host) :]
+        results = self.listings[path]
+        return build_response(200, {"count": len(results), "next": None, "previous": None, "results": results})
+
+    def test_indexes(self):
+        inventory = Inventory(self.client)
+        inventory.refresh()
+        assert 2 == len(inventory.servers)
+        assert 5 == inventory.servers.get(5).id
+        assert [1] == [server.id for server in inventory.servers.find(name="web")]
+        assert 1 == inventory.servers.first(address="198.51.100.3").id
+        assert 5 == inventory.servers.first(address="2001:e42:102:1501:153:121:89:107").id
+        assert 1 == inventory.servers.first(hostname="web.example.jp").id
+        assert [1] == [server.id for server in inventory.servers.find(zone="is1", service_code="100000000000")]
+        assert 7 == inventory.nfs_servers.first(address="198.51.100.2").id
+        assert 1 == inventory.switches.first(server_interface=11).id
+        assert inventory.servers.first(name="missing") is None
+        with self.assertRaises(ValueError):
+            inventory.servers.find(unknown="value")
+
+    def test_incremental_refresh(self):
+        inventory = Inventory(self.client)
+        inventory.refresh()
+        self.servers[1] = dict(self.servers[1], name="renamed")
+        del self.servers[0]
+        changes = inventory.refresh("servers")
+        assert ["servers"] == list(changes)
+        assert [("changed", 1), ("removed", 5)] == [(event.type, event.id) for event in changes["servers"]]
+        assert [] == inventory.servers.find(name="web")
+        assert 1 == inventory.servers.first(name="renamed").id
+        assert inventory.servers.get(5) is None
+        assert inventory.servers.first(address="198.51.100.2") is None
+
+    def test_interfaces(self):
+        inventory = Inventory(self.client, interfaces=True)
+        inventory.refresh()
+        assert [1] == [switch.id for switch in inventory.switches_of_server(1)]
+        assert [] == inventory.switches_of_server(5)
+        assert [1] == [server.id for server in inventory.servers_on_switch(1)]
+        assert [7] == [nfs_server.id for nfs_server in inventory.nfs_servers_on_switch(1)]
+        assert [1] == [switch.id for switch in inventory.switches_of_nfs_server(7)]
+
+        # 変更のないリソースのインターフェースは取得し直さない
+        self.patched.reset_mock()
+        inventory.refresh()
+        assert 3 == self.patched.call_count
+
+    def test_interfaces_not_loaded(self):
+        inventory = Inventory(self.client)
+        inventory.refresh()
+        with self.assertRaises(RuntimeError):
+            inventory.servers_on_switch(1)
+
+    def test_interfaces_retry(self):
+        inventory = Inventory(self.client, interfaces=True)
+        respond = self.respond
+
+        def unavailable(**kwargs):
+            if kwargs["url"].endswith("/servers/1/interfaces"):
+                return build_response(404, {"code": "not_found", "message": ""})
+            return respond(**kwargs)
+
+        self.patched.side_effect = unavailable
+        with self.assertRaises(APIException):
+            inventory.refresh()
+        assert 1 not in inventory.server_interfaces
+        assert [1] == [switch.id for switch in inventory.switches_of_nfs_server(7)]
+
+        # 一覧に変更がなくても、取得に失敗したインターフェースは次の更新で取得し直す
+        self.patched.side_effect = respond
+        inventory.refresh()
+        assert [1] == [switch.id for switch in inventory.switches_of_server(1)]
+        assert [1] == [server.id for server in inventory.servers_on_switch(1)]
+        self.patched.reset_mock()
+        inventory.refresh()
+        assert 3 == self.patched.call_count
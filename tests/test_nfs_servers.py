@@ -54,6 +54,16 @@ class TestServers(unittest.TestCase):
             data=data.model_dump_json(exclude_unset=True).encode("utf-8"),
         )
 
+    @patch_request("nfs_server_interfaces_200")
+    def test_get_nfs_server_interfaces(self, patched):
+        interfaces = list(self.client.get_nfs_server_interfaces(nfs_server_id=0))
+        assert [20] == [interface.id for interface in interfaces]
+        patched.assert_called_once_with(
+            method="get",
+            url=f"{self.client.config.host}/nfs-servers/0/interfaces",
+            headers={"Authorization": f"Bearer {self.client.config.api_key}"},
+        )
+
     @patch_request("nfs_server_power_status_200")
     def test_get_nfs_server_power_status(self, patched):
         result = self.client.get_nfs_server_power_status(nfs_server_id=0)
@@ -0,0 +1,198 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from vpsc.api_request import _page_url
+from vpsc.client import Client, APIConfig
+from tests.patch_request import build_response, load_response
+
+
+class FakePagedAPI:
+    """ページングを行うAPIのスタブ"""
+
+    def __init__(self, total: int, page_size: int):
+        self.total = total
+        self.page_size = page_size
+        self.urls = []
+        self.params = []
+        self.lock = threading.Lock()
+        self.item = load_response("server_200")
+
+    def __call__(self, method, url, headers, params=None, **kwargs):
+        with self.lock:
+            self.urls.append(url)
+            self.params.append(params)
+        query = parse_qs(urlsplit(url).query)
+        query.update({key: [str(value)] for key, value in (params or {}).items()})
+        page = int(query.get("page", ["1"])[0])
+        page_size = int(query.get("per_page", [self.page_size])[0])
+        start = (page - 1) * page_size
+        ids = range(start, min(start + page_size, self.total))
+        pages = -(-self.total // page_size)
+        return build_response(
+            200,
+            {
+                "count": self.total,
+                "next": f"https://api.example.com/servers?page={page + 1}&per_page={page_size}"
+                if page < pages
+                else None,
+                "previous": None,
+                "results": [dict(self.item, id=i) for i in ids],
+            },
+        )
+
+
+class TestPagination(unittest.TestCase):
+    def list_ids(self, **config):
+        api = FakePagedAPI(total=45, page_size=10)
+        client = Client(config=APIConfig(api_key="test", **config))
+        with mock.patch("requests.Session.request", side_effect=api):
+            ids = [server.id for server in client.get_servers()]
+        return api, ids
+
+    def test_sequential(self):
+        api, ids = self.list_ids()
+        assert list(range(45)) == ids
+        assert 5 == len(api.urls)
+
+    def test_concurrent(self):
+        api, ids = self.list_ids(page_workers=4)
+        assert list(range(45)) == ids
+        assert 5 == len(api.urls)
+        assert {f"https://api.example.com/servers?page={page}&per_page=10" for page in range(2, 6)} == set(
+            api.urls[1:]
+        )
+
+    def test_readahead(self):
+        api, ids = self.list_ids(page_readahead=True)
+        assert list(range(45)) == ids
+        assert 5 == len(api.urls)
+
+    def test_readahead_prefetch(self):
+        api = FakePagedAPI(total=20, page_size=10)
+        client = Client(config=APIConfig(api_key="test", page_readahead=True))
+        with mock.patch("requests.Session.request", side_effect=api):
+            servers = client.get_servers()
+            next(servers)
+            for _ in range(50):
+                if len(api.urls) == 2:
+                    break
+                threading.Event().wait(0.01)
+            # 1ページ目を処理している間に2ページ目を取得済み
+            assert 2 == len(api.urls)
+            assert list(range(1, 20)) == [server.id for server in servers]
+
+    def test_per_page(self):
+        api = FakePagedAPI(total=45, page_size=10)
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            assert list(range(45)) == [server.id for server in client.get_servers(per_page=20)]
+        assert 3 == len(api.urls)
+        assert [{"per_page": 20}, None, None] == api.params
+
+    def test_per_page_auto(self):
+        api = FakePagedAPI(total=250, page_size=10)
+        client = Client(config=APIConfig(api_key="test", per_page="auto"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            assert list(range(250)) == [server.id for server in client.get_servers()]
+        assert 3 == len(api.urls)
+
+    def test_limit(self):
+        api = FakePagedAPI(total=450, page_size=10)
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            servers = client.get_servers(sort="-memory_mebibytes", limit=10)
+            assert 10 == len(servers)
+            assert list(range(10)) == [server.id for server in servers]
+        assert 1 == len(api.urls)
+        assert {"ordering": "-memory_mebibytes", "per_page": 10} == api.params[0]
+
+    def test_limit_pages(self):
+        api = FakePagedAPI(total=450, page_size=10)
+        client = Client(config=APIConfig(api_key="test", page_workers=4))
+        with mock.patch("requests.Session.request", side_effect=api):
+            assert list(range(25)) == [server.id for server in client.get_servers(per_page=10, limit=25)]
+        assert 3 == len(api.urls)
+
+    def test_filter(self):
+        api = FakePagedAPI(total=30, page_size=10)
+        api.item = dict(api.item, name="web")
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            assert 30 == len(list(client.get_servers(name="web")))
+            # APIが絞り込まなかった場合もレスポンスを確認する
+            servers = client.get_servers(name="db", zone_code="is1")
+            # APIの件数は絞り込み前の件数のため使えない
+            with self.assertRaises(TypeError):
+                len(servers)
+            assert [] == list(servers)
+        assert {"name": "db", "zone_code": "is1"} == api.params[3]
+
+    def test_getitem(self):
+        api = FakePagedAPI(total=1000, page_size=10)
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            servers = client.get_servers()
+            assert 950 == servers[950].id
+            assert 999 == servers[-1].id
+            assert 3 == servers[3].id
+            assert [95, 96, 97, 98, 99, 100] == [server.id for server in servers[95:101]]
+            with self.assertRaises(IndexError):
+                servers[1000]
+            # 位置を指定した取得はイテレーターの位置に影響しない
+            assert 0 == next(servers).id
+        assert [
+            "https://api.example.com/servers?page=96&per_page=10",
+            "https://api.example.com/servers?page=100&per_page=10",
+            "https://api.example.com/servers?page=10&per_page=10",
+            "https://api.example.com/servers?page=11&per_page=10",
+        ] == api.urls[1:]
+
+    def test_page_cache(self):
+        api = FakePagedAPI(total=1000, page_size=10)
+        client = Client(config=APIConfig(api_key="test", page_cache_size=2))
+        with mock.patch("requests.Session.request", side_effect=api):
+            servers = client.get_servers()
+            for index in [15, 25, 15, 35, 25, 5]:
+                assert index == servers[index].id
+        assert [2, 3, 4, 3, 1] == [int(parse_qs(urlsplit(url).query)["page"][0]) for url in api.urls[1:]]
+
+    def test_getitem_filter(self):
+        api = FakePagedAPI(total=20, page_size=10)
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            with self.assertRaises(TypeError):
+                client.get_servers(name="web")[0]
+
+    def test_independent_results(self):
+        small = FakePagedAPI(total=3, page_size=10)
+        large = FakePagedAPI(total=25, page_size=10)
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=large):
+            servers = client.get_servers()
+            assert 0 == next(servers).id
+        with mock.patch("requests.Session.request", side_effect=small):
+            others = client.get_servers()
+        assert 25 == len(servers)
+        assert 3 == len(others)
+        with mock.patch("requests.Session.request", side_effect=large):
+            assert list(range(1, 25)) == [server.id for server in servers]
+        assert [0, 1, 2] == [server.id for server in others]
+        assert 25 == len(servers)
+
+    def test_threads(self):
+        api = FakePagedAPI(total=95, page_size=10)
+        client = Client(config=APIConfig(api_key="test", page_workers=2, coalesce_requests=False))
+        with mock.patch("requests.Session.request", side_effect=api):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: [server.id for server in client.get_servers()], range(16)))
+        assert [list(range(95))] * 16 == results
+        assert 16 * 10 == len(api.urls)
+
+    def test_page_url(self):
+        assert "https://api.example.com/?page=5&per_page=10" == _page_url(
+            "https://api.example.com/?page=3&per_page=10", 5
+        )
+        assert "https://api.example.com/?page=2" == _page_url("https://api.example.com/", 2)
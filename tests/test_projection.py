@@ -0,0 +1,57 @@
+import unittest
+
+from pydantic import ValidationError
+
+from vpsc.client import Client, APIConfig
+from vpsc.models.generated import Server, Switch
+from vpsc.projection import project
+from tests.patch_request import load_response, patch_request
+
+
+class TestProject(unittest.TestCase):
+    def test_project(self):
+        model = project(Server, ["id", "name", "power_status", "zone.code", "storage.size_gibibytes"])
+        server = model(**load_response("server_200"))
+        assert ["id", "name", "storage", "zone", "power_status"] == list(model.model_fields)
+        assert {"code"} == set(type(server.zone).model_fields)
+        assert "tk1" == server.zone.code
+        assert 100 == server.storage[0].size_gibibytes
+        assert not hasattr(server, "ipv4")
+
+    def test_optional(self):
+        model = project(Switch, ["external_connection.service_code"])
+        assert "100000000000" == model(**load_response("switch_200")).external_connection.service_code
+        assert model(external_connection=None).external_connection is None
+
+    def test_validate(self):
+        model = project(Server, ["id", "power_status"])
+        with self.assertRaises(ValidationError):
+            model(**dict(load_response("server_200"), power_status="new_status"))
+        # 指定していない項目は検証しない
+        assert 0 == model(**dict(load_response("server_200"), zone=None)).id
+
+    def test_cache(self):
+        assert project(Server, ["name", "id"]) is project(Server, ["id", "name", "id"])
+        assert Server is project(Server, None)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            project(Server, ["zone.unknown"])
+        with self.assertRaises(ValueError):
+            project(Server, ["name.first"])
+
+
+class TestClientProjection(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(config=APIConfig(api_key="test"))
+
+    @patch_request("servers_200")
+    def test_get_servers(self, patched):
+        servers = list(self.client.get_servers(fields=["id", "zone.code"]))
+        assert [(0, "tk1")] == [(server.id, server.zone.code) for server in servers]
+        assert not hasattr(servers[0], "name")
+
+    @patch_request("server_200")
+    def test_get_server(self, patched):
+        server = self.client.get_server(server_id=0, fields=["power_status"])
+        assert {"power_status"} == set(type(server).model_fields)
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from vpsc.client import Client, APIConfig
+from vpsc.ratelimit import RateLimiter, TokenBucket, FileTokenBucket
+from tests.patch_request import patch_request
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=3, clock=clock)
+        assert [0, 0, 0] == [bucket.reserve() for _ in range(3)]
+        assert 0.5 == bucket.reserve()
+        assert 1.0 == bucket.reserve()
+
+    def test_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=1, clock=clock)
+        assert 0 == bucket.reserve()
+        clock.now += 0.5
+        assert 0 == bucket.reserve()
+        clock.now += 10
+        # バースト以上は貯まらない
+        assert 0 == bucket.reserve()
+        assert 0.5 == bucket.reserve()
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, burst=0)
+
+    def test_acquire(self):
+        bucket = TokenBucket(rate=1, burst=1, clock=FakeClock())
+        with mock.patch("vpsc.ratelimit.sleep") as sleep:
+            bucket.acquire()
+            sleep.assert_not_called()
+            bucket.acquire()
+            sleep.assert_called_once_with(1.0)
+
+
+class TestFileTokenBucket(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "bucket")
+
+    def test_shared(self):
+        clock = FakeClock()
+        # 別プロセスを想定して、同じファイルを使う2つのバケットを作る
+        first = FileTokenBucket(self.path, rate=1, burst=2, clock=clock)
+        second = FileTokenBucket(self.path, rate=1, burst=2, clock=clock)
+        assert 0 == first.reserve()
+        assert 0 == second.reserve()
+        assert 1.0 == first.reserve()
+        clock.now += 3
+        assert 0 == second.reserve()
+
+    def test_from_config(self):
+        config = APIConfig(api_key="test")
+        assert RateLimiter.from_config(config) is None
+        config = APIConfig(api_key="test", rate_limit=5, rate_limit_burst=2)
+        assert isinstance(RateLimiter.from_config(config), TokenBucket)
+        config = APIConfig(api_key="test", rate_limit=5, rate_limit_file=self.path)
+        assert isinstance(RateLimiter.from_config(config), FileTokenBucket)
+
+
+class TestClientRateLimit(unittest.TestCase):
+    @patch_request("server_200")
+    def test_acquire_per_request(self, patched):
+        limiter = mock.MagicMock()
+        client = Client(config=APIConfig(api_key="test"), rate_limiter=limiter)
+        client.get_server(server_id=0)
+        client.get_server(server_id=1)
+        assert 2 == limiter.acquire.call_count
@@ -0,0 +1,103 @@
+import unittest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import requests
+
+from vpsc.client import Client, APIConfig
+from vpsc.exceptions import APIException
+from vpsc.retry import RetryPolicy, RetryBudget, parse_retry_after
+from tests.patch_request import build_response, load_response
+
+THROTTLED = {"code": "throttled", "message": "リクエストの処理は絞られました。"}
+UNAVAILABLE = {"code": "temporary_unavailable", "message": "一時的にご利用になれません。"}
+
+
+class TestRetry(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("vpsc.api_request.sleep")
+        self.addCleanup(patcher.stop)
+        self.sleep = patcher.start()
+
+    def request(self, responses, **config):
+        client = Client(config=APIConfig(api_key="test", **config))
+        patcher = mock.patch("requests.Session.request", side_effect=responses)
+        self.addCleanup(patcher.stop)
+        return client, patcher.start()
+
+    def test_retry_throttled(self):
+        client, patched = self.request(
+            [build_response(429, THROTTLED, {"Retry-After": "3"}), build_response(200, load_response("server_200"))]
+        )
+        assert 0 == client.get_server(server_id=0).id
+        assert 2 == patched.call_count
+        assert self.sleep.call_args.args[0] >= 3
+        assert 1 == client.retry.stats.snapshot()["retries"]
+        assert {429: 1} == client.retry.stats.snapshot()["by_status"]
+
+    def test_give_up(self):
+        client, patched = self.request([build_response(503, UNAVAILABLE)] * 3, max_retries=2)
+        with self.assertRaises(APIException) as e:
+            client.get_server(server_id=0)
+        assert 503 == e.exception.status
+        assert 3 == patched.call_count
+        assert 1 == client.retry.stats.snapshot()["give_ups"]
+
+    def test_not_retryable_status(self):
+        client, patched = self.request([build_response(404, {"code": "not_found", "message": ""})])
+        with self.assertRaises(APIException):
+            client.get_server(server_id=0)
+        assert 1 == patched.call_count
+
+    def test_unsafe_method(self):
+        client, patched = self.request([build_response(503, UNAVAILABLE), build_response(202)])
+        with self.assertRaises(APIException):
+            client.power_on_server(server_id=0)
+        assert 1 == patched.call_count
+
+        client, patched = self.request([build_response(503, UNAVAILABLE), build_response(202)], retry_unsafe=True)
+        assert client.power_on_server(server_id=0) is None
+        assert 2 == patched.call_count
+
+    def test_connection_error(self):
+        client, patched = self.request(
+            [requests.ConnectionError("reset"), build_response(200, load_response("server_200"))]
+        )
+        assert 0 == client.get_server(server_id=0).id
+        assert {"ConnectionError": 1} == client.retry.stats.snapshot()["by_status"]
+
+    def test_budget(self):
+        client, patched = self.request([build_response(429, THROTTLED, {"Retry-After": "120"})], retry_budget=60)
+        with self.assertRaises(APIException):
+            client.get_server(server_id=0)
+        self.sleep.assert_not_called()
+
+    def test_on_retry(self):
+        events = []
+        client = Client(config=APIConfig(api_key="test"), retry=RetryPolicy(on_retry=events.append))
+        responses = [build_response(503, UNAVAILABLE), build_response(200, load_response("server_200"))]
+        with mock.patch("requests.Session.request", side_effect=responses):
+            client.get_server(server_id=0)
+        assert 1 == len(events)
+        assert 503 == events[0].status
+        assert 1 == events[0].attempt
+
+    def test_compute_delay(self):
+        policy = RetryPolicy(backoff=1, max_backoff=4)
+        for attempt in range(10):
+            assert 0 <= policy.compute_delay(attempt) <= 4
+        assert 10 == policy.compute_delay(0, retry_after=10)
+
+    def test_budget_consume(self):
+        budget = RetryBudget(5)
+        assert budget.consume(3)
+        assert not budget.consume(3)
+        assert budget.consume(2)
+
+    def test_parse_retry_after(self):
+        assert 5 == parse_retry_after("5")
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("invalid") is None
+        date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        assert 25 < parse_retry_after(date) <= 30
@@ -0,0 +1,108 @@
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from vpsc import schema_cache
+from vpsc.models.base import BaseModel
+from vpsc.models.generated import Pagination, Server
+from vpsc.schema_cache import SchemaCache
+from tests.patch_request import load_response
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# 新しいプロセスで Server を検証し、スキーマキャッシュの状態を表示する
+CODE = """
+import json, sys
+from vpsc.models.generated import Server
+from vpsc.schema_cache import SchemaCache
+cache = SchemaCache(sys.argv[1])
+loaded = cache.load()
+schema_loaded = isinstance(Server.__dict__.get("__pydantic_core_schema__"), dict)
+server = Server.model_validate_json(sys.argv[2])
+print(loaded, schema_loaded, cache.save(), server.model_dump_json(exclude_unset=True) == sys.argv[2])
+"""
+
+# インポートしただけでスキーマを作成したモデルを表示する
+IMPORT_CODE = """
+from vpsc.models import generated
+models = [value for value in vars(generated).values() if getattr(value, "__module__", None) == generated.__name__]
+print([model.__name__ for model in models if model.__pydantic_complete__])
+"""
+
+
+class TestDeferredBuild(unittest.TestCase):
+    def test_defer_build(self):
+        class Sample(BaseModel):
+            id: int
+
+        assert not Sample.__pydantic_complete__
+        assert 1 == Sample.model_validate({"id": 1}).id
+        assert Sample.__pydantic_complete__
+
+    def test_import(self):
+        res = subprocess.run(
+            [sys.executable, "-c", IMPORT_CODE], env=dict(os.environ, PYTHONPATH=ROOT), capture_output=True, text=True
+        )
+        assert "[]" == res.stdout.strip()
+
+
+class TestSchemaCache(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "schemas.pickle")
+        self.addCleanup(lambda: os.path.exists(self.path) and os.remove(self.path))
+
+    def run_process(self) -> list:
+        server = Server.model_validate(load_response("server_200")).model_dump_json(exclude_unset=True)
+        res = subprocess.run(
+            [sys.executable, "-c", CODE, self.path, server],
+            env=dict(os.environ, PYTHONPATH=ROOT),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return res.stdout.split()
+
+    @unittest.skipUnless(schema_cache.SUPPORTED, "pydantic 2.10 or later is required")
+    def test_reuse(self):
+        loaded, schema_loaded, saved, same = self.run_process()
+        assert ("0", "False", "True") == (loaded, schema_loaded, same)
+        assert int(saved) > 0
+
+        loaded, schema_loaded, saved, same = self.run_process()
+        assert int(loaded) > 0
+        assert ("True", "0", "True") == (schema_loaded, saved, same)
+
+    @unittest.skipUnless(schema_cache.SUPPORTED, "pydantic 2.10 or later is required")
+    def test_save(self):
+        Server.model_validate(load_response("server_200"))
+        Pagination.model_validate({"count": 0, "next": None, "previous": None})
+        cache = SchemaCache(self.path)
+        assert cache.save() > 0
+        assert "vpsc.models.generated.Server" in cache.schemas
+        # URLの型を含むスキーマは pickle できないため保存しない
+        assert "vpsc.models.generated.Pagination" not in cache.schemas
+        assert 0 == cache.save()
+
+    def test_key_mismatch(self):
+        with open(self.path, "wb") as f:
+            pickle.dump({"key": "other", "schemas": {"vpsc.models.generated.Server": b""}}, f)
+        cache = SchemaCache(self.path)
+        assert 0 == cache.load()
+        assert {} == cache.schemas
+
+    def test_broken_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"broken")
+        assert 0 == SchemaCache(self.path).load()
+
+    def test_unsupported(self):
+        with mock.patch.object(schema_cache, "SUPPORTED", False):
+            cache = SchemaCache(self.path)
+        Server.model_validate(load_response("server_200"))
+        assert 0 == cache.save()
+        assert not os.path.exists(self.path)
+        assert 0 == cache.load()
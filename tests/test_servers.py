@@ -30,6 +30,48 @@ class TestServers(unittest.TestCase):
             headers={"Authorization": f"Bearer {self.client.config.api_key}"},
         )
 
+    @patch_request("servers_200")
+    def test_get_servers_per_page(self, patched):
+        self.client.get_servers(per_page=50)
+        patched.assert_called_once_with(
+            method="get",
+            url=f"{self.client.config.host}/servers",
+            headers={"Authorization": f"Bearer {self.client.config.api_key}"},
+            params={"per_page": 50},
+        )
+
+        patched.reset_mock()
+        self.client.get_servers(per_page="auto")
+        assert {"per_page": 100} == patched.call_args.kwargs["params"]
+
+        with self.assertRaises(ValueError):
+            self.client.get_servers(per_page=0)
+
+    @patch_request("server_200")
+    def test_get_server_config_per_page(self, patched):
+        # 設定の per_page は一覧の取得にだけ使う
+        client = Client(config=APIConfig(api_key="test", per_page="auto"))
+        client.get_server(server_id=1)
+        assert "params" not in patched.call_args.kwargs
+
+    @patch_request("servers_200")
+    def test_get_servers_config_per_page(self, patched):
+        client = Client(config=APIConfig(api_key="test", per_page="auto"))
+        list(client.get_servers())
+        assert {"per_page": 100} == patched.call_args.kwargs["params"]
+        client.get_server_interfaces(server_id=1)
+        assert {"per_page": 100} == patched.call_args.kwargs["params"]
+
+    @patch_request("server_interfaces_200")
+    def test_get_server_interfaces(self, patched):
+        interfaces = list(self.client.get_server_interfaces(server_id=1))
+        assert [1] == [interface.switch_id for interface in interfaces if interface.connect_to == "switch"]
+        patched.assert_called_once_with(
+            method="get",
+            url=f"{self.client.config.host}/servers/1/interfaces",
+            headers={"Authorization": f"Bearer {self.client.config.api_key}"},
+        )
+
     @patch_request("empty_list_200")
     def test_get_servers_empty(self, patched):
         servers = self.client.get_servers()
@@ -133,6 +175,12 @@ class TestServers(unittest.TestCase):
             headers={"Authorization": f"Bearer {self.client.config.api_key}", "content-type": "application/json"},
         )
 
+    @patch_request("status_202")
+    def test_headers_not_shared(self, patched):
+        self.client.power_on_server(server_id=0)
+        self.client.get_server_power_status(server_id=0)
+        assert {"Authorization": f"Bearer {self.client.config.api_key}"} == patched.call_args.kwargs["headers"]
+
     @patch_request("server_ptr_200")
     def test_server_ipv4_ptr(self, patched):
         data = UpdateHost(hostname="example.com")
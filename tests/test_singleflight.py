@@ -0,0 +1,133 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from vpsc.client import Client, APIConfig
+from vpsc.exceptions import APIException
+from vpsc.singleflight import SingleFlight
+from tests.patch_request import build_response, load_response
+
+
+class GatedAPI:
+    """最初のリクエストが揃うまで応答を止めるAPIのスタブ"""
+
+    def __init__(self, response):
+        self.response = response
+        self.release = threading.Event()
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, **kwargs):
+        with self.lock:
+            self.calls += 1
+        self.release.wait(5)
+        return self.response
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_share(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flight.do, "key", func) for _ in range(4)]
+            threading.Event().wait(0.1)
+            release.set()
+            assert ["result"] * 4 == [future.result() for future in futures]
+        assert [1] == calls
+        # 完了後は再度実行される
+        assert "result" == flight.do("key", func)
+        assert [1, 1] == calls
+
+    def test_share_copy(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        result = ["result"]
+
+        def func():
+            release.wait(5)
+            return result
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(flight.do, "key", func, list) for _ in range(3)]
+            threading.Event().wait(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+        # 実行した呼び出しはそのまま、待った呼び出しは share を適用した結果を受け取る
+        assert [result] * 3 == results
+        assert 1 == sum(item is result for item in results)
+
+    def test_error(self):
+        flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do("key", lambda: (_ for _ in ()).throw(ValueError()))
+        assert "ok" == flight.do("key", lambda: "ok")
+
+
+class TestClientCoalescing(unittest.TestCase):
+    def run_concurrently(self, client, func, count=8):
+        executor = ThreadPoolExecutor(max_workers=count)
+        self.addCleanup(executor.shutdown)
+        futures = [executor.submit(func) for _ in range(count)]
+        threading.Event().wait(0.1)
+        return futures
+
+    def test_get_server(self):
+        api = GatedAPI(build_response(200, load_response("server_200")))
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            futures = self.run_concurrently(client, lambda: client.get_server(server_id=0))
+            api.release.set()
+            servers = [future.result() for future in futures]
+        assert 1 == api.calls
+        assert all(server.id == 0 for server in servers)
+        # 呼び出し元ごとに別のモデルを返す
+        assert 8 == len({id(server) for server in servers})
+
+    def test_get_servers(self):
+        api = GatedAPI(build_response(200, load_response("servers_200")))
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            futures = self.run_concurrently(client, lambda: [server.id for server in client.get_servers()])
+            api.release.set()
+            assert [[0]] * 8 == [future.result() for future in futures]
+        assert 1 == api.calls
+
+    def test_get_servers_dict(self):
+        api = GatedAPI(build_response(200, load_response("servers_200")))
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            futures = self.run_concurrently(client, lambda: list(client.get_servers(decode="dict")), count=4)
+            api.release.set()
+            results = [future.result()[0] for future in futures]
+        assert 1 == api.calls
+        # 共有した結果は呼び出し元ごとに複製する
+        assert 4 == len({id(item["options"]) for item in results})
+
+    def test_error(self):
+        api = GatedAPI(build_response(404, {"code": "not_found", "message": ""}))
+        client = Client(config=APIConfig(api_key="test"))
+        with mock.patch("requests.Session.request", side_effect=api):
+            futures = self.run_concurrently(client, lambda: client.get_server(server_id=0), count=4)
+            api.release.set()
+            for future in futures:
+                with self.assertRaises(APIException):
+                    future.result()
+        assert 1 == api.calls
+
+    def test_disabled(self):
+        api = GatedAPI(build_response(200, load_response("server_200")))
+        client = Client(config=APIConfig(api_key="test", coalesce_requests=False))
+        assert client.client.singleflight is None
+        with mock.patch("requests.Session.request", side_effect=api):
+            futures = self.run_concurrently(client, lambda: client.get_server(server_id=0), count=4)
+            api.release.set()
+            [future.result() for future in futures]
+        assert 4 == api.calls
@@ -0,0 +1,180 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+import requests
+
+from vpsc.client import Client, APIConfig
+from vpsc.models.generated import Server
+from vpsc.stream import JSONScanner, StreamingPage
+from tests.patch_request import build_response, load_response
+
+
+def chunked(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class ReadCountingBody(io.BytesIO):
+    """読み込んだバイト数を記録するボディ"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.read_bytes = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.read_bytes += len(chunk)
+        return chunk
+
+
+def stream_response(data: dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = ReadCountingBody(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+    return response
+
+
+class TestStreamingPage(unittest.TestCase):
+    data = {
+        "count": 3,
+        "next": None,
+        "results": [
+            {"id": 1, "name": 'a "quoted" ] name', "tags": [[1, 2], {"x": "}"}]},
+            {"id": 2, "name": "エスケープ\\\\", "value": -1.5e3},
+            {"id": 3, "name": "", "value": None, "flag": True},
+        ],
+        "previous": "https://api.example.com/servers?page=1",
+    }
+
+    def test_chunk_boundaries(self):
+        body = json.dumps(self.data, ensure_ascii=False).encode("utf-8")
+        for size in (1, 2, 3, 7, 64, len(body)):
+            page = StreamingPage(chunked(body, size)).open()
+            assert page.paged
+            assert {"count": 3, "next": None} == page.meta
+            assert self.data["results"] == list(page.results())
+            assert self.data["previous"] == page.meta["previous"]
+
+    def test_not_paged(self):
+        page = StreamingPage(chunked(b'{"id": 1, "name": "a"}', 4)).open()
+        assert not page.paged
+        assert {"id": 1, "name": "a"} == page.meta
+        assert [] == list(page.results())
+
+    def test_scalars(self):
+        scanner = JSONScanner(chunked('[12345, true ,null,"a\\"b", "日本語"]'.encode("utf-8"), 3))
+        scanner.expect("[")
+        assert 12345 == scanner.value()
+        scanner.expect(",")
+        assert scanner.value() is True
+        scanner.expect(",")
+        assert scanner.value() is None
+        scanner.expect(",")
+        assert 'a"b' == scanner.value()
+        scanner.expect(",")
+        assert "日本語" == scanner.value()
+
+    def test_truncated(self):
+        page = StreamingPage(chunked(b'{"count": 2, "results": [{"id": 1}, {"id": ', 5))
+        with self.assertRaises(ValueError):
+            list(page.results())
+
+    def test_buffer_holds_one_item(self):
+        body = json.dumps({"count": 100, "results": [{"id": i, "name": "x" * 100} for i in range(100)]}).encode()
+        page = StreamingPage(chunked(body, 16))
+        peak = 0
+        for _ in page.results():
+            peak = max(peak, len(page.scanner.buf))
+        assert peak < 200
+
+
+class TestStreamingRequest(unittest.TestCase):
+    def setUp(self):
+        self.item = load_response("server_200")
+        self.client = Client(config=APIConfig(api_key="test", stream=True, stream_chunk_size=64))
+
+    def pages(self, total: int, page_size: int):
+        responses = []
+        for start in range(0, total, page_size):
+            page = start // page_size + 1
+            responses.append(
+                stream_response(
+                    {
+                        "count": total,
+                        "next": f"https://api.example.com/servers?page={page + 1}"
+                        if start + page_size < total
+                        else None,
+                        "previous": None,
+                        "results": [dict(self.item, id=i) for i in range(start, min(start + page_size, total))],
+                    }
+                )
+            )
+        return responses
+
+    def test_pages(self):
+        responses = self.pages(total=25, page_size=10)
+        with mock.patch("requests.Session.request", side_effect=responses) as patched:
+            result = self.client.get_servers()
+            assert 25 == len(result)
+            servers = list(result)
+        assert list(range(25)) == [server.id for server in servers]
+        assert all(isinstance(server, Server) for server in servers)
+        assert 3 == patched.call_count
+        assert all(call.kwargs["stream"] for call in patched.call_args_list)
+        assert "https://api.example.com/servers?page=2" == patched.call_args_list[1].kwargs["url"]
+
+    def test_first_item_before_body(self):
+        responses = self.pages(total=10, page_size=10)
+        with mock.patch("requests.Session.request", side_effect=responses):
+            result = self.client.get_servers()
+            first = next(result)
+        body = responses[0].raw
+        assert 0 == first.id
+        assert body.read_bytes < len(body.getvalue()) / 2
+
+    def test_limit(self):
+        responses = self.pages(total=25, page_size=10)
+        with mock.patch("requests.Session.request", side_effect=responses) as patched:
+            ids = [server.id for server in self.client.get_servers(limit=3)]
+        assert [0, 1, 2] == ids
+        assert 1 == patched.call_count
+
+    def test_single_resource(self):
+        with mock.patch("requests.Session.request", return_value=stream_response(self.item)):
+            server = self.client.get_server(server_id=self.item["id"])
+        assert self.item["id"] == server.id
+
+    def test_disabled_per_call(self):
+        with mock.patch("requests.Session.request", side_effect=self.pages(total=5, page_size=10)) as patched:
+            ids = [item["id"] for item in self.client.client.request("/servers", "get", stream=False)]
+        assert list(range(5)) == ids
+        assert "stream" not in patched.call_args.kwargs
+
+    def test_filter(self):
+        self.item = dict(self.item, name="web")
+        with mock.patch("requests.Session.request", side_effect=self.pages(total=5, page_size=10)):
+            servers = self.client.get_servers(name="db")
+            with self.assertRaises(TypeError):
+                len(servers)
+            assert [] == list(servers)
+
+    def test_close_retried_response(self):
+        throttled = build_response(429, {"code": "throttled", "message": "throttled"}, {"Retry-After": "0"})
+        throttled.close = mock.Mock()
+        with mock.patch("vpsc.api_request.sleep"), mock.patch(
+            "requests.Session.request", side_effect=[throttled, *self.pages(total=5, page_size=10)]
+        ):
+            ids = [server.id for server in self.client.get_servers()]
+        assert list(range(5)) == ids
+        throttled.close.assert_called_once_with()
+
+    def test_count_after_results(self):
+        # リポジトリのレスポンスと同じく results の後ろに count がある場合
+        with mock.patch("requests.Session.request", return_value=stream_response(load_response("servers_200"))):
+            result = self.client.get_servers()
+            with self.assertRaises(TypeError):
+                len(result)
+            servers = list(result)
+        assert 1 == len(servers)
+        assert 1 == len(result)
@@ -0,0 +1,45 @@
+import unittest
+from unittest import mock
+
+from vpsc.client import Client, APIConfig
+from vpsc.transport import RequestsTransport, TimeoutHTTPAdapter
+from tests.patch_request import patch_request
+
+
+class TestTransport(unittest.TestCase):
+    def test_pool_config(self):
+        config = APIConfig(api_key="test", pool_size=32, connect_timeout=1.5, read_timeout=7)
+        transport = RequestsTransport(config)
+        adapter = transport.session.get_adapter(config.host)
+        assert isinstance(adapter, TimeoutHTTPAdapter)
+        assert 32 == adapter._pool_maxsize
+        assert (1.5, 7) == adapter.timeout
+        assert "keep-alive" == transport.session.headers["Connection"]
+
+    def test_keep_alive_disabled(self):
+        transport = RequestsTransport(APIConfig(api_key="test", keep_alive=False))
+        assert "close" == transport.session.headers["Connection"]
+
+    def test_default_timeout(self):
+        adapter = TimeoutHTTPAdapter(timeout=(1, 2))
+        with mock.patch("requests.adapters.HTTPAdapter.send") as send:
+            adapter.send("request")
+            send.assert_called_once_with("request", timeout=(1, 2))
+
+            send.reset_mock()
+            adapter.send("request", timeout=5)
+            send.assert_called_once_with("request", timeout=5)
+
+    @patch_request("server_200")
+    def test_shared_session(self, patched):
+        client = Client(config=APIConfig(api_key="test"))
+        client.get_server(server_id=1)
+        client.get_server(server_id=2)
+        assert client.client.transport is client.transport
+        assert 2 == patched.call_count
+
+    def test_close(self):
+        transport = mock.MagicMock()
+        with Client(config=APIConfig(api_key="test"), transport=transport) as client:
+            assert transport is client.client.transport
+        transport.close.assert_called_once_with()
@@ -0,0 +1,64 @@
+import unittest
+from unittest import mock
+
+from vpsc.client import Client, APIConfig
+from vpsc.exceptions import WaitTimeout
+from vpsc.waiter import wait_until
+from tests.patch_request import build_response, load_response
+
+
+class TestWaitUntil(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("vpsc.waiter.sleep")
+        self.addCleanup(patcher.stop)
+        self.mock_sleep = patcher.start()
+
+    def test_backoff(self):
+        values = iter([1, 2, 3, 4, 5])
+        result = wait_until(lambda: next(values), lambda value: value == 5, interval=1.0, max_interval=3.0, factor=2)
+        assert 5 == result
+        assert [1.0, 2.0, 3.0, 3.0] == [call.args[0] for call in self.mock_sleep.call_args_list]
+
+    def test_done_immediately(self):
+        assert "power_on" == wait_until(lambda: "power_on", lambda value: value == "power_on")
+        self.mock_sleep.assert_not_called()
+
+    def test_timeout(self):
+        with self.assertRaises(WaitTimeout) as cm:
+            wait_until(lambda: "in_shutdown", lambda value: value == "power_off", timeout=0)
+        assert "in_shutdown" == cm.exception.last
+
+
+class TestWaitForPowerStatus(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("vpsc.waiter.sleep")
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.client = Client(config=APIConfig(api_key="test", cache_enabled=True))
+
+    def test_server(self):
+        responses = [build_response(200, {"status": "in_shutdown"}), build_response(200, {"status": "power_off"})]
+        with mock.patch("requests.Session.request", side_effect=responses) as patched:
+            result = self.client.wait_for_power_status(server_id=1, target="power_off")
+        assert "power_off" == result.status
+        # レスポンスキャッシュが有効でも毎回取得する
+        assert 2 == patched.call_count
+
+    def test_nfs_server(self):
+        responses = [build_response(200, {"status": "unknown"}), build_response(200, {"status": "power_on"})]
+        with mock.patch("requests.Session.request", side_effect=responses) as patched:
+            result = self.client.wait_for_nfs_server_power_status(nfs_server_id=1, target="power_on")
+        assert "power_on" == result.status
+        assert f"{self.client.config.host}/nfs-servers/1/power-status" == patched.call_args.kwargs["url"]
+
+    def test_servers(self):
+        listing = load_response("servers_200")
+        server_id = listing["results"][0]["id"]
+        off = dict(listing, results=[dict(listing["results"][0], power_status="power_off")])
+        on = dict(listing, results=[dict(listing["results"][0], power_status="power_on")])
+        with mock.patch(
+            "requests.Session.request", side_effect=[build_response(200, off), build_response(200, on)]
+        ) as patched:
+            result = self.client.wait_for_servers_power_status([server_id], target="power_on")
+        assert {server_id: "power_on"} == result
+        assert all(call.kwargs["url"] == f"{self.client.config.host}/servers" for call in patched.call_args_list)
@@ -0,0 +1,73 @@
+import copy
+import unittest
+from unittest import mock
+
+from vpsc.client import Client, APIConfig
+from vpsc.models.generated import Server
+from vpsc.watch import Watcher, diff
+from tests.patch_request import build_response, load_response
+
+
+class TestDiff(unittest.TestCase):
+    def test_nested(self):
+        old = {"name": "a", "ipv4": {"address": "192.0.2.1", "ptr": "a.example.jp"}, "removed": 1}
+        new = {"name": "a", "ipv4": {"address": "192.0.2.1", "ptr": "b.example.jp"}, "added": 2}
+        assert {
+            "ipv4.ptr": ("a.example.jp", "b.example.jp"),
+            "added": (None, 2),
+            "removed": (1, None),
+        } == diff(old, new)
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.server = load_response("servers_200")["results"][0]
+        self.listings = []
+        self.watcher = Watcher(lambda: self.listings.pop(0), response_obj=Server)
+
+    def test_poll(self):
+        changed = copy.deepcopy(self.server)
+        changed["power_status"] = "power_off"
+        added = dict(copy.deepcopy(self.server), id=self.server["id"] + 1)
+        self.listings = [[self.server], [self.server], [changed, added], [added]]
+
+        assert [("added", self.server["id"])] == [(e.type, e.id) for e in self.watcher.poll()]
+        assert [] == self.watcher.poll()
+
+        events = self.watcher.poll()
+        assert [("changed", self.server["id"]), ("added", added["id"])] == [(e.type, e.id) for e in events]
+        assert {"power_status": (self.server["power_status"], "power_off")} == events[0].changes
+        assert "power_off" == events[0].resource.power_status
+
+        events = self.watcher.poll()
+        assert [("removed", self.server["id"])] == [(e.type, e.id) for e in events]
+
+    def test_skip_validation(self):
+        self.listings = [[self.server], [copy.deepcopy(self.server)]]
+        self.watcher.poll()
+        with mock.patch.object(self.watcher, "response_obj") as patched:
+            assert [] == self.watcher.poll()
+        patched.assert_not_called()
+
+    def test_watch(self):
+        changed = dict(copy.deepcopy(self.server), name="renamed")
+        self.listings = [[self.server], [self.server], [changed]]
+        with mock.patch("vpsc.watch.sleep") as patched:
+            events = self.watcher.watch(interval=3, initial=False)
+            event = next(events)
+        assert ("changed", {"name": (self.server["name"], "renamed")}) == (event.type, event.changes)
+        assert [mock.call(3), mock.call(3)] == patched.call_args_list
+
+
+class TestWatchServers(unittest.TestCase):
+    def test_watch_servers(self):
+        client = Client(config=APIConfig(api_key="test", cache_enabled=True))
+        listing = load_response("servers_200")
+        renamed = dict(listing, results=[dict(listing["results"][0], name="renamed")])
+        responses = [build_response(200, listing), build_response(200, renamed)]
+        with mock.patch("requests.Session.request", side_effect=responses), mock.patch("vpsc.watch.sleep"):
+            events = client.watch_servers(interval=1)
+            assert "added" == next(events).type
+            event = next(events)
+        assert "changed" == event.type
+        assert "renamed" == event.resource.name
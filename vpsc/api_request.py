@@ -4,59 +4,323 @@ APIへのリクエストを直接的に行なっているモジュールです
 ページングなどの処理もこちらで対応。
 
 """
+import math
+import threading
+from collections import OrderedDict, deque
 from collections.abc import Sized, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
 from types import MappingProxyType
-from typing import Literal, Optional, Type, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple, Type, TYPE_CHECKING
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-import requests
 from pydantic import BaseModel
 
+from .cache import ResponseCache
+from .codec import Codec, get_codec
+from .decode import Decoder, copy_json, decode_mode
+from .intern import Interner
 from .exceptions import APIException
+from .projection import project
+from .models.custom import per_page_query
+from .ratelimit import RateLimiter
+from .retry import RetryBudget, RetryPolicy
+from .singleflight import SingleFlight
+from .stream import StreamingPage, StreamingResult
+from .transport import Transport, RequestsTransport
 
 if TYPE_CHECKING:
     from client import APIConfig
 
+# APIが受け付ける1ページあたりの最大件数
+MAX_PER_PAGE = 100
 
-class APIRequest(Iterator, Sized):
-    unsafe_methods = ["post", "put", "delete"]
-    generator = None
-    count = 0
 
-    def __init__(self, config: "APIConfig", header: MappingProxyType):
-        self.config = config
-        self.headers = dict(header)
-        self.headers["Authorization"] = f"Bearer {self.config.api_key}"
+def _resolve_per_page(per_page: Optional[per_page_query]) -> Optional[int]:
+    """
+    1ページあたりの件数を決める
 
-    def __len__(self):
-        if self.count is None:
-            raise ValueError("request first")
+    :param per_page: 件数。``auto`` の場合はAPIが受け付ける最大件数
+    :return:
+    """
+    if per_page is None:
+        return None
+    if per_page == "auto":
+        return MAX_PER_PAGE
+    if not 1 <= per_page <= MAX_PER_PAGE:
+        raise ValueError(f"per_page must be between 1 and {MAX_PER_PAGE}")
+    return per_page
+
+
+def _build_params(
+    per_page: Optional[per_page_query], limit: Optional[int] = None, params: Optional[dict] = None
+) -> Optional[dict]:
+    """
+    一覧取得のクエリを組み立てる
+
+    limit を指定した場合は、1ページあたりの件数を limit 以下にします
+
+    :param per_page: 1ページあたりの件数
+    :param limit: 取得する最大件数
+    :param params: その他のクエリ。値が None のものは送信しません
+    :return:
+    """
+    query = {key: value for key, value in (params or {}).items() if value is not None}
+    per_page = _resolve_per_page(per_page)
+    if limit is not None:
+        if limit < 1:
+            raise ValueError("limit must be 1 or more")
+        per_page = min(per_page or MAX_PER_PAGE, limit)
+    if per_page is not None:
+        query["per_page"] = per_page
+    return query or None
+
+
+def _match_fields(fields: Dict[str, Tuple[str, ...]], criteria: Dict[str, Any]) -> Optional[Callable[[dict], bool]]:
+    """
+    レスポンスの項目が条件に一致するか判定する関数を作る
+
+    :param fields: 条件の名前と、レスポンスで対応する項目のパス
+    :param criteria: 条件の名前と値。値が None の条件は無視します
+    :return: 条件がない場合は None
+    """
+    criteria = {name: value for name, value in criteria.items() if value is not None}
+    if not criteria:
+        return None
+
+    def where(item: dict) -> bool:
+        for name, value in criteria.items():
+            current = item
+            for key in fields[name]:
+                current = current.get(key) if isinstance(current, dict) else None
+            if current != value:
+                return False
+        return True
+
+    return where
+
+
+def _page_url(url: str, page: int) -> str:
+    """
+    ページングのURLのページ番号を差し替える
+
+    :param url: 次ページのURL
+    :param page: ページ番号
+    :return:
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query)
+    if any(key == "page" for key, _ in query):
+        query = [(key, str(page) if key == "page" else value) for key, value in query]
+    else:
+        query.append(("page", str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
 
+
+class PagedResult(Iterator, Sized):
+    """
+    一覧取得の結果
+
+    呼び出しごとに作られ、件数と取得位置をそれぞれで保持します。
+    そのため、同じ ``Client`` から複数のスレッドで同時に一覧を取得できます
+
+    limit を指定した場合は、その件数を返した時点で以降のページを取得しません。
+    where を指定した場合は、一致しない要素をモデルに変換せずに読み飛ばします。
+    APIの件数は絞り込み前の件数のため、 where を指定した場合は ``len()`` を使えません
+
+    ``result[950]`` や ``result[100:120]`` のように位置を指定して取得することもできます。
+    その場合は件数と1ページ目の件数から該当するページだけを取得し、
+    取得したページは ``page_cache_size`` ページまで保持します。
+    位置を指定した取得はイテレーターの取得位置には影響しません
+    """
+
+    def __init__(
+        self,
+        request: "APIRequest",
+        prefetch_data: dict,
+        response_obj: Optional[Type[BaseModel]],
+        limit: Optional[int] = None,
+        where: Optional[Callable[[dict], bool]] = None,
+        decode: Optional[decode_mode] = None,
+        **request_args,
+    ):
+        self.request = request
+        self.config = request.config
+        self.response_obj = response_obj
+        self.decoder = request.decoder(response_obj, decode)
+        self.limit = limit
+        self.where = where
+        self.count = prefetch_data.get("count", len(prefetch_data["results"]))
+        if limit is not None:
+            self.count = min(self.count, limit)
+        # 2ページ目以降は next のURLにクエリが含まれている
+        request_args.pop("params", None)
+        self.generator = self.__generator(prefetch_data, **request_args)
+        self._lock = threading.Lock()
+        self._request_args = request_args
+        self._next_url = prefetch_data.get("next")
+        self._page_size = len(prefetch_data["results"])
+        self._page_cache: "OrderedDict[int, list]" = OrderedDict([(1, prefetch_data["results"])])
+        self._page_lock = threading.Lock()
+
+    def __len__(self):
+        if self.where is not None:
+            raise TypeError("len() is not supported with filters")
         return self.count
 
     def __iter__(self):
-        if self.generator is None:
-            raise NotImplementedError()
         return self
 
     def __next__(self):
-        if self.generator is None:
-            raise NotImplementedError()
-        return next(self.generator)
+        with self._lock:
+            return next(self.generator)
 
-    def __generator(self, prefetch_data: dict, response_obj: Optional[Type[BaseModel]], per_page: int, **request_args):
-        for item in prefetch_data["results"]:
-            yield response_obj(**item)
+    def __getitem__(self, index):
+        if self.where is not None:
+            raise TypeError("random access is not supported with filters")
+        if isinstance(index, slice):
+            return [self.__item(i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("PagedResult index out of range")
+        return self.__item(index)
+
+    def __item(self, index: int):
+        page = self.__page(index // self._page_size + 1) if self._page_size else []
+        offset = index % self._page_size if self._page_size else 0
+        if offset >= len(page):
+            # 取得中に件数が変わった場合
+            raise IndexError("PagedResult index out of range")
+        item = page[offset]
+        return self.decoder(item)
+
+    def __page(self, number: int) -> list:
+        """
+        ページ番号を指定してページを取得する
+
+        取得したページは最近使った順に ``page_cache_size`` ページまで保持します
+        """
+        with self._page_lock:
+            results = self._page_cache.get(number)
+            if results is not None:
+                self._page_cache.move_to_end(number)
+                return results
+            if self._next_url is None:
+                return []
+            url = _page_url(self._next_url, number)
+            results = self.request._fetch(**dict(self._request_args, url=url))["results"]
+            self._page_cache[number] = results
+            while len(self._page_cache) > max(1, self.config.page_cache_size):
+                self._page_cache.popitem(last=False)
+            return results
+
+    def __generator(self, prefetch_data: dict, **request_args):
+        remaining = self.limit
+        for page in self.__pages(prefetch_data, **request_args):
+            for item in page["results"]:
+                if self.where is not None and not self.where(item):
+                    continue
+                yield self.decoder(item)
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining <= 0:
+                        # 必要な件数に達したので、以降のページは取得しない
+                        return
+
+    def __pages(self, prefetch_data: dict, **request_args):
         next_url = prefetch_data.get("next")
-        if not next_url:
-            return
+        page_size = len(prefetch_data["results"])
+        if (
+            next_url
+            and self.config.page_workers > 1
+            and page_size
+            and prefetch_data.get("count")
+            and self.limit is None
+        ):
+            # 総数からページ数が分かるので、残りのページを並列で取得する
+            pages = math.ceil(prefetch_data["count"] / page_size)
+            urls = [_page_url(next_url, page) for page in range(2, pages + 1)]
+            yield prefetch_data
+            yield from self.__fetch_concurrently(urls, **request_args)
+        elif next_url and self.config.page_readahead:
+            yield from self.__fetch_readahead(prefetch_data, **request_args)
+        else:
+            yield prefetch_data
+            # 2ページ目から取得
+            while next_url:
+                request_args["url"] = next_url
+                results = self.request._fetch(**request_args)
+                yield results
+                next_url = results.get("next", False)
+
+    def __fetch_concurrently(self, urls: List[str], **request_args):
+        """
+        ページを並列で取得し、ページ順に返す
+
+        同時に取得中のページ数は ``page_workers`` までに制限します
+        """
+        workers = self.config.page_workers
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = deque()
+        try:
+            for url in urls:
+                if len(futures) >= workers:
+                    yield futures.popleft().result()
+                futures.append(executor.submit(self.request._fetch, **dict(request_args, url=url)))
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __fetch_readahead(self, prefetch_data: dict, **request_args):
+        """
+        現在のページを処理している間に次のページを取得する
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            results = prefetch_data
+            while results is not None:
+                next_url = results.get("next")
+                future = executor.submit(self.request._fetch, **dict(request_args, url=next_url)) if next_url else None
+                yield results
+                results = future.result() if future is not None else None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        # 2ページ目から取得
-        while next_url:
-            request_args["url"] = next_url
-            results = self._fetch(**request_args)
-            for item in results["results"]:
-                yield response_obj(**item)
-            next_url = results.get("next", False)
+
+class APIRequest:
+    """
+    APIへのリクエストを行う
+
+    リクエストごとの状態は持たないため、複数のスレッドから同時に利用できます
+    """
+
+    unsafe_methods = ["post", "put", "delete"]
+
+    def __init__(
+        self,
+        config: "APIConfig",
+        header: MappingProxyType,
+        transport: Optional[Transport] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        singleflight: Optional[SingleFlight] = None,
+        codec: Optional[Codec] = None,
+        interner: Optional[Interner] = None,
+    ):
+        self.config = config
+        self.transport = transport if transport is not None else RequestsTransport(config)
+        self.retry = retry if retry is not None else RetryPolicy.from_config(config)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_config(config)
+        self.cache = cache if cache is not None else ResponseCache.from_config(config)
+        if singleflight is None and config.coalesce_requests:
+            singleflight = SingleFlight()
+        self.singleflight = singleflight
+        self.codec = codec if codec is not None else get_codec(config.json_codec)
+        self.interner = interner if interner is not None else Interner.from_config(config)
+        self.headers = MappingProxyType({**header, "Authorization": f"Bearer {self.config.api_key}"})
 
     def request(
         self,
@@ -64,38 +328,208 @@ class APIRequest(Iterator, Sized):
         method: Literal["get", "post", "put", "delete"],
         data: Optional[BaseModel] = None,
         response_obj: Optional[Type[BaseModel]] = None,
+        per_page: Optional[per_page_query] = None,
+        retry_unsafe: Optional[bool] = None,
+        use_cache: bool = True,
+        params: Optional[dict] = None,
+        limit: Optional[int] = None,
+        where: Optional[Callable[[dict], bool]] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+        stream: Optional[bool] = None,
+        paged: bool = False,
     ):
+        headers = dict(self.headers)
         content = None
         if method in self.unsafe_methods:
-            self.headers["content-type"] = "application/json"
+            headers["content-type"] = "application/json"
             if data:
                 content = data.model_dump_json(exclude_unset=True).encode("utf-8")
 
         req_data = {
             "method": method,
             "url": f"{self.config.host}{endpoint}",
-            "headers": self.headers,
+            "headers": headers,
         }
         if content:
             req_data["data"] = content
+        if method == "get":
+            # 設定の per_page は一覧の取得だけに使い、個別のリソースの取得には付けない
+            if per_page is None and paged:
+                per_page = self.config.per_page
+            query = _build_params(per_page, limit, params)
+            if query is not None:
+                req_data["params"] = query
+        # リトライの予算は一覧の全ページで共有する
+        req_data["budget"] = self.retry.new_budget()
+        req_data["retry_unsafe"] = retry_unsafe
+        req_data["use_cache"] = use_cache
+
+        if response_obj is not None:
+            response_obj = project(response_obj, fields)
+
+        if method == "get" and (stream if stream is not None else self.config.stream):
+            return self._stream_result(response_obj, limit, where, decode, **req_data)
 
         result = self._fetch(**req_data)
         if result is None:
             return None
 
-        if result.get("results"):
-            self.generator = self.__generator(prefetch_data=result, response_obj=response_obj, per_page=10, **req_data)
-            return self
-        elif self.count == 1:
-            return response_obj(**result)
-        return []
-
-    def _fetch(self, **req_data) -> Optional[dict]:
-        res = requests.request(**req_data)
-        if 400 <= res.status_code < 600:
-            raise APIException(res.status_code, res.json())
-        if res.content is not None and len(res.content) > 3:
-            data = res.json()
-            self.count = data.get("count", 1)
-            return data
-        return None
+        if "results" in result:
+            return PagedResult(self, result, response_obj, limit=limit, where=where, decode=decode, **req_data)
+        if response_obj is None:
+            return None
+        return self.decoder(response_obj, decode)(result)
+
+    def decoder(self, response_obj: Optional[Type[BaseModel]], decode: Optional[decode_mode] = None) -> Decoder:
+        """
+        レスポンスをモデルに変換する Decoder を作る
+
+        :param response_obj: モデル。None の場合は辞書のまま返す
+        :param decode: 変換方法。省略した場合は設定の値
+        :return:
+        """
+        return Decoder(response_obj, decode or self.config.decode, self.config.decode_sample, self.interner)
+
+    def _stream_result(
+        self,
+        response_obj: Optional[Type[BaseModel]],
+        limit: Optional[int],
+        where: Optional[Callable[[dict], bool]],
+        decode: Optional[decode_mode],
+        **req_data,
+    ):
+        """
+        レスポンスを受信しながら読み込む
+
+        一覧の場合は ``results`` の手前まで読み込んだ時点で StreamingResult を返します
+        """
+        page, res = self._stream(**req_data)
+        if page is None:
+            return None
+        decoder = self.decoder(response_obj, decode)
+        if page.paged:
+            return StreamingResult(self, page, res, decoder, limit=limit, where=where, **req_data)
+        res.close()
+        if response_obj is None:
+            return None
+        return decoder(page.meta)
+
+    def _stream(
+        self,
+        budget: Optional[RetryBudget] = None,
+        retry_unsafe: Optional[bool] = None,
+        use_cache: bool = True,
+        **req_data,
+    ) -> Tuple[Optional[StreamingPage], Any]:
+        """
+        ボディを読み込まずにリクエストを行い、 ``results`` の手前まで読み込む
+
+        受信しながら読み込むため、キャッシュとリクエストの集約は行いません
+        """
+        res = self._send(budget=budget, retry_unsafe=retry_unsafe, stream=True, **req_data)
+        if res.status_code == 204:
+            res.close()
+            return None, res
+        page = StreamingPage(res.iter_content(self.config.stream_chunk_size))
+        try:
+            page.open()
+        except Exception:
+            res.close()
+            raise
+        return page, res
+
+    def _fetch(
+        self,
+        budget: Optional[RetryBudget] = None,
+        retry_unsafe: Optional[bool] = None,
+        use_cache: bool = True,
+        **req_data,
+    ) -> Optional[dict]:
+        def load():
+            return self._load(budget=budget, retry_unsafe=retry_unsafe, use_cache=use_cache, **req_data)
+
+        if self.singleflight is not None and req_data["method"] == "get":
+            # 実行中の同じGETがあれば、その結果の複製を受け取る
+            return self.singleflight.do(
+                (use_cache, ResponseCache.key(req_data["url"], req_data.get("params"))), load, share=copy_json
+            )
+        return load()
+
+    def _load(
+        self,
+        budget: Optional[RetryBudget] = None,
+        retry_unsafe: Optional[bool] = None,
+        use_cache: bool = True,
+        **req_data,
+    ) -> Optional[dict]:
+        method = req_data["method"]
+        path = self._path(req_data["url"])
+        cache_key = entry = None
+        if self.cache is not None and method == "get" and use_cache:
+            cache_key = self.cache.key(req_data["url"], req_data.get("params"))
+            entry = self.cache.get(cache_key)
+            if entry is not None and self.cache.is_fresh(entry):
+                return copy_json(entry.data)
+            if entry is not None:
+                # 有効期限が切れている場合は条件付きリクエストで再検証する
+                req_data = dict(req_data, headers={**req_data["headers"], **entry.validators()})
+
+        res = self._send(budget=budget, retry_unsafe=retry_unsafe, **req_data)
+        if self.cache is not None and method in self.unsafe_methods:
+            self.cache.invalidate(path)
+
+        if entry is not None and res.status_code == 304:
+            self.cache.touch(cache_key)
+            data = entry.data
+        elif res.content is not None and len(res.content) > 3:
+            data = self.codec.loads(res.content)
+            if cache_key is not None:
+                self.cache.set(
+                    cache_key, path, data, etag=res.headers.get("ETag"), last_modified=res.headers.get("Last-Modified")
+                )
+        else:
+            return None
+        # キャッシュに保存した値は次の呼び出し元と共有するため、複製を返す
+        return copy_json(data) if cache_key is not None else data
+
+    def _path(self, url: str) -> str:
+        """
+        URLからエンドポイントのパスを取り出す
+        """
+        path = urlsplit(url).path
+        base = urlsplit(self.config.host).path.rstrip("/")
+        return path[len(base) :] if path.startswith(base) else path
+
+    def _send(self, budget: Optional[RetryBudget] = None, retry_unsafe: Optional[bool] = None, **req_data):
+        budget = budget if budget is not None else self.retry.new_budget()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                res = self.transport.request(**req_data)
+            except self.transport.retryable_exceptions as e:
+                delay = self.retry.next_delay(
+                    req_data["method"], req_data["url"], attempt, budget, error=e, retry_unsafe=retry_unsafe
+                )
+                if delay is None:
+                    raise
+            else:
+                if not 400 <= res.status_code < 600:
+                    return res
+                delay = self.retry.next_delay(
+                    req_data["method"],
+                    req_data["url"],
+                    attempt,
+                    budget,
+                    status=res.status_code,
+                    retry_after=res.headers.get("Retry-After"),
+                    retry_unsafe=retry_unsafe,
+                )
+                if delay is None:
+                    raise APIException(res.status_code, res.json())
+                # ストリーミングでは本文を読まないと接続がプールに戻らないため、リトライする前に閉じる
+                res.close()
+            sleep(delay)
+            attempt += 1
@@ -0,0 +1,214 @@
+"""非同期リクエストモジュール
+
+APIへのリクエストを asyncio 上で行うモジュールです。
+ページングは非同期イテレーターとして扱います。
+
+"""
+import asyncio
+from collections.abc import AsyncIterator
+from types import MappingProxyType
+from typing import Callable, Literal, Optional, Sequence, Type, TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from .api_request import _build_params
+from .codec import Codec, get_codec
+from .decode import Decoder, decode_mode
+from .intern import Interner
+from .exceptions import APIException
+from .projection import project
+from .models.custom import per_page_query
+from .ratelimit import RateLimiter
+from .retry import RetryBudget, RetryPolicy
+from .transport import AsyncTransport, HttpxAsyncTransport
+
+if TYPE_CHECKING:
+    from .client import APIConfig
+
+
+class AsyncPagedResult(AsyncIterator):
+    """
+    一覧取得の結果
+
+    ``async for`` で取得した時点でページを順に取得します。
+    limit を指定した場合は、その件数を返した時点で以降のページを取得しません
+    """
+
+    def __init__(
+        self,
+        request: "AsyncAPIRequest",
+        response_obj: Optional[Type[BaseModel]],
+        limit: Optional[int] = None,
+        where: Optional[Callable[[dict], bool]] = None,
+        decode: Optional[decode_mode] = None,
+        **req_data,
+    ):
+        self.request = request
+        self.response_obj = response_obj
+        self.decoder = request.decoder(response_obj, decode)
+        self.limit = limit
+        self.where = where
+        self.req_data = req_data
+        self.count = None
+        self.generator = self.__generator()
+
+    def __anext__(self):
+        return self.generator.__anext__()
+
+    async def __generator(self):
+        remaining = self.limit
+        next_url = self.req_data["url"]
+        while next_url:
+            self.req_data["url"] = next_url
+            results = await self.request._fetch(**self.req_data)
+            # 2ページ目以降は next のURLにクエリが含まれている
+            self.req_data.pop("params", None)
+            if results is None:
+                return
+            self.count = results.get("count", self.count)
+            for item in results.get("results", []):
+                if self.where is not None and not self.where(item):
+                    continue
+                yield self.decoder(item)
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining <= 0:
+                        return
+            next_url = results.get("next")
+
+
+class AsyncAPIRequest:
+    unsafe_methods = ["post", "put", "delete"]
+
+    def __init__(
+        self,
+        config: "APIConfig",
+        header: MappingProxyType,
+        transport: Optional[AsyncTransport] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        codec: Optional[Codec] = None,
+        interner: Optional[Interner] = None,
+    ):
+        self.config = config
+        self.transport = transport if transport is not None else HttpxAsyncTransport(config)
+        self.retry = retry if retry is not None else RetryPolicy.from_config(config)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_config(config)
+        self.codec = codec if codec is not None else get_codec(config.json_codec)
+        self.interner = interner if interner is not None else Interner.from_config(config)
+        self.headers = dict(header)
+        self.headers["Authorization"] = f"Bearer {self.config.api_key}"
+
+    def _build(self, endpoint: str, method: str, data: Optional[BaseModel] = None) -> dict:
+        headers = dict(self.headers)
+        content = None
+        if method in self.unsafe_methods:
+            headers["content-type"] = "application/json"
+            if data:
+                content = data.model_dump_json(exclude_unset=True).encode("utf-8")
+
+        req_data = {
+            "method": method,
+            "url": f"{self.config.host}{endpoint}",
+            "headers": headers,
+        }
+        if content:
+            req_data["data"] = content
+        return req_data
+
+    def paginate(
+        self,
+        endpoint: str,
+        response_obj: Type[BaseModel],
+        per_page: Optional[per_page_query] = None,
+        params: Optional[dict] = None,
+        limit: Optional[int] = None,
+        where: Optional[Callable[[dict], bool]] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncPagedResult:
+        """
+        一覧を非同期イテレーターとして取得する
+
+        :param endpoint: エンドポイント
+        :param response_obj: 結果のモデル
+        :param per_page: 1ページあたりの件数
+        :param params: その他のクエリ
+        :param limit: 取得する最大件数
+        :param where: 要素を返すか判定する関数
+        :param decode: 変換方法。省略した場合は設定の値
+        :param fields: モデルに残す項目
+        :return:
+        """
+        req_data = self._build(endpoint=endpoint, method="get")
+        query = _build_params(per_page if per_page is not None else self.config.per_page, limit, params)
+        if query is not None:
+            req_data["params"] = query
+        req_data["budget"] = self.retry.new_budget()
+        response_obj = project(response_obj, fields)
+        return AsyncPagedResult(self, response_obj, limit=limit, where=where, decode=decode, **req_data)
+
+    async def request(
+        self,
+        endpoint: str,
+        method: Literal["get", "post", "put", "delete"],
+        data: Optional[BaseModel] = None,
+        response_obj: Optional[Type[BaseModel]] = None,
+        retry_unsafe: Optional[bool] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ):
+        req_data = self._build(endpoint=endpoint, method=method, data=data)
+        result = await self._fetch(retry_unsafe=retry_unsafe, **req_data)
+        if result is None or response_obj is None:
+            return None
+        return self.decoder(project(response_obj, fields), decode)(result)
+
+    def decoder(self, response_obj: Optional[Type[BaseModel]], decode: Optional[decode_mode] = None) -> Decoder:
+        """
+        レスポンスをモデルに変換する Decoder を作る
+
+        :param response_obj: モデル。None の場合は辞書のまま返す
+        :param decode: 変換方法。省略した場合は設定の値
+        :return:
+        """
+        return Decoder(response_obj, decode or self.config.decode, self.config.decode_sample, self.interner)
+
+    async def _fetch(
+        self, budget: Optional[RetryBudget] = None, retry_unsafe: Optional[bool] = None, **req_data
+    ) -> Optional[dict]:
+        budget = budget if budget is not None else self.retry.new_budget()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            try:
+                res = await self.transport.request(**req_data)
+            except self.transport.retryable_exceptions as e:
+                delay = self.retry.next_delay(
+                    req_data["method"], req_data["url"], attempt, budget, error=e, retry_unsafe=retry_unsafe
+                )
+                if delay is None:
+                    raise
+            else:
+                if not 400 <= res.status_code < 600:
+                    break
+                delay = self.retry.next_delay(
+                    req_data["method"],
+                    req_data["url"],
+                    attempt,
+                    budget,
+                    status=res.status_code,
+                    retry_after=res.headers.get("Retry-After"),
+                    retry_unsafe=retry_unsafe,
+                )
+                if delay is None:
+                    raise APIException(res.status_code, res.json())
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if res.content is not None and len(res.content) > 3:
+            return self.codec.loads(res.content)
+        return None
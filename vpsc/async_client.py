@@ -0,0 +1,624 @@
+from types import MappingProxyType
+from typing import Optional, AsyncIterator, Sequence
+
+from .models.custom import (
+    server_sort_query,
+    server_filter_fields,
+    per_page_query,
+    UpdateServer,
+    ShutdownServer,
+    UpdateHost,
+    UpdateNfsServer,
+    UpdateNfsServerIpv4,
+    CreateSwitch,
+    UpdateSwitch,
+    Ptr,
+    UpdateApiKey,
+    CreateRole,
+    UpdateRole,
+    CreateApiKey,
+)
+from .models.generated import (
+    Server,
+    ServerPowerStatus,
+    NfsServer,
+    NfsServerPowerStatus,
+    ServerInterface,
+    NfsServerInterface,
+    Switch,
+    Limitation,
+    ApiKey,
+    Role,
+    Permission,
+)
+from .api_request import _match_fields
+from .async_api_request import AsyncAPIRequest
+from .decode import decode_mode
+from .client import APIConfig
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .schema_cache import enable as enable_schema_cache
+from .transport import AsyncTransport
+
+
+class AsyncClient:
+    """
+    asyncio 向けのクライアント
+
+    ``Client`` と同じメソッドを持ち、一覧取得は非同期イテレーターを返します
+    """
+
+    def __init__(
+        self,
+        config: APIConfig,
+        transport: Optional[AsyncTransport] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.config = config
+        if self.config.schema_cache_path:
+            enable_schema_cache(self.config.schema_cache_path)
+        self.header = MappingProxyType({"Authorization": f"Bearer {self.config.api_key}"})
+        self.client = AsyncAPIRequest(
+            config=self.config, header=self.header, transport=transport, retry=retry, rate_limiter=rate_limiter
+        )
+        self.transport = self.client.transport
+        self.retry = self.client.retry
+        self.rate_limiter = self.client.rate_limiter
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        コネクションプールを解放する
+
+        :return:
+        """
+        await self.transport.close()
+
+    def get_servers(
+        self,
+        sort: Optional[server_sort_query] = None,
+        per_page: Optional[per_page_query] = None,
+        limit: Optional[int] = None,
+        name: Optional[str] = None,
+        service_code: Optional[str] = None,
+        zone_code: Optional[str] = None,
+        hostname: Optional[str] = None,
+        ipv4_address: Optional[str] = None,
+        ipv6_address: Optional[str] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Server]:
+        """
+        サーバー一覧を取得する
+
+        sort と絞り込み条件はクエリとしてAPIに送信します。
+        絞り込み条件はレスポンスに対しても確認するため、一致しないサーバーは返しません
+
+        :param sort: ソート情報。 ``ordering`` クエリとして送信します
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param limit: 取得する最大件数。達した時点で以降のページを取得しません
+        :param name: 名前
+        :param service_code: サービスコード
+        :param zone_code: ゾーンコード
+        :param hostname: 標準ホスト名
+        :param ipv4_address: IPv4アドレス
+        :param ipv6_address: IPv6アドレス
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
+        :return:
+        """
+        filters = {
+            "name": name,
+            "service_code": service_code,
+            "zone_code": zone_code,
+            "hostname": hostname,
+            "ipv4_address": ipv4_address,
+            "ipv6_address": ipv6_address,
+        }
+        return self.client.paginate(
+            endpoint="/servers",
+            response_obj=Server,
+            per_page=per_page,
+            decode=decode,
+            fields=fields,
+            params={"ordering": sort, **filters},
+            limit=limit,
+            where=_match_fields(server_filter_fields, filters),
+        )
+
+    async def get_server(self, server_id: int, fields: Optional[Sequence[str]] = None) -> Server:
+        """
+        サーバー情報を取得する
+
+        :param server_id: サーバーID
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/servers/{server_id}",
+            method="get",
+            response_obj=Server,
+            fields=fields,
+        )
+
+    async def update_server(self, server_id: int, data: UpdateServer) -> Server:
+        """
+        サーバー情報を更新する
+
+        :param server_id: サーバーID
+        :param data: 更新データ
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/servers/{server_id}",
+            method="put",
+            data=data,
+            response_obj=Server,
+        )
+
+    async def get_server_power_status(self, server_id: int) -> ServerPowerStatus:
+        """
+        サーバーの電源状態を取得する
+
+        :param server_id:　サーバーID
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/servers/{server_id}/power-status",
+            method="get",
+            response_obj=ServerPowerStatus,
+        )
+
+    async def power_on_server(self, server_id: int):
+        """
+        サーバーを起動する
+
+        :param server_id: サーバーID
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/servers/{server_id}/power-on",
+            method="post",
+        )
+
+    async def shutdown_server(self, server_id: int, force: bool = False):
+        """
+        サーバーをシャットダウンする
+
+        :param force: 強制停止を行うか
+        :param server_id: サーバーID
+        :return:
+        """
+        data = ShutdownServer(force=force)
+        return await self.client.request(
+            endpoint=f"/servers/{server_id}/shutdown",
+            method="post",
+            data=data,
+        )
+
+    async def force_force_reboot_server(self, server_id: int):
+        """
+        サーバーを強制再起動する
+
+        :param server_id: サーバーID
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/servers/{server_id}/force-reboot",
+            method="post",
+        )
+
+    async def update_server_ipv4_ptr(self, server_id: int, data: UpdateHost):
+        """
+        サーバーのipv4の逆引きホスト名を設定する
+
+        :param server_id: サーバーID
+        :param data: 設定データ
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/servers/{server_id}/ipv4-ptr",
+            method="put",
+            data=data,
+            response_obj=Ptr,
+        )
+
+    async def update_server_ipv6_ptr(self, server_id: int, data: UpdateHost):
+        """
+        サーバーのipv6の逆引きホスト名を設定する
+
+        :param server_id: サーバーID
+        :param data: 設定データ
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/servers/{server_id}/ipv6-ptr",
+            method="put",
+            data=data,
+            response_obj=Ptr,
+        )
+
+    async def get_server_limitation(self, server_id: int) -> Limitation:
+        """
+        サーバーの制限情報を取得する
+
+        :param server_id: サーバーID
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/servers/{server_id}/limitation",
+            method="get",
+            response_obj=Limitation,
+        )
+
+    def get_server_interfaces(
+        self,
+        server_id: int,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[ServerInterface]:
+        """
+        サーバーのインターフェース一覧を取得する
+
+        :param server_id: サーバーID
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目
+        :return:
+        """
+        return self.client.paginate(
+            endpoint=f"/servers/{server_id}/interfaces",
+            response_obj=ServerInterface,
+            per_page=per_page,
+            decode=decode,
+            fields=fields,
+        )
+
+    def get_nfs_servers(
+        self,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[NfsServer]:
+        """
+        NFSサーバー情報一覧を取得する
+
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
+        :return:
+        """
+        return self.client.paginate(
+            endpoint=f"/nfs-servers",
+            response_obj=NfsServer,
+            per_page=per_page,
+            decode=decode,
+            fields=fields,
+        )
+
+    async def get_nfs_server(self, nfs_server_id: int, fields: Optional[Sequence[str]] = None) -> NfsServer:
+        """
+        NFSサーバー情報を取得する
+
+
+        :param nfs_server_id: NFSサーバーID
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/nfs-servers/{nfs_server_id}",
+            method="get",
+            response_obj=NfsServer,
+            fields=fields,
+        )
+
+    async def update_nfs_server(self, nfs_server_id: int, data: UpdateNfsServer):
+        """
+        NFSサーバー情報を更新する
+        :param nfs_server_id:  NFSサーバーID
+        :param data: 更新データ
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/nfs-servers/{nfs_server_id}",
+            method="put",
+            data=data,
+            response_obj=NfsServer,
+        )
+
+    async def update_nfs_server_ipv4(self, nfs_server_id: int, data: UpdateNfsServerIpv4):
+        """
+        NFSサーバーのipv4を設定する
+
+        :param nfs_server_id: NFSサーバーID
+        :param data: 設定情報
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/nfs-servers/{nfs_server_id}/ipv4",
+            method="put",
+            data=data,
+        )
+
+    async def get_nfs_server_power_status(self, nfs_server_id: int) -> NfsServerPowerStatus:
+        """
+        NFSサーバーの電源状態を取得する
+
+        :param nfs_server_id:
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/nfs-servers/{nfs_server_id}/power-status", method="get", response_obj=NfsServerPowerStatus
+        )
+
+    def get_nfs_server_interfaces(
+        self,
+        nfs_server_id: int,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[NfsServerInterface]:
+        """
+        NFSサーバーのインターフェース一覧を取得する
+
+        :param nfs_server_id: NFSサーバーID
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目
+        :return:
+        """
+        return self.client.paginate(
+            endpoint=f"/nfs-servers/{nfs_server_id}/interfaces",
+            response_obj=NfsServerInterface,
+            per_page=per_page,
+            decode=decode,
+            fields=fields,
+        )
+
+    async def create_switch(self, data: CreateSwitch) -> Switch:
+        """
+        スイッチを作成する
+
+        :param data: 作成データ
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/switches",
+            method="post",
+            data=data,
+            response_obj=Switch,
+        )
+
+    def get_switches(
+        self,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Switch]:
+        """
+        スイッチ情報一覧を取得する
+
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
+        :return:
+        """
+        return self.client.paginate(
+            endpoint=f"/switches",
+            response_obj=Switch,
+            per_page=per_page,
+            decode=decode,
+            fields=fields,
+        )
+
+    async def get_switch(self, switch_id: int, fields: Optional[Sequence[str]] = None) -> Switch:
+        """
+        スイッチ情報を取得する
+
+        :param switch_id: スイッチID
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/switches/{switch_id}",
+            method="get",
+            response_obj=Switch,
+            fields=fields,
+        )
+
+    async def update_switch(self, switch_id: int, data: UpdateSwitch) -> Switch:
+        """
+        スイッチ情報を更新する
+
+        :param switch_id: スイッチID
+        :param data: 更新データ
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/switches/{switch_id}",
+            method="put",
+            data=data,
+            response_obj=Switch,
+        )
+
+    async def delete_switch(self, switch_id: int):
+        """
+        スイッチを削除する
+
+        :param switch_id: スイッチID
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/switches/{switch_id}",
+            method="delete",
+        )
+
+    def get_api_keys(
+        self,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[ApiKey]:
+        """
+        APIキーの一覧を取得する
+
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目
+        :return:
+        """
+        return self.client.paginate(
+            endpoint=f"/api-keys",
+            response_obj=ApiKey,
+            per_page=per_page,
+            decode=decode,
+            fields=fields,
+        )
+
+    async def get_api_key(self, key_id: int) -> ApiKey:
+        """
+        APIキーを取得する
+
+        :param key_id:
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/api-keys/{key_id}",
+            method="get",
+            response_obj=ApiKey,
+        )
+
+    async def create_api_key(self, data: CreateApiKey) -> ApiKey:
+        """
+        APIキーを作成する
+
+        :param data:
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/api-keys",
+            method="post",
+            data=data,
+            response_obj=ApiKey,
+        )
+
+    async def update_api_key(self, key_id: int, data: UpdateApiKey) -> ApiKey:
+        """
+        APIキーを更新する
+
+        :param key_id:
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/api-keys/{key_id}",
+            method="put",
+            data=data,
+            response_obj=ApiKey,
+        )
+
+    async def delete_api_key(self, key_id: int) -> ApiKey:
+        """
+        APIキーを削除する
+
+        :param key_id:
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/api-keys/{key_id}",
+            method="delete",
+        )
+
+    async def rotate_api_key(self, key_id: int) -> ApiKey:
+        """
+        APIキーのトークンのローテーションを行う
+
+        :param key_id:
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/api-keys/{key_id}",
+            method="put",
+            response_obj=ApiKey,
+        )
+
+    async def create_role(self, data: CreateRole) -> Role:
+        """
+        ロールを作成する
+
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/roles",
+            method="post",
+            data=data,
+            response_obj=Role,
+        )
+
+    async def get_role(self, role_id: int) -> Role:
+        """
+        ロールを取得する
+
+        :param role_id:
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/roles/{role_id}",
+            method="get",
+            response_obj=Role,
+        )
+
+    async def update_role(self, role_id: int, data: UpdateRole) -> Role:
+        """
+        ロールを更新する
+
+        :param role_id:
+        :param data:
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/roles/{role_id}",
+            method="put",
+            data=data,
+            response_obj=Role,
+        )
+
+    async def delete_role(self, role_id: int) -> Role:
+        """
+        ロールを削除する
+
+        :param role_id:
+        :return:
+        """
+        return await self.client.request(
+            endpoint=f"/roles/{role_id}",
+            method="delete",
+        )
+
+    def get_permissions(
+        self,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Permission]:
+        """
+        権限の一覧を取得する
+
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目
+        :return:
+        """
+        return self.client.paginate(
+            endpoint=f"/permissions",
+            response_obj=Permission,
+            per_page=per_page,
+            decode=decode,
+            fields=fields,
+        )
@@ -0,0 +1,63 @@
+"""一括操作モジュール
+
+複数のリソースに対する同じ操作を、同時実行数を制限したスレッドプールで実行するモジュールです。
+途中で失敗しても止めずに、リソースごとの結果を返します。
+
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Iterable, List, Literal, NamedTuple, Optional
+
+import requests
+
+
+class BulkResult(NamedTuple):
+    """
+    一括操作のリソースごとの結果
+
+    status は成功した場合 ``success`` 、APIエラーなどの場合 ``error`` 、
+    時間内に終わらなかった場合 ``timeout`` になります
+    """
+
+    id: int
+    status: Literal["success", "error", "timeout"]
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "success"
+
+
+def run_bulk(
+    func: Callable[[int], Any], ids: Iterable[int], concurrency: int = 8, timeout: Optional[float] = None
+) -> List[BulkResult]:
+    """
+    操作を一括で実行する
+
+    :param func: リソースIDを受け取って操作を行う関数
+    :param ids: リソースIDの一覧
+    :param concurrency: 同時実行数
+    :param timeout: 全体のタイムアウト(秒)
+    :return: ids と同じ順序の結果
+    """
+    ids = list(ids)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        futures = [executor.submit(func, resource_id) for resource_id in ids]
+        results = []
+        for resource_id, future in zip(ids, futures):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                results.append(BulkResult(resource_id, "success", result=future.result(timeout=remaining)))
+            except FutureTimeoutError as e:
+                future.cancel()
+                results.append(BulkResult(resource_id, "timeout", error=e))
+            except (requests.Timeout, TimeoutError) as e:
+                results.append(BulkResult(resource_id, "timeout", error=e))
+            except Exception as e:
+                results.append(BulkResult(resource_id, "error", error=e))
+        return results
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,153 @@
+"""キャッシュモジュール
+
+GETのレスポンスをメモリ上にキャッシュするモジュールです。
+有効期限が切れたレスポンスは ETag/Last-Modified がある場合、条件付きリクエストで再検証します。
+
+"""
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Callable, Dict, Optional, TYPE_CHECKING
+from urllib.parse import urlencode
+
+if TYPE_CHECKING:
+    from .client import APIConfig
+
+
+class CacheEntry:
+    """
+    キャッシュされたレスポンス
+    """
+
+    __slots__ = ("path", "data", "expires", "etag", "last_modified")
+
+    def __init__(
+        self, path: str, data: dict, expires: float, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ):
+        self.path = path
+        self.data = data
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def validators(self) -> dict:
+        """
+        再検証に使う条件付きリクエストのヘッダー
+
+        :return:
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    LRUで破棄するTTL付きのレスポンスキャッシュ
+
+    :param ttl: 有効期限(秒)
+    :param max_entries: 保持する最大件数
+    :param ttls: エンドポイントごとの有効期限。キーは ``/servers/*/limitation`` のようなパターン
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        max_entries: int = 256,
+        ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.ttls = dict(ttls or {})
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls, config: "APIConfig") -> Optional["ResponseCache"]:
+        if not config.cache_enabled:
+            return None
+        return cls(ttl=config.cache_ttl, max_entries=config.cache_max_entries, ttls=config.cache_ttls)
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> str:
+        if params:
+            return f"{url}?{urlencode(sorted(params.items()))}"
+        return url
+
+    def ttl_for(self, path: str) -> float:
+        for pattern, ttl in self.ttls.items():
+            if fnmatchcase(path, pattern):
+                return ttl
+        return self.ttl
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        キャッシュを取得する。有効期限が切れていても再検証のために返す
+
+        :param key: キャッシュキー
+        :return:
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return self.clock() < entry.expires
+
+    def set(
+        self, key: str, path: str, data: dict, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> CacheEntry:
+        entry = CacheEntry(path, data, self.clock() + self.ttl_for(path), etag, last_modified)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def touch(self, key: str):
+        """
+        再検証できたキャッシュの有効期限を延ばす
+
+        :param key: キャッシュキー
+        :return:
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires = self.clock() + self.ttl_for(entry.path)
+
+    def invalidate(self, path: str):
+        """
+        更新されたリソースのキャッシュを破棄する
+
+        ``/servers/1/ipv4-ptr`` の場合は ``/servers/1`` 以下と一覧の ``/servers`` を破棄します
+
+        :param path: 更新したエンドポイント
+        :return:
+        """
+        segments = path.strip("/").split("/")
+        collection = f"/{segments[0]}"
+        resource = "/" + "/".join(segments[:2])
+        with self._lock:
+            for key in [
+                key
+                for key, entry in self._entries.items()
+                if entry.path == collection or entry.path == resource or entry.path.startswith(f"{resource}/")
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
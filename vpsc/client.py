@@ -1,10 +1,12 @@
 from types import MappingProxyType
-from typing import Optional, Iterable, List
+from typing import Dict, Optional, Iterable, Iterator, List, Sequence
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from .models.custom import (
     server_sort_query,
+    server_filter_fields,
+    per_page_query,
     UpdateServer,
     ShutdownServer,
     UpdateHost,
@@ -23,51 +25,190 @@ from .models.generated import (
     ServerPowerStatus,
     NfsServer,
     NfsServerPowerStatus,
+    ServerInterface,
+    NfsServerInterface,
     Switch,
     Limitation,
     ApiKey,
     Role,
     Permission,
 )
-from .api_request import APIRequest
+from .api_request import APIRequest, _match_fields
+from .bulk import BulkResult, run_bulk
+from .cache import ResponseCache
+from .codec import codec_name
+from .decode import decode_mode
+from .intern import Interner
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .schema_cache import enable as enable_schema_cache
+from .transport import Transport, RequestsTransport
+from .waiter import wait_until
+from .watch import WatchEvent, Watcher
 
 
 class APIConfig(BaseSettings):
     model_config = SettingsConfigDict(env_file="~/.vpsc", env_file_encoding="utf-8", env_prefix="vps_")
     host: str = "https://secure.sakura.ad.jp/vps/api/v7"
     api_key: str
+    pool_connections: int = 1
+    pool_size: int = 10
+    keep_alive: bool = True
+    connect_timeout: float = 10.0
+    read_timeout: float = 60.0
+    page_workers: int = 1
+    page_readahead: bool = False
+    page_cache_size: int = 8
+    per_page: Optional[per_page_query] = None
+    max_retries: int = 3
+    retry_backoff: float = 0.5
+    retry_max_backoff: float = 30.0
+    retry_budget: float = 60.0
+    retry_statuses: List[int] = [429, 503]
+    retry_unsafe: bool = False
+    rate_limit: Optional[float] = None
+    rate_limit_burst: int = 1
+    rate_limit_file: Optional[str] = None
+    cache_enabled: bool = False
+    cache_ttl: float = 30.0
+    cache_max_entries: int = 256
+    cache_ttls: Dict[str, float] = {}
+    inventory_cache_path: str = "~/.vpsc_cache.sqlite3"
+    coalesce_requests: bool = True
+    json_codec: codec_name = "auto"
+    decode: decode_mode = "validate"
+    decode_sample: int = 0
+    stream: bool = False
+    stream_chunk_size: int = 16384
+    intern: bool = False
+    intern_max_size: int = 100000
+    schema_cache_path: Optional[str] = None
 
 
 class Client:
-    def __init__(self, config: APIConfig):
+    def __init__(
+        self,
+        config: APIConfig,
+        transport: Optional[Transport] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        interner: Optional[Interner] = None,
+    ):
         self.config = config
+        if self.config.schema_cache_path:
+            enable_schema_cache(self.config.schema_cache_path)
         self.header = MappingProxyType({"Authorization": f"Bearer {self.config.api_key}"})
-        self.client = APIRequest(config=self.config, header=self.header)
+        self.transport = transport if transport is not None else RequestsTransport(self.config)
+        self.client = APIRequest(
+            config=self.config,
+            header=self.header,
+            transport=self.transport,
+            retry=retry,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            interner=interner,
+        )
+        self.retry = self.client.retry
+        self.rate_limiter = self.client.rate_limiter
+        self.cache = self.client.cache
+        self.interner = self.client.interner
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
-    def get_servers(self, sort: Optional[server_sort_query] = None) -> Iterable[Server]:
+    def close(self):
+        """
+        コネクションプールを解放する
+
+        :return:
+        """
+        self.transport.close()
+
+    def get_servers(
+        self,
+        sort: Optional[server_sort_query] = None,
+        per_page: Optional[per_page_query] = None,
+        limit: Optional[int] = None,
+        name: Optional[str] = None,
+        service_code: Optional[str] = None,
+        zone_code: Optional[str] = None,
+        hostname: Optional[str] = None,
+        ipv4_address: Optional[str] = None,
+        ipv6_address: Optional[str] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterable[Server]:
         """
         サーバー一覧を取得する
 
-        :param sort: ソート情報
+        sort と絞り込み条件はクエリとしてAPIに送信します。
+        絞り込み条件はレスポンスに対しても確認するため、一致しないサーバーは返しません
+
+        :param sort: ソート情報。 ``ordering`` クエリとして送信します
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param limit: 取得する最大件数。達した時点で以降のページを取得しません
+        :param name: 名前
+        :param service_code: サービスコード
+        :param zone_code: ゾーンコード
+        :param hostname: 標準ホスト名
+        :param ipv4_address: IPv4アドレス
+        :param ipv6_address: IPv6アドレス
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
         :return:
         """
+        filters = {
+            "name": name,
+            "service_code": service_code,
+            "zone_code": zone_code,
+            "hostname": hostname,
+            "ipv4_address": ipv4_address,
+            "ipv6_address": ipv6_address,
+        }
         return self.client.request(
             endpoint="/servers",
             method="get",
             response_obj=Server,
+            per_page=per_page,
+            paged=True,
+            decode=decode,
+            fields=fields,
+            params={"ordering": sort, **filters},
+            limit=limit,
+            where=_match_fields(server_filter_fields, filters),
         )
 
-    def get_server(self, server_id: int) -> Server:
+    def watch_servers(self, interval: float = 5.0, initial: bool = True) -> Iterator[WatchEvent]:
+        """
+        サーバー一覧を一定間隔で取得し、追加・削除・変更されたサーバーを返し続ける
+
+        :param interval: 取得間隔(秒)
+        :param initial: 初回の一覧を追加として返すか
+        :return:
+        """
+        watcher = Watcher(
+            lambda: self.client.request(endpoint="/servers", method="get", use_cache=False, paged=True) or [],
+            response_obj=Server,
+        )
+        return watcher.watch(interval=interval, initial=initial)
+
+    def get_server(self, server_id: int, fields: Optional[Sequence[str]] = None) -> Server:
         """
         サーバー情報を取得する
 
         :param server_id: サーバーID
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
         :return:
         """
         return self.client.request(
             endpoint=f"/servers/{server_id}",
             method="get",
             response_obj=Server,
+            fields=fields,
         )
 
     def update_server(self, server_id: int, data: UpdateServer) -> Server:
@@ -137,6 +278,133 @@ class Client:
             method="post",
         )
 
+    def power_on_servers(
+        self, server_ids: Iterable[int], concurrency: int = 8, timeout: Optional[float] = None
+    ) -> List[BulkResult]:
+        """
+        複数のサーバーを起動する
+
+        :param server_ids: サーバーIDの一覧
+        :param concurrency: 同時実行数
+        :param timeout: 全体のタイムアウト(秒)
+        :return: サーバーごとの結果
+        """
+        return run_bulk(
+            lambda server_id: self.power_on_server(server_id=server_id),
+            server_ids,
+            concurrency=concurrency,
+            timeout=timeout,
+        )
+
+    def shutdown_servers(
+        self, server_ids: Iterable[int], force: bool = False, concurrency: int = 8, timeout: Optional[float] = None
+    ) -> List[BulkResult]:
+        """
+        複数のサーバーをシャットダウンする
+
+        :param server_ids: サーバーIDの一覧
+        :param force: 強制停止を行うか
+        :param concurrency: 同時実行数
+        :param timeout: 全体のタイムアウト(秒)
+        :return: サーバーごとの結果
+        """
+        return run_bulk(
+            lambda server_id: self.shutdown_server(server_id=server_id, force=force),
+            server_ids,
+            concurrency=concurrency,
+            timeout=timeout,
+        )
+
+    def force_reboot_servers(
+        self, server_ids: Iterable[int], concurrency: int = 8, timeout: Optional[float] = None
+    ) -> List[BulkResult]:
+        """
+        複数のサーバーを強制再起動する
+
+        :param server_ids: サーバーIDの一覧
+        :param concurrency: 同時実行数
+        :param timeout: 全体のタイムアウト(秒)
+        :return: サーバーごとの結果
+        """
+        return run_bulk(
+            lambda server_id: self.force_force_reboot_server(server_id=server_id),
+            server_ids,
+            concurrency=concurrency,
+            timeout=timeout,
+        )
+
+    def wait_for_power_status(
+        self,
+        server_id: int,
+        target: str,
+        timeout: float = 300.0,
+        interval: float = 1.0,
+        max_interval: float = 15.0,
+    ) -> ServerPowerStatus:
+        """
+        サーバーの電源状態が目的の状態になるまで待つ
+
+        確認間隔は interval 秒から max_interval 秒まで徐々に広げます。
+        レスポンスキャッシュが有効でも、毎回APIから取得します
+
+        :param server_id: サーバーID
+        :param target: 目的の電源状態。power_on や power_off など
+        :param timeout: タイムアウト(秒)。超えた場合は WaitTimeout を送出します
+        :param interval: 最初の確認間隔(秒)
+        :param max_interval: 確認間隔の上限(秒)
+        :return: 最後に取得した電源状態
+        """
+        return wait_until(
+            lambda: self.client.request(
+                endpoint=f"/servers/{server_id}/power-status",
+                method="get",
+                response_obj=ServerPowerStatus,
+                use_cache=False,
+                decode="validate",
+            ),
+            lambda power_status: power_status.status == target,
+            timeout=timeout,
+            interval=interval,
+            max_interval=max_interval,
+        )
+
+    def wait_for_servers_power_status(
+        self,
+        server_ids: Iterable[int],
+        target: str,
+        timeout: float = 600.0,
+        interval: float = 2.0,
+        max_interval: float = 15.0,
+    ) -> Dict[int, str]:
+        """
+        複数のサーバーの電源状態が目的の状態になるまで待つ
+
+        サーバーごとに電源状態を取得せず、1回の確認につきサーバー一覧を1回取得します。
+        一覧の電源状態はAPI側でキャッシュされているため、反映まで少し遅れることがあります
+
+        :param server_ids: サーバーIDの一覧
+        :param target: 目的の電源状態。power_on や power_off など
+        :param timeout: タイムアウト(秒)。超えた場合は WaitTimeout を送出します
+        :param interval: 最初の確認間隔(秒)
+        :param max_interval: 確認間隔の上限(秒)
+        :return: サーバーIDごとの最後に取得した電源状態
+        """
+        server_ids = set(server_ids)
+
+        def fetch() -> Dict[int, str]:
+            servers = self.client.request(
+                endpoint="/servers", method="get", response_obj=Server, use_cache=False, decode="validate", paged=True
+            )
+            return {server.id: server.power_status for server in servers or [] if server.id in server_ids}
+
+        return wait_until(
+            fetch,
+            lambda statuses: statuses.keys() == server_ids and all(s == target for s in statuses.values()),
+            timeout=timeout,
+            interval=interval,
+            max_interval=max_interval,
+        )
+
     def update_server_ipv4_ptr(self, server_id: int, data: UpdateHost):
         """
         サーバーのipv4の逆引きホスト名を設定する
@@ -180,30 +448,84 @@ class Client:
             response_obj=Limitation,
         )
 
-    def get_nfs_servers(self) -> Iterable[NfsServer]:
+    def get_server_interfaces(
+        self,
+        server_id: int,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterable[ServerInterface]:
+        """
+        サーバーのインターフェース一覧を取得する
+
+        :param server_id: サーバーID
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目
+        :return:
+        """
+        return self.client.request(
+            endpoint=f"/servers/{server_id}/interfaces",
+            method="get",
+            response_obj=ServerInterface,
+            per_page=per_page,
+            paged=True,
+            decode=decode,
+            fields=fields,
+        )
+
+    def get_nfs_servers(
+        self,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterable[NfsServer]:
         """
         NFSサーバー情報一覧を取得する
 
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
         :return:
         """
         return self.client.request(
             endpoint=f"/nfs-servers",
             method="get",
             response_obj=NfsServer,
+            per_page=per_page,
+            paged=True,
+            decode=decode,
+            fields=fields,
         )
 
-    def get_nfs_server(self, nfs_server_id: int) -> NfsServer:
+    def watch_nfs_servers(self, interval: float = 5.0, initial: bool = True) -> Iterator[WatchEvent]:
+        """
+        NFSサーバー一覧を一定間隔で取得し、追加・削除・変更されたNFSサーバーを返し続ける
+
+        :param interval: 取得間隔(秒)
+        :param initial: 初回の一覧を追加として返すか
+        :return:
+        """
+        watcher = Watcher(
+            lambda: self.client.request(endpoint="/nfs-servers", method="get", use_cache=False, paged=True) or [],
+            response_obj=NfsServer,
+        )
+        return watcher.watch(interval=interval, initial=initial)
+
+    def get_nfs_server(self, nfs_server_id: int, fields: Optional[Sequence[str]] = None) -> NfsServer:
         """
         NFSサーバー情報を取得する
 
 
         :param nfs_server_id: NFSサーバーID
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
         :return:
         """
         return self.client.request(
             endpoint=f"/nfs-servers/{nfs_server_id}",
             method="get",
             response_obj=NfsServer,
+            fields=fields,
         )
 
     def update_nfs_server(self, nfs_server_id: int, data: UpdateNfsServer):
@@ -245,6 +567,64 @@ class Client:
             endpoint=f"/nfs-servers/{nfs_server_id}/power-status", method="get", response_obj=NfsServerPowerStatus
         )
 
+    def wait_for_nfs_server_power_status(
+        self,
+        nfs_server_id: int,
+        target: str,
+        timeout: float = 300.0,
+        interval: float = 1.0,
+        max_interval: float = 15.0,
+    ) -> NfsServerPowerStatus:
+        """
+        NFSサーバーの電源状態が目的の状態になるまで待つ
+
+        :param nfs_server_id: NFSサーバーID
+        :param target: 目的の電源状態。power_on や power_off など
+        :param timeout: タイムアウト(秒)。超えた場合は WaitTimeout を送出します
+        :param interval: 最初の確認間隔(秒)
+        :param max_interval: 確認間隔の上限(秒)
+        :return: 最後に取得した電源状態
+        """
+        return wait_until(
+            lambda: self.client.request(
+                endpoint=f"/nfs-servers/{nfs_server_id}/power-status",
+                method="get",
+                response_obj=NfsServerPowerStatus,
+                use_cache=False,
+                decode="validate",
+            ),
+            lambda power_status: power_status.status == target,
+            timeout=timeout,
+            interval=interval,
+            max_interval=max_interval,
+        )
+
+    def get_nfs_server_interfaces(
+        self,
+        nfs_server_id: int,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterable[NfsServerInterface]:
+        """
+        NFSサーバーのインターフェース一覧を取得する
+
+        :param nfs_server_id: NFSサーバーID
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目
+        :return:
+        """
+        return self.client.request(
+            endpoint=f"/nfs-servers/{nfs_server_id}/interfaces",
+            method="get",
+            response_obj=NfsServerInterface,
+            per_page=per_page,
+            paged=True,
+            decode=decode,
+            fields=fields,
+        )
+
     def create_switch(self, data: CreateSwitch) -> Switch:
         """
         スイッチを作成する
@@ -259,29 +639,43 @@ class Client:
             response_obj=Switch,
         )
 
-    def get_switches(self) -> Iterable[Switch]:
+    def get_switches(
+        self,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterable[Switch]:
         """
         スイッチ情報一覧を取得する
 
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
         :return:
         """
         return self.client.request(
             endpoint=f"/switches",
             method="get",
             response_obj=Switch,
+            per_page=per_page,
+            paged=True,
+            decode=decode,
+            fields=fields,
         )
 
-    def get_switch(self, switch_id: int) -> Switch:
+    def get_switch(self, switch_id: int, fields: Optional[Sequence[str]] = None) -> Switch:
         """
         スイッチ情報を取得する
 
         :param switch_id: スイッチID
+        :param fields: モデルに残す項目。入れ子の項目は zone.code のように指定します
         :return:
         """
         return self.client.request(
             endpoint=f"/switches/{switch_id}",
             method="get",
             response_obj=Switch,
+            fields=fields,
         )
 
     def update_switch(self, switch_id: int, data: UpdateSwitch) -> Switch:
@@ -311,16 +705,28 @@ class Client:
             method="delete",
         )
 
-    def get_api_keys(self) -> Iterable[ApiKey]:
+    def get_api_keys(
+        self,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterable[ApiKey]:
         """
         APIキーの一覧を取得する
 
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目
         :return:
         """
         return self.client.request(
             endpoint=f"/api-keys",
             method="get",
             response_obj=ApiKey,
+            per_page=per_page,
+            paged=True,
+            decode=decode,
+            fields=fields,
         )
 
     def get_api_key(self, key_id: int) -> ApiKey:
@@ -442,14 +848,26 @@ class Client:
             method="delete",
         )
 
-    def get_permissions(self) -> Iterable[Permission]:
+    def get_permissions(
+        self,
+        per_page: Optional[per_page_query] = None,
+        decode: Optional[decode_mode] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterable[Permission]:
         """
         権限の一覧を取得する
 
+        :param per_page: 1ページあたりの件数。autoの場合はAPIが受け付ける最大件数
+        :param decode: 変換方法。validate は検証する、trusted は検証しない、dict は辞書のまま返す、compact は読み取り専用の NamedTuple にする。省略した場合は設定の値
+        :param fields: モデルに残す項目
         :return:
         """
         return self.client.request(
             endpoint=f"/permissions",
             method="get",
             response_obj=Permission,
+            per_page=per_page,
+            paged=True,
+            decode=decode,
+            fields=fields,
         )
@@ -0,0 +1,81 @@
+"""JSONコーデックモジュール
+
+レスポンスのJSONを読み込むモジュールです。
+orjson がインストールされていればそちらを使い、なければ標準の json を使います。
+
+"""
+import json
+from typing import Any, Dict, Literal, Type
+
+codec_name = Literal["auto", "orjson", "json"]
+
+
+class Codec:
+    """
+    JSONコーデック
+    """
+
+    name = ""
+
+    def loads(self, data: bytes) -> Any:
+        """
+        JSONを読み込む
+
+        :param data: JSONのバイト列
+        :return:
+        """
+        raise NotImplementedError
+
+
+class StdlibCodec(Codec):
+    """
+    標準の json を使うコーデック
+    """
+
+    name = "json"
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """
+    orjson を使うコーデック
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def loads(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+CODECS: Dict[str, Type[Codec]] = {
+    "orjson": OrjsonCodec,
+    "json": StdlibCodec,
+}
+
+
+def get_codec(name: codec_name = "auto") -> Codec:
+    """
+    コーデックを取得する
+
+    auto の場合は orjson がインストールされていればそちらを、なければ json を使います
+
+    :param name: コーデックの名前
+    :return:
+    """
+    if name != "auto":
+        if name not in CODECS:
+            raise ValueError(f"unknown json codec: {name}")
+        return CODECS[name]()
+    for codec in CODECS.values():
+        try:
+            return codec()
+        except ImportError:
+            continue
+    return StdlibCodec()
@@ -0,0 +1,371 @@
+"""列指向スナップショットモジュール
+
+サーバーやNFSサーバーの一覧を、リソースごとのオブジェクトを作らずに列ごとの配列として読み込むモジュールです。
+ゾーンやプランなどは値の一覧と番号(カテゴリ)で保持し、ゾーンやプランごとの集計を配列のまま行えます。
+numpy がインストールされていれば集計に numpy を使い、 pyarrow がインストールされていれば Arrow のテーブルに変換できます。
+
+"""
+from array import array
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Literal, NamedTuple, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from .client import Client
+
+aggregation = Literal["sum", "min", "max", "mean"]
+
+
+class Column(NamedTuple):
+    """
+    スナップショットの列
+
+    kind が int の場合は64bit整数の配列、 category の場合は値の番号の配列と値の一覧、
+    str の場合は文字列のリストとして保持します
+
+    :param kind: 列の種類
+    :param get: レスポンスの辞書から値を取り出す関数
+    """
+
+    kind: Literal["int", "category", "str"]
+    get: Callable[[dict], Any]
+
+
+def _storage(kind: Optional[str] = None) -> Callable[[dict], int]:
+    return lambda item: sum(
+        storage["size_gibibytes"] for storage in item["storage"] if kind is None or storage["type"] == kind
+    )
+
+
+SERVER_COLUMNS: Dict[str, Column] = {
+    "id": Column("int", lambda server: server["id"]),
+    "name": Column("str", lambda server: server["name"]),
+    "zone": Column("category", lambda server: server["zone"]["code"]),
+    "plan": Column("category", lambda server: server["contract"]["plan_name"]),
+    "plan_code": Column("int", lambda server: server["contract"]["plan_code"]),
+    "version": Column("category", lambda server: server["version"]),
+    "service_type": Column("category", lambda server: server["service_type"]),
+    "service_status": Column("category", lambda server: server["service_status"]),
+    "power_status": Column("category", lambda server: server["power_status"]),
+    "cpu_cores": Column("int", lambda server: server["cpu_cores"]),
+    "memory_mebibytes": Column("int", lambda server: server["memory_mebibytes"]),
+    "storage_gibibytes": Column("int", _storage()),
+    "ssd_gibibytes": Column("int", _storage("ssd")),
+    "hdd_gibibytes": Column("int", _storage("hdd")),
+}
+NFS_SERVER_COLUMNS: Dict[str, Column] = {
+    "id": Column("int", lambda nfs_server: nfs_server["id"]),
+    "name": Column("str", lambda nfs_server: nfs_server["name"]),
+    "zone": Column("category", lambda nfs_server: nfs_server["zone"]["code"]),
+    "plan": Column("category", lambda nfs_server: nfs_server["contract"]["plan_name"]),
+    "plan_code": Column("int", lambda nfs_server: nfs_server["contract"]["plan_code"]),
+    "service_status": Column("category", lambda nfs_server: nfs_server["service_status"]),
+    "power_status": Column("category", lambda nfs_server: nfs_server["power_status"]),
+    "storage_gibibytes": Column("int", _storage()),
+}
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class Snapshot:
+    """
+    一覧を列ごとの配列として保持する
+
+    :param columns: 列の名前と定義
+    """
+
+    def __init__(self, columns: Dict[str, Column]):
+        self.columns = columns
+        self._count = 0
+        self._data: Dict[str, Union[array, list]] = {}
+        self._categories: Dict[str, Dict[Any, int]] = {}
+        for name, column in columns.items():
+            if column.kind == "int":
+                self._data[name] = array("q")
+            elif column.kind == "category":
+                self._data[name] = array("i")
+                self._categories[name] = {}
+            else:
+                self._data[name] = []
+
+    @classmethod
+    def from_items(cls, items: Iterable[dict], columns: Dict[str, Column]) -> "Snapshot":
+        """
+        レスポンスの辞書の一覧からスナップショットを作る
+
+        :param items: レスポンスの辞書
+        :param columns: 列の名前と定義
+        :return:
+        """
+        snapshot = cls(columns)
+        items = iter(items)
+        while True:
+            # 列ごとにまとめて追加するため、一定の件数ずつ読み込む
+            batch = list(islice(items, 1000))
+            if not batch:
+                return snapshot
+            snapshot.extend(batch)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, item: dict):
+        """
+        レスポンスの辞書を1件追加する
+
+        :param item: レスポンスの辞書
+        :return:
+        """
+        self.extend([item])
+
+    def extend(self, items: List[dict]):
+        """
+        レスポンスの辞書をまとめて追加する
+
+        :param items: レスポンスの辞書
+        :return:
+        """
+        # 途中で値を取り出せなかった場合に列の長さがそろわなくならないよう、全ての列の値を求めてから追加する
+        batch = {}
+        added = {}
+        for name, column in self.columns.items():
+            values = list(map(column.get, items))
+            if column.kind == "category":
+                categories = self._categories[name]
+                new = added[name] = {}
+                values = [
+                    categories[value] if value in categories else new.setdefault(value, len(categories) + len(new))
+                    for value in values
+                ]
+            batch[name] = values
+        for name, values in batch.items():
+            self._data[name].extend(values)
+        for name, new in added.items():
+            self._categories[name].update(new)
+        self._count += len(items)
+
+    def _column(self, name: str) -> Column:
+        if name not in self.columns:
+            raise ValueError(f"unknown column: {name}")
+        return self.columns[name]
+
+    def column(self, name: str):
+        """
+        列の配列を取得する
+
+        numpy がインストールされている場合は numpy の配列、ない場合は array を返します。
+        category の列は値の番号、 str の列は文字列のリストです。
+        返す配列は複製のため、変更してもスナップショットには影響しません
+
+        :param name: 列の名前
+        :return:
+        """
+        kind = self._column(name).kind
+        data = self._data[name]
+        numpy = _numpy()
+        if kind == "str":
+            return list(data)
+        if numpy is None:
+            return array(data.typecode, data)
+        # frombuffer の配列を保持されると array を拡張できなくなるため、複製して返す
+        return numpy.array(data, dtype=numpy.int64 if kind == "int" else numpy.int32)
+
+    def categories(self, name: str) -> List[Any]:
+        """
+        category の列の値の一覧を取得する。値の番号の順に並んでいます
+
+        :param name: 列の名前
+        :return:
+        """
+        if self._column(name).kind != "category":
+            raise ValueError(f"{name} is not a category column")
+        return list(self._categories[name])
+
+    def values(self, name: str) -> List[Any]:
+        """
+        列の値をリストで取得する
+
+        :param name: 列の名前
+        :return:
+        """
+        if self._column(name).kind != "category":
+            return list(self._data[name])
+        categories = self.categories(name)
+        return [categories[code] for code in self._data[name]]
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        列の名前と numpy の配列の辞書に変換する
+
+        category の列は値の番号の配列になります。値は ``categories`` で取得してください
+
+        :return:
+        """
+        numpy = _numpy()
+        if numpy is None:
+            raise ImportError('numpy is not installed. install it with pip install "vpsc[columnar]"')
+        return {
+            name: numpy.array(self._data[name], dtype=object) if column.kind == "str" else self.column(name)
+            for name, column in self.columns.items()
+        }
+
+    def to_arrow(self):
+        """
+        pyarrow のテーブルに変換する
+
+        category の列は辞書型の配列になります
+
+        :return:
+        """
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError('pyarrow is not installed. install it with pip install "vpsc[columnar]"') from None
+        arrays = []
+        for name, column in self.columns.items():
+            if column.kind == "int":
+                arrays.append(pyarrow.array(self._data[name], type=pyarrow.int64()))
+            elif column.kind == "category":
+                arrays.append(
+                    pyarrow.DictionaryArray.from_arrays(
+                        pyarrow.array(self._data[name], type=pyarrow.int32()),
+                        pyarrow.array(self.categories(name)),
+                    )
+                )
+            else:
+                arrays.append(pyarrow.array(self._data[name], type=pyarrow.string()))
+        return pyarrow.Table.from_arrays(arrays, names=list(self.columns))
+
+    def _factorize(self, name: str) -> Tuple[Union[array, List[int]], List[Any]]:
+        """
+        列を値の番号と値の一覧に分ける
+        """
+        if self._column(name).kind == "category":
+            return self._data[name], self.categories(name)
+        categories: Dict[Any, int] = {}
+        codes = array("i", (categories.setdefault(value, len(categories)) for value in self._data[name]))
+        return codes, list(categories)
+
+    def group_by(self, *keys: str, **aggregations: aggregation) -> Dict[Any, Dict[str, Union[int, float]]]:
+        """
+        列の値ごとに集計する
+
+        ``snapshot.group_by("zone", cpu_cores="sum", memory_mebibytes="sum")`` のように、
+        集計する列と集計方法(sum, min, max, mean)を指定します。件数は ``count`` に入ります。
+        numpy がインストールされている場合は配列のまま集計します
+
+        :param keys: 集計の単位にする列。複数指定した場合は値の tuple ごとに集計します
+        :param aggregations: 集計する列と集計方法
+        :return: 値ごとの集計結果
+        """
+        if not keys:
+            raise ValueError("at least one key is required")
+        for name, how in aggregations.items():
+            if self._column(name).kind != "int":
+                raise ValueError(f"{name} is not an int column")
+            if how not in ("sum", "min", "max", "mean"):
+                raise ValueError(f"unknown aggregation: {how}")
+        factorized = [self._factorize(key) for key in keys]
+        numpy = _numpy()
+        if numpy is not None:
+            groups, counts, results = self._aggregate_numpy(numpy, factorized, aggregations)
+        else:
+            groups, counts, results = self._aggregate_python(factorized, aggregations)
+        grouped = {}
+        for index, group in enumerate(groups):
+            codes = []
+            for _, categories in reversed(factorized):
+                group, code = divmod(group, len(categories))
+                codes.append(categories[code])
+            key = tuple(reversed(codes)) if len(keys) > 1 else codes[0]
+            grouped[key] = {"count": counts[index], **{name: result[index] for name, result in results.items()}}
+        return grouped
+
+    def _aggregate_numpy(self, numpy, factorized, aggregations):
+        group = numpy.zeros(self._count, dtype=numpy.int64)
+        for codes, categories in factorized:
+            group = group * len(categories) + numpy.frombuffer(codes, dtype=numpy.int32)
+        size = 1
+        for _, categories in factorized:
+            size *= len(categories)
+        counts = numpy.bincount(group, minlength=size)
+        present = numpy.nonzero(counts)[0]
+        results = {}
+        for name, how in aggregations.items():
+            values = numpy.frombuffer(self._data[name], dtype=numpy.int64)
+            if how in ("sum", "mean"):
+                total = numpy.zeros(size, dtype=numpy.int64)
+                numpy.add.at(total, group, values)
+                result = total[present] / counts[present] if how == "mean" else total[present]
+            else:
+                limit = numpy.iinfo(numpy.int64)
+                result = numpy.full(size, limit.max if how == "min" else limit.min, dtype=numpy.int64)
+                (numpy.minimum if how == "min" else numpy.maximum).at(result, group, values)
+                result = result[present]
+            results[name] = result.tolist()
+        return present.tolist(), counts[present].tolist(), results
+
+    def _aggregate_python(self, factorized, aggregations):
+        sizes = [len(categories) for _, categories in factorized]
+        columns = [codes for codes, _ in factorized]
+        counts: Dict[int, int] = {}
+        totals: Dict[str, Dict[int, int]] = {name: {} for name in aggregations}
+        for row, codes in enumerate(zip(*columns)):
+            group = 0
+            for code, size in zip(codes, sizes):
+                group = group * size + code
+            counts[group] = counts.get(group, 0) + 1
+            for name, how in aggregations.items():
+                value = self._data[name][row]
+                current = totals[name].get(group)
+                if current is None:
+                    totals[name][group] = value
+                elif how in ("sum", "mean"):
+                    totals[name][group] = current + value
+                elif how == "min":
+                    totals[name][group] = min(current, value)
+                else:
+                    totals[name][group] = max(current, value)
+        groups = sorted(counts)
+        results = {}
+        for name, how in aggregations.items():
+            if how == "mean":
+                results[name] = [totals[name][group] / counts[group] for group in groups]
+            else:
+                results[name] = [totals[name][group] for group in groups]
+        return groups, [counts[group] for group in groups], results
+
+
+def server_snapshot(client: "Client", columns: Optional[Dict[str, Column]] = None, **filters) -> Snapshot:
+    """
+    サーバー一覧を取得してスナップショットを作る
+
+    一覧は受信したページの辞書のまま読み込むため、サーバーごとのモデルや辞書の複製は作りません。
+    ``VPS_STREAM=true`` の場合は受信しながら1件ずつ列に追加します
+
+    :param client: クライアント
+    :param columns: 列の名前と定義。省略した場合は SERVER_COLUMNS
+    :param filters: ``get_servers`` の絞り込み条件
+    :return:
+    """
+    items = client.get_servers(per_page="auto", decode="dict", **filters)
+    return Snapshot.from_items(items, columns or SERVER_COLUMNS)
+
+
+def nfs_server_snapshot(client: "Client", columns: Optional[Dict[str, Column]] = None) -> Snapshot:
+    """
+    NFSサーバー一覧を取得してスナップショットを作る
+
+    サーバー一覧と同じく、受信したページの辞書のまま読み込みます
+
+    :param client: クライアント
+    :param columns: 列の名前と定義。省略した場合は NFS_SERVER_COLUMNS
+    :return:
+    """
+    items = client.get_nfs_servers(per_page="auto", decode="dict")
+    return Snapshot.from_items(items, columns or NFS_SERVER_COLUMNS)
@@ -1,22 +1,136 @@
 """
 VPSC のコマンド一覧です
+
+コマンドを実行するたびに起動するため、 requests, pydantic やモデルは実行するコマンドで必要になった時点で読み込みます。
+ヘルプの表示や引数の誤りではこれらを読み込みません
 """
 
-from time import sleep
-from xmlrpc.client import Fault
+import importlib
+import json
+from typing import TYPE_CHECKING
 
 import click
-from pydantic import BaseModel
 
-from .models.custom import UpdateServer, UpdateHost, UpdateNfsServer, UpdateNfsServerIpv4, UpdateApiKey, CreateApiKey
 from .exceptions import exception_handler, APIException
-from .client import APIConfig, Client
 
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+    from .client import Client
+    from .disk_cache import InventoryCache
+    from .watch import WatchEvent
+
+# 必要になった時点で読み込む名前と、そのモジュール
+_LAZY_IMPORTS = {
+    "APIConfig": ".client",
+    "Client": ".client",
+    "InventoryCache": ".disk_cache",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __package__), name)
+    globals()[name] = value
+    return value
+
+
+def _lazy(name: str):
+    """
+    遅延して読み込む名前を取得する
+
+    テストなどで差し替えられている場合は、差し替えた値を返します
+
+    :param name: _LAZY_IMPORTS の名前
+    :return:
+    """
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+class _LazyClient:
+    """
+    最初に使われた時点で Client を作るクライアント
 
-def _print(data: BaseModel):
+    Client の作成には設定の読み込みと requests, pydantic のインポートが必要なため、
+    API を呼び出すコマンドが実行されるまで作成しません
+    """
+
+    def __init__(self):
+        self._client = None
+
+    def resolve(self) -> "Client":
+        if self._client is None:
+            self._client = _lazy("Client")(config=_lazy("APIConfig")())
+        return self._client
+
+    def __getattr__(self, name: str):
+        return getattr(self.resolve(), name)
+
+
+client = _LazyClient()
+
+
+def _print(data: "BaseModel"):
+    if isinstance(data, tuple):
+        # VPS_DECODE=compact の場合
+        from .models.compact import to_model
+
+        data = to_model(data)
     click.echo(data.model_dump_json(exclude_unset=True, indent=2))
 
 
+def _inventory_cache() -> "InventoryCache":
+    return _lazy("InventoryCache")(client.config.inventory_cache_path, client.config)
+
+
+def _print_listing(name: str, model, refresh: bool, max_age: int):
+    """
+    キャッシュを利用して一覧を表示する
+
+    キャッシュが古い場合はキャッシュを表示してから、バックグラウンドで更新します
+    """
+    cache = _inventory_cache()
+    cached = None if refresh else cache.load(name)
+    if cached is None:
+        items = cache.refresh(name, client.resolve())
+    else:
+        items = cached.items
+    for item in items:
+        _print(model.model_validate(item))
+    if cached is not None and cached.age > max_age:
+        cache.refresh_in_background(name)
+
+
+def _print_event(event: "WatchEvent"):
+    """
+    変更を1行のJSONで表示する
+    """
+    data = {"type": event.type, "id": event.id}
+    if event.type == "changed":
+        data["changes"] = {name: {"before": before, "after": after} for name, (before, after) in event.changes.items()}
+    else:
+        data["resource"] = event.resource.model_dump(mode="json", exclude_unset=True)
+    click.echo(json.dumps(data, ensure_ascii=False))
+
+
+def _cache_options(func):
+    func = click.option("--max-age", help="キャッシュを最新とみなす秒数", required=False, type=int, default=60, show_default=True)(
+        func
+    )
+    func = click.option("--refresh", help="キャッシュを使わずに取得", is_flag=True, default=False)(func)
+    return func
+
+
+def _wait_options(func):
+    func = click.option("--timeout", help="電源状態を待つ最大秒数", required=False, type=float, default=300, show_default=True)(
+        func
+    )
+    func = click.option("--wait/--no-wait", help="電源状態が変わるまで待つ", default=True, show_default=True)(func)
+    return func
+
+
 @click.group()
 def vpsc():
     """
@@ -25,7 +139,7 @@ def vpsc():
     操作するリソースを指定して実行してください
     """
     global client
-    client = Client(config=APIConfig())
+    client = _LazyClient()
 
 
 @vpsc.group()
@@ -52,13 +166,20 @@ def apikey():
 
 @click.command(name="list")
 @click.option("--server-id", "-id", help="サーバーID", required=False, type=int)
-def get_servers(server_id):
+@_cache_options
+@click.option("--watch", "-w", help="一覧を取得し続けて変更を表示", is_flag=True, default=False)
+@click.option("--interval", help="--watch の取得間隔(秒)", required=False, type=float, default=5, show_default=True)
+def get_servers(server_id, refresh, max_age, watch, interval):
     """サーバー情報の取得"""
     if server_id is not None:
         _print(client.get_server(server_id=server_id))
+    elif watch:
+        for event in client.watch_servers(interval=interval):
+            _print_event(event)
     else:
-        for item in client.get_servers():
-            _print(item)
+        from .models.generated import Server
+
+        _print_listing("servers", Server, refresh=refresh, max_age=max_age)
 
 
 @click.command(name="update")
@@ -67,8 +188,11 @@ def get_servers(server_id):
 @click.option("--description", "-d", help="説明", required=False, type=str, default="")
 def update_server(server_id, name, description):
     """サーバー情報更新"""
+    from .models.custom import UpdateServer
+
     data = UpdateServer(name=name, description=description)
     res = client.update_server(server_id=server_id, data=data)
+    _inventory_cache().invalidate("servers")
     _print(res)
 
 
@@ -81,21 +205,29 @@ def get_server_power_status(server_id):
 
 @click.command(name="power-on")
 @click.option("--server-id", "-id", help="サーバーID", required=True, type=int)
-def power_on_server(server_id):
+@_wait_options
+def power_on_server(server_id, wait, timeout):
     """サーバーを起動"""
     client.power_on_server(server_id=server_id)
-    sleep(5)
-    _print(client.get_server_power_status(server_id=server_id))
+    _inventory_cache().invalidate("servers")
+    if wait:
+        _print(client.wait_for_power_status(server_id=server_id, target="power_on", timeout=timeout))
+    else:
+        _print(client.get_server_power_status(server_id=server_id))
 
 
 @click.command(name="shutdown")
 @click.option("--server-id", "-id", help="サーバーID", required=True, type=int)
 @click.option("--force", "-f", help="強制的にシャットダウン", required=False, type=bool, default=False, is_flag=True)
-def shutdown_server(server_id, force):
+@_wait_options
+def shutdown_server(server_id, force, wait, timeout):
     """サーバーをシャットダウン"""
     client.shutdown_server(server_id=server_id, force=force)
-    sleep(5)
-    _print(client.get_server_power_status(server_id=server_id))
+    _inventory_cache().invalidate("servers")
+    if wait:
+        _print(client.wait_for_power_status(server_id=server_id, target="power_off", timeout=timeout))
+    else:
+        _print(client.get_server_power_status(server_id=server_id))
 
 
 @click.command(name="ptr-record")
@@ -106,11 +238,14 @@ def shutdown_server(server_id, force):
 @click.option("--hostname", "-h", help="ホスト名", required=True, type=str)
 def update_server_ptr_record(server_id, type_, hostname):
     """サーバーの逆引きホスト名を設定"""
+    from .models.custom import UpdateHost
+
     data = UpdateHost(hostname=hostname)
     if type_ == "ipv4":
         client.update_server_ipv4_ptr(server_id=server_id, data=data)
     elif type_ == "ipv6":
         client.update_server_ipv6_ptr(server_id=server_id, data=data)
+    _inventory_cache().invalidate("servers")
     _print(client.get_server(server_id=server_id))
 
 
@@ -123,13 +258,15 @@ def get_server_limitation(server_id):
 
 @click.command(name="list")
 @click.option("--nfs-server-id", "-id", help="NFSサーバーID", required=False, type=int)
-def get_nfs_servers(nfs_server_id):
+@_cache_options
+def get_nfs_servers(nfs_server_id, refresh, max_age):
     """NFSサーバー情報の取得"""
     if nfs_server_id is not None:
         _print(client.get_nfs_server(nfs_server_id=nfs_server_id))
     else:
-        for item in client.get_nfs_servers():
-            _print(item)
+        from .models.generated import NfsServer
+
+        _print_listing("nfs-servers", NfsServer, refresh=refresh, max_age=max_age)
 
 
 @click.command(name="update")
@@ -138,8 +275,11 @@ def get_nfs_servers(nfs_server_id):
 @click.option("--description", "-d", help="説明", required=False, type=str, default="")
 def update_nfs_server(nfs_server_id, name, description):
     """サーバー情報更新"""
+    from .models.custom import UpdateNfsServer
+
     data = UpdateNfsServer(name=name, description=description)
     res = client.update_nfs_server(nfs_server_id=nfs_server_id, data=data)
+    _inventory_cache().invalidate("nfs-servers")
     _print(res)
 
 
@@ -148,8 +288,11 @@ def update_nfs_server(nfs_server_id, name, description):
 @click.option("--hostname", "-h", help="ホスト名", required=True, type=str)
 def update_nfs_server_ipv4(nfs_server_id, address, netmask):
     """NFSサーバーのipv4を設定"""
+    from .models.custom import UpdateNfsServerIpv4
+
     data = UpdateNfsServerIpv4(address=address, netmask=netmask)
     client.update_nfs_server_ipv4(nfs_server_id=nfs_server_id, data=data)
+    _inventory_cache().invalidate("nfs-servers")
     _print(client.get_nfs_server(nfs_server_id=nfs_server_id))
 
 
@@ -175,6 +318,8 @@ def get_api_keys(key_id):
 @click.option("--name", "-n", help="名前", required=False, type=str, default="")
 @click.option("--role-id", "-rid", help="ロールID", required=True, type=int)
 def create_api_key(name, role_id):
+    from .models.custom import CreateApiKey
+
     data = CreateApiKey(name=name, role=role_id)
     res = client.create_api_key(data=data)
     _print(res)
@@ -185,6 +330,8 @@ def create_api_key(name, role_id):
 @click.option("--name", "-n", help="名前", required=False, type=str, default="")
 @click.option("--role-id", "-rid", help="ロールID", required=True, type=int)
 def update_api_key(key_id, name, role_id):
+    from .models.custom import UpdateApiKey
+
     data = UpdateApiKey(name=name, role=role_id)
     res = client.update_api_key(key_id=key_id, data=data)
     _print(res)
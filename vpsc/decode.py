@@ -0,0 +1,236 @@
+"""デコードモジュール
+
+レスポンスの辞書をモデルに変換するモジュールです。
+信頼できるレスポンスであれば検証を省略してモデルを組み立てたり、辞書のまま返したりできます。
+
+"""
+import itertools
+import sys
+from functools import lru_cache
+from inspect import isclass
+from typing import Any, Callable, List, Literal, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, RootModel
+from pydantic_core import CoreSchema, SchemaValidator, ValidationError, core_schema
+
+from .intern import Interner
+
+if sys.version_info >= (3, 10):
+    from types import UnionType
+
+    _union_types = (Union, UnionType)
+else:
+    _union_types = (Union,)
+
+# validate: 全て検証する、 trusted: 検証せずにモデルを組み立てる、 dict: 辞書のまま返す、
+# compact: 検証せずに models.compact の読み取り専用の型にする
+decode_mode = Literal["validate", "trusted", "dict", "compact"]
+
+
+def _builder(annotation) -> Optional[Callable[[Any], Any]]:
+    """
+    型ヒントから値を組み立てる関数を作る。モデルを含まない型の場合は None
+    """
+    origin = get_origin(annotation)
+    if origin in _union_types:
+        builders = [builder for builder in map(_builder, get_args(annotation)) if builder is not None]
+        return builders[0] if len(builders) == 1 else None
+    if origin in (list, List):
+        args = get_args(annotation)
+        inner = _builder(args[0]) if args else None
+        if inner is None:
+            return None
+        return lambda value: [inner(item) for item in value] if isinstance(value, list) else value
+    if isclass(annotation) and issubclass(annotation, BaseModel):
+        return lambda value: _construct(annotation, value)
+    return None
+
+
+@lru_cache(maxsize=None)
+def _plan(model: Type[BaseModel]) -> Tuple[Tuple[str, str, Optional[Callable[[Any], Any]], Any], ...]:
+    """
+    モデルの項目ごとに、レスポンスのキー、値を組み立てる関数、既定値の取得元をまとめる
+    """
+    return tuple(
+        (name, field.alias or name, _builder(field.annotation), None if field.is_required() else field)
+        for name, field in model.model_fields.items()
+    )
+
+
+_new = object.__new__
+_setattr = object.__setattr__
+
+
+def copy_json(value: Any) -> Any:
+    """
+    レスポンスの値を複製する
+
+    キャッシュやリクエストの集約で共有するレスポンスを呼び出し元に渡す前に使い、
+    呼び出し元での変更が他の呼び出し元に影響しないようにします
+
+    :param value: レスポンスの値
+    :return:
+    """
+    if isinstance(value, dict):
+        return {key: copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_json(item) for item in value]
+    return value
+
+
+def _schema(annotation) -> Optional[CoreSchema]:
+    """
+    型ヒントから値を確認せずにモデルを組み立てるスキーマを作る。モデルを含まない型の場合は None
+    """
+    origin = get_origin(annotation)
+    if origin in _union_types:
+        schemas = [schema for schema in map(_schema, get_args(annotation)) if schema is not None]
+        return schemas[0] if len(schemas) == 1 else None
+    if origin in (list, List):
+        args = get_args(annotation)
+        inner = _schema(args[0]) if args else None
+        return core_schema.list_schema(inner) if inner is not None else None
+    if isclass(annotation) and issubclass(annotation, BaseModel):
+        return core_schema.nullable_schema(_model_schema(annotation))
+    return None
+
+
+def _model_schema(model: Type[BaseModel]) -> CoreSchema:
+    if issubclass(model, RootModel):
+        root = _schema(model.model_fields["root"].annotation)
+        return core_schema.model_schema(model, root or core_schema.any_schema(), root_model=True)
+    fields = {}
+    for name, field in model.model_fields.items():
+        schema = _schema(field.annotation) or core_schema.any_schema()
+        if field.default_factory is not None:
+            schema = core_schema.with_default_schema(schema, default_factory=field.default_factory)
+        elif not field.is_required():
+            schema = core_schema.with_default_schema(schema, default=field.default)
+        fields[name] = core_schema.model_field(schema, validation_alias=field.alias)
+    return core_schema.model_schema(model, core_schema.model_fields_schema(fields))
+
+
+@lru_cache(maxsize=None)
+def _validator(model: Type[BaseModel]) -> Optional[SchemaValidator]:
+    """
+    値を確認せずに入れ子のモデルまで組み立てる検証器。再帰するモデルの場合は None
+    """
+    try:
+        return SchemaValidator(_model_schema(model))
+    except RecursionError:
+        return None
+
+
+def construct(model: Type[BaseModel], data: Any) -> Any:
+    """
+    検証せずにモデルを組み立てる
+
+    ``model_construct`` と異なり、入れ子のモデルも組み立てます。
+    値の型を確認しないスキーマを pydantic-core で実行して組み立て、
+    項目が足りないなどスキーマに合わない場合は Python で組み立てます
+
+    :param model: モデル
+    :param data: レスポンスの値
+    :return:
+    """
+    return _build(_validator(model), model, data)
+
+
+def _build(validator: Optional[SchemaValidator], model: Type[BaseModel], data: Any) -> Any:
+    if validator is not None:
+        try:
+            return validator.validate_python(data)
+        except ValidationError:
+            pass
+    return _construct(model, data)
+
+
+def _construct(model: Type[BaseModel], data: Any) -> Any:
+    if issubclass(model, RootModel):
+        builder = _plan(model)[0][2]
+        return model.model_construct(builder(data) if builder is not None else data)
+    if not isinstance(data, dict):
+        return data
+    values = {}
+    defaults = None
+    for name, key, builder, default in _plan(model):
+        try:
+            value = data[key]
+        except KeyError:
+            if default is not None:
+                defaults = defaults or {}
+                defaults[name] = default.get_default(call_default_factory=True)
+            continue
+        if builder is not None and value is not None:
+            value = builder(value)
+        values[name] = value
+    fields_set = set(values)
+    if defaults:
+        values.update(defaults)
+    # model_construct と同じ属性を直接設定する
+    instance = _new(model)
+    _setattr(instance, "__dict__", values)
+    _setattr(instance, "__pydantic_fields_set__", fields_set)
+    _setattr(instance, "__pydantic_extra__", None)
+    _setattr(instance, "__pydantic_private__", None)
+    return instance
+
+
+class Decoder:
+    """
+    レスポンスの辞書をモデルに変換する
+
+    trusted は検証を行わないため、APIに項目の値が追加された場合でも変換に失敗せず、 validate より速く変換できます。
+    モデルへの変換自体を省く場合は dict を使ってください。
+    sample を指定した場合、 trusted と compact では sample 件に1件だけ検証し、レスポンスの変化に気付けるようにします。
+    compact はコンパクトな型が生成されていないモデルでは validate と同じ動作になります。
+    interner を指定した場合は、変換の前後で同じ値を1つのオブジェクトにまとめます
+
+    :param response_obj: モデル。None の場合は辞書のまま返す
+    :param mode: 変換方法
+    :param sample: 検証する間隔
+    :param interner: 値をまとめる Interner
+    """
+
+    def __init__(
+        self,
+        response_obj: Optional[Type[BaseModel]],
+        mode: decode_mode = "validate",
+        sample: int = 0,
+        interner: Optional[Interner] = None,
+    ):
+        if mode not in ("validate", "trusted", "dict", "compact"):
+            raise ValueError(f"unknown decode mode: {mode}")
+        self.response_obj = response_obj
+        self.compact = None
+        if mode == "compact":
+            # compact を使わない場合は NamedTuple の型を読み込まない
+            from .models.compact import COMPACT_TYPES
+
+            self.compact = COMPACT_TYPES.get(response_obj)
+        if response_obj is None:
+            mode = "dict"
+        elif mode == "compact" and self.compact is None:
+            mode = "validate"
+        self.mode = mode
+        # trusted で毎回探さないように、組み立てに使う検証器を取得しておく
+        self._validator = _validator(response_obj) if mode == "trusted" else None
+        self.sample = sample
+        self.interner = interner
+        self._counter = itertools.count()
+
+    def __call__(self, item: dict) -> Any:
+        if self.interner is None:
+            return self._decode(item)
+        value = self._decode(self.interner.json(item))
+        return self.interner.frozen(value) if self.mode == "compact" else value
+
+    def _decode(self, item: dict) -> Any:
+        if self.mode == "dict":
+            return item
+        if self.mode == "validate" or (self.sample > 0 and next(self._counter) % self.sample == 0):
+            model = self.response_obj(**item)
+            return self.compact.from_dict(item) if self.mode == "compact" else model
+        if self.mode == "compact":
+            return self.compact.from_dict(item)
+        return _build(self._validator, self.response_obj, item)
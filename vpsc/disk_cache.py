@@ -0,0 +1,173 @@
+"""ディスクキャッシュモジュール
+
+コマンドラインで一覧を表示する際に、前回取得した一覧をSQLiteに保存しておくモジュールです。
+キャッシュが古い場合はキャッシュを表示したうえで、バックグラウンドで更新します(stale-while-revalidate)。
+
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from typing import List, NamedTuple, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import APIConfig, Client
+
+# キャッシュ対象の一覧と取得に使うメソッド
+LISTINGS = {
+    "servers": "get_servers",
+    "nfs-servers": "get_nfs_servers",
+}
+
+# バックグラウンドの更新が終わらない場合に、次の更新を始めるまでの秒数
+REFRESH_TIMEOUT = 300
+
+
+class CachedListing(NamedTuple):
+    """
+    キャッシュされた一覧
+    """
+
+    fetched_at: float
+    items: List[dict]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class InventoryCache:
+    """
+    SQLiteに保存する一覧のキャッシュ
+
+    ホストとAPIキーごとに分けて保存します
+
+    :param path: SQLiteのファイル
+    :param config: 接続先の設定
+    """
+
+    def __init__(self, path: str, config: "APIConfig"):
+        self.path = os.path.expanduser(path)
+        self.namespace = hashlib.sha256(f"{config.host}\n{config.api_key}".encode("utf-8")).hexdigest()[:16]
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS listings "
+                "(namespace TEXT, name TEXT, fetched_at REAL, items TEXT, PRIMARY KEY (namespace, name))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS refreshes "
+                "(namespace TEXT, name TEXT, started_at REAL, PRIMARY KEY (namespace, name))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def load(self, name: str) -> Optional[CachedListing]:
+        """
+        キャッシュを取得する
+
+        :param name: 一覧の名前
+        :return:
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at, items FROM listings WHERE namespace = ? AND name = ?", (self.namespace, name)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedListing(fetched_at=row[0], items=json.loads(row[1]))
+
+    def store(self, name: str, items: List[dict]):
+        """
+        キャッシュを保存する
+
+        :param name: 一覧の名前
+        :param items: 一覧の各要素
+        :return:
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO listings (namespace, name, fetched_at, items) VALUES (?, ?, ?, ?)",
+                (self.namespace, name, time.time(), json.dumps(items, ensure_ascii=False)),
+            )
+            # 更新が終わったので、次のバックグラウンドの更新を始められるようにする
+            conn.execute("DELETE FROM refreshes WHERE namespace = ? AND name = ?", (self.namespace, name))
+
+    def invalidate(self, name: str):
+        """
+        キャッシュを破棄する
+
+        :param name: 一覧の名前
+        :return:
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM listings WHERE namespace = ? AND name = ?", (self.namespace, name))
+
+    def refresh(self, name: str, client: "Client") -> List[dict]:
+        """
+        APIから一覧を取得してキャッシュを更新する
+
+        :param name: 一覧の名前
+        :param client: クライアント
+        :return:
+        """
+        # 表示する際に検証するため、ここでは辞書のまま取得する
+        items = list(getattr(client, LISTINGS[name])(decode="dict"))
+        self.store(name, items)
+        return items
+
+    def _start_refresh(self, name: str) -> bool:
+        """
+        バックグラウンドの更新を始めたことを記録する
+
+        REFRESH_TIMEOUT 秒以内に始めた更新がある場合は記録しません。
+        更新が失敗した場合は記録が残るため、 REFRESH_TIMEOUT 秒は次の更新を始めません
+
+        :param name: 一覧の名前
+        :return: 記録した場合は True
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO refreshes (namespace, name, started_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (namespace, name) DO UPDATE SET started_at = excluded.started_at "
+                "WHERE refreshes.started_at < ?",
+                (self.namespace, name, now, now - REFRESH_TIMEOUT),
+            )
+            return cursor.rowcount > 0
+
+    def refresh_in_background(self, name: str) -> bool:
+        """
+        別プロセスでキャッシュを更新する
+
+        コマンドが続けて実行された場合に更新のプロセスが重複しないよう、
+        他のプロセスが更新中の場合は何もしません
+
+        :param name: 一覧の名前
+        :return: 更新を始めた場合は True
+        """
+        if not self._start_refresh(name):
+            return False
+        subprocess.Popen(
+            [sys.executable, "-m", "vpsc.disk_cache", name],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        return True
+
+
+def main(name: str):
+    from .client import APIConfig, Client
+
+    config = APIConfig()
+    with Client(config=config) as client:
+        InventoryCache(config.inventory_cache_path, config).refresh(name, client)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
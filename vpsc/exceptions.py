@@ -11,3 +11,10 @@ def exception_handler(exc):
         else:
             print(f"status_code: {exc.status}")
             print(f"content: {exc.json}")
+
+
+class WaitTimeout(Exception):
+    def __init__(self, timeout, last):
+        super().__init__(f"timed out after {timeout} seconds: {last}")
+        self.timeout = timeout
+        self.last = last
@@ -0,0 +1,123 @@
+"""インターンモジュール
+
+一覧の要素に繰り返し現れる同じ値を1つのオブジェクトにまとめるモジュールです。
+ゾーンやプラン名、ネームサーバーなどはほとんどのサーバーで同じ値のため、
+まとめることで保持するメモリが要素の数ではなく異なる値の数に応じて増えるようになります。
+
+"""
+from typing import Any, Dict, Hashable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import APIConfig
+
+
+class Interner:
+    """
+    同じ値を1つのオブジェクトにまとめる
+
+    文字列と数値はどの変換方法でもまとめます。辞書やモデルは変更できるためまとめず、
+    変更できない tuple ( ``decode="compact"`` の値)は入れ子のものも含めてまとめます。
+    ``Client`` の中で共有されるため、前回の取得時と同じ値は前回のオブジェクトを使います
+
+    :param max_size: 保持する値の最大数。超えた場合は保持している値を破棄してやり直します
+    """
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._pool: Dict[Hashable, Any] = {}
+
+    @classmethod
+    def from_config(cls, config: "APIConfig") -> Optional["Interner"]:
+        if not config.intern:
+            return None
+        return cls(max_size=config.intern_max_size)
+
+    def __len__(self):
+        return len(self._pool)
+
+    def clear(self):
+        """
+        保持している値を破棄する
+
+        :return:
+        """
+        self._pool = {}
+
+    def _get(self, key: Hashable, value: Any) -> Any:
+        pool = self._pool
+        found = pool.get(key)
+        if found is not None:
+            return found
+        if len(pool) >= self.max_size:
+            self.clear()
+            pool = self._pool
+        return pool.setdefault(key, value)
+
+    def scalar(self, value: Any) -> Any:
+        """
+        文字列や数値をまとめる
+
+        :param value: 値
+        :return: 同じ値が既にあればそのオブジェクト
+        """
+        kind = type(value)
+        if kind is str:
+            return self._pool.get(value) or self._get(value, value)
+        if kind is int:
+            # -5 から 256 までは Python が最初から1つのオブジェクトにまとめている
+            return value if -5 <= value <= 256 else self._get((int, value), value)
+        if kind is float:
+            # 1 と 1.0 は等しいため、型も含めて比べる
+            return self._get((float, value), value)
+        return value
+
+    def json(self, data: Any) -> Any:
+        """
+        レスポンスの辞書に含まれる文字列と数値をまとめる
+
+        辞書とリストはそのまま使い、中の値だけを置き換えます
+
+        :param data: レスポンスの値
+        :return:
+        """
+        kind = type(data)
+        if kind is dict:
+            items = data.items()
+        elif kind is list:
+            items = enumerate(data)
+        else:
+            return self.scalar(data)
+        pool = self._pool
+        for key, value in items:
+            kind = type(value)
+            if kind is str:
+                # 大半を占める文字列は呼び出しを省いて直接探す
+                canonical = pool.get(value)
+                data[key] = canonical if canonical is not None else self._get(value, value)
+            elif kind is dict or kind is list:
+                self.json(value)
+            elif value is not None:
+                data[key] = self.scalar(value)
+        return data
+
+    def frozen(self, value: tuple) -> tuple:
+        """
+        tuple (NamedTuple を含む)を入れ子のものも含めてまとめる
+
+        中の文字列と数値はまとめないため、先に ``json`` でまとめたレスポンスから作った値を渡してください
+
+        :param value: 値
+        :return:
+        """
+        changed = False
+        items = []
+        for item in value:
+            if isinstance(item, tuple):
+                canonical = self.frozen(item)
+                changed = changed or canonical is not item
+                item = canonical
+            items.append(item)
+        if changed:
+            value = tuple.__new__(type(value), items)
+        # 型が異なる等しい値 (例えば同じ項目を持つ別の NamedTuple) を取り違えないよう、型も含めて比べる
+        return self._get((type(value), value), value)
@@ -0,0 +1,327 @@
+"""インベントリモジュール
+
+サーバー、NFSサーバー、スイッチの一覧をまとめて読み込み、名前やアドレスなどで引けるようにするモジュールです。
+2回目以降の更新では変更されたリソースの索引だけを更新します。
+
+"""
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+    TYPE_CHECKING,
+)
+
+from pydantic import BaseModel
+
+from .bulk import run_bulk
+from .models.generated import Server, NfsServer, Switch, ServerInterface, NfsServerInterface
+from .watch import WatchEvent, Watcher
+
+if TYPE_CHECKING:
+    from .client import Client
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class ResourceIndex(Generic[T]):
+    """
+    IDと任意の項目で引けるリソースの集合
+
+    :param keys: 索引の名前と、リソースから索引の値を取り出す関数
+    """
+
+    def __init__(self, keys: Dict[str, Callable[[T], Iterable[Hashable]]]):
+        self.keys = keys
+        self._resources: Dict[Any, T] = {}
+        # 索引の名前 -> 値 -> ID (挿入順を保つため dict を集合として使う)
+        self._indexes: Dict[str, Dict[Hashable, Dict[Any, None]]] = {name: {} for name in keys}
+
+    def __len__(self):
+        return len(self._resources)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._resources.values())
+
+    def __contains__(self, resource_id) -> bool:
+        return resource_id in self._resources
+
+    def get(self, resource_id) -> Optional[T]:
+        """
+        IDでリソースを取得する
+
+        :param resource_id: リソースID
+        :return:
+        """
+        return self._resources.get(resource_id)
+
+    def find(self, **criteria) -> List[T]:
+        """
+        索引でリソースを検索する
+
+        複数の条件を指定した場合は、全てに一致するリソースを返します
+
+        :param criteria: 索引の名前と値
+        :return:
+        """
+        ids = None
+        for name, value in criteria.items():
+            if name not in self._indexes:
+                raise ValueError(f"unknown index: {name}")
+            matched = self._indexes[name].get(value, {})
+            ids = matched.keys() if ids is None else ids & matched.keys()
+        if ids is None:
+            return list(self)
+        return [self._resources[resource_id] for resource_id in ids]
+
+    def first(self, **criteria) -> Optional[T]:
+        """
+        索引でリソースを検索し、最初に一致したリソースを返す
+
+        :param criteria: 索引の名前と値
+        :return:
+        """
+        found = self.find(**criteria)
+        return found[0] if found else None
+
+    def add(self, resource_id, resource: T):
+        """
+        リソースを追加する。同じIDのリソースがあれば置き換える
+
+        :param resource_id: リソースID
+        :param resource: リソース
+        :return:
+        """
+        self.remove(resource_id)
+        self._resources[resource_id] = resource
+        for name, key in self.keys.items():
+            for value in key(resource):
+                if value is not None:
+                    self._indexes[name].setdefault(value, {})[resource_id] = None
+
+    def remove(self, resource_id):
+        """
+        リソースを削除する
+
+        :param resource_id: リソースID
+        :return:
+        """
+        resource = self._resources.pop(resource_id, None)
+        if resource is None:
+            return
+        for name, key in self.keys.items():
+            index = self._indexes[name]
+            for value in key(resource):
+                ids = index.get(value)
+                if ids is None:
+                    continue
+                ids.pop(resource_id, None)
+                if not ids:
+                    del index[value]
+
+    def apply(self, events: Iterable[WatchEvent]):
+        """
+        変更を反映する
+
+        :param events: 変更の一覧
+        :return:
+        """
+        for event in events:
+            if event.type == "removed":
+                self.remove(event.id)
+            else:
+                self.add(event.id, event.resource)
+
+
+SERVER_KEYS = {
+    "name": lambda server: [server.name],
+    "hostname": lambda server: [server.ipv4.hostname, server.ipv6.hostname],
+    "address": lambda server: [server.ipv4.address, server.ipv6.address],
+    "zone": lambda server: [server.zone.code],
+    "service_code": lambda server: [server.contract.service_code],
+}
+NFS_SERVER_KEYS = {
+    "name": lambda nfs_server: [nfs_server.name],
+    "address": lambda nfs_server: [nfs_server.ipv4.address],
+    "zone": lambda nfs_server: [nfs_server.zone.code],
+    "service_code": lambda nfs_server: [nfs_server.contract.service_code],
+}
+SWITCH_KEYS = {
+    "name": lambda switch: [switch.name],
+    "switch_code": lambda switch: [switch.switch_code],
+    "zone": lambda switch: [switch.zone.code],
+    "server_interface": lambda switch: switch.server_interfaces,
+    "nfs_server_interface": lambda switch: switch.nfs_server_interfaces,
+    "service_code": lambda switch: [switch.external_connection.service_code if switch.external_connection else None],
+}
+
+
+class Inventory:
+    """
+    サーバー、NFSサーバー、スイッチのインベントリ
+
+    ``servers`` 、 ``nfs_servers`` 、 ``switches`` は次の索引で検索できます
+
+    * servers: name, hostname, address (IPv4/IPv6), zone, service_code
+    * nfs_servers: name, address, zone, service_code
+    * switches: name, switch_code, zone, server_interface, nfs_server_interface, service_code
+
+    interfaces を有効にすると、追加・変更されたサーバーとNFSサーバーのインターフェースも取得し、
+    スイッチとの接続関係を引けるようにします。リソースごとにAPIを呼び出すため、既定では無効です。
+    インターフェースの取得に失敗した場合は例外を送出し、そのリソースは次回の ``refresh`` で取得し直します
+
+    :param client: クライアント
+    :param interfaces: インターフェースを取得するか
+    :param concurrency: インターフェース取得の同時実行数
+    """
+
+    collections = ("servers", "nfs_servers", "switches")
+
+    def __init__(self, client: "Client", interfaces: bool = False, concurrency: int = 8):
+        self.client = client
+        self.interfaces = interfaces
+        self.concurrency = concurrency
+        self.servers: ResourceIndex[Server] = ResourceIndex(SERVER_KEYS)
+        self.nfs_servers: ResourceIndex[NfsServer] = ResourceIndex(NFS_SERVER_KEYS)
+        self.switches: ResourceIndex[Switch] = ResourceIndex(SWITCH_KEYS)
+        self.server_interfaces: Dict[int, List[ServerInterface]] = {}
+        self.nfs_server_interfaces: Dict[int, List[NfsServerInterface]] = {}
+        # インターフェースID -> 所有するリソースのID
+        self._owners: Dict[str, Dict[int, int]] = {"server_interfaces": {}, "nfs_server_interfaces": {}}
+        # インターフェースの取得に失敗し、次回の更新で取得し直すリソースのID
+        self._pending: Dict[str, Set[int]] = {"server_interfaces": set(), "nfs_server_interfaces": set()}
+        self._watchers = {
+            "servers": Watcher(self._fetch("/servers"), response_obj=Server),
+            "nfs_servers": Watcher(self._fetch("/nfs-servers"), response_obj=NfsServer),
+            "switches": Watcher(self._fetch("/switches"), response_obj=Switch),
+        }
+
+    def _fetch(self, endpoint: str) -> Callable[[], Iterable[dict]]:
+        return lambda: self.client.client.request(endpoint=endpoint, method="get", use_cache=False, paged=True) or []
+
+    def refresh(self, *names: str) -> Dict[str, List[WatchEvent]]:
+        """
+        一覧を取得し直し、変更されたリソースの索引を更新する
+
+        :param names: 更新する一覧。省略した場合は全て
+        :return: 一覧ごとの変更
+        """
+        changes = {}
+        for name in names or self.collections:
+            if name not in self._watchers:
+                raise ValueError(f"unknown collection: {name}")
+            events = self._watchers[name].poll()
+            getattr(self, name).apply(events)
+            changes[name] = events
+        if self.interfaces:
+            errors = self._refresh_interfaces(
+                changes.get("servers", []), "server_interfaces", self.servers, self.client.get_server_interfaces
+            )
+            errors += self._refresh_interfaces(
+                changes.get("nfs_servers", []),
+                "nfs_server_interfaces",
+                self.nfs_servers,
+                self.client.get_nfs_server_interfaces,
+            )
+            if errors:
+                raise errors[0]
+        return changes
+
+    def _refresh_interfaces(
+        self,
+        events: List[WatchEvent],
+        field: str,
+        resources: ResourceIndex,
+        fetch: Callable[[int], Iterable[BaseModel]],
+    ) -> List[BaseException]:
+        interfaces = getattr(self, field)
+        owners = self._owners[field]
+        pending = self._pending[field]
+        ids = [event.id for event in events if event.type != "removed"]
+        # 一覧の変更は反映済みのため、前回取得に失敗したリソースは変更がなくても取得し直す
+        ids += [resource_id for resource_id in sorted(pending) if resource_id in resources and resource_id not in ids]
+        pending.clear()
+        results = run_bulk(lambda resource_id: list(fetch(resource_id)), ids, concurrency=self.concurrency)
+        for event in events:
+            for interface in interfaces.pop(event.id, []):
+                owners.pop(interface.id, None)
+        errors = []
+        for result in results:
+            if not result.ok:
+                pending.add(result.id)
+                errors.append(result.error)
+                continue
+            interfaces[result.id] = result.result
+            for interface in result.result:
+                owners[interface.id] = result.id
+        return errors
+
+    def _require_interfaces(self):
+        if not self.interfaces:
+            raise RuntimeError("interfaces are not loaded. create Inventory with interfaces=True")
+
+    def switches_of_server(self, server_id: int) -> List[Switch]:
+        """
+        サーバーが接続されているスイッチを取得する
+
+        :param server_id: サーバーID
+        :return:
+        """
+        self._require_interfaces()
+        return self._switches_of(self.server_interfaces.get(server_id, []), "server_interface")
+
+    def switches_of_nfs_server(self, nfs_server_id: int) -> List[Switch]:
+        """
+        NFSサーバーが接続されているスイッチを取得する
+
+        :param nfs_server_id: NFSサーバーID
+        :return:
+        """
+        self._require_interfaces()
+        return self._switches_of(self.nfs_server_interfaces.get(nfs_server_id, []), "nfs_server_interface")
+
+    def _switches_of(self, interfaces: list, index: str) -> List[Switch]:
+        switches = {}
+        for interface in interfaces:
+            for switch in self.switches.find(**{index: interface.id}):
+                switches[switch.id] = switch
+        return list(switches.values())
+
+    def servers_on_switch(self, switch_id: int) -> List[Server]:
+        """
+        スイッチに接続されているサーバーを取得する
+
+        :param switch_id: スイッチID
+        :return:
+        """
+        self._require_interfaces()
+        return self._members(switch_id, self.servers, "server_interfaces")
+
+    def nfs_servers_on_switch(self, switch_id: int) -> List[NfsServer]:
+        """
+        スイッチに接続されているNFSサーバーを取得する
+
+        :param switch_id: スイッチID
+        :return:
+        """
+        self._require_interfaces()
+        return self._members(switch_id, self.nfs_servers, "nfs_server_interfaces")
+
+    def _members(self, switch_id: int, resources: ResourceIndex, field: str) -> list:
+        switch = self.switches.get(switch_id)
+        if switch is None:
+            return []
+        owners = self._owners[field]
+        members = {}
+        for interface_id in getattr(switch, field):
+            resource_id = owners.get(interface_id)
+            if resource_id in resources:
+                members[resource_id] = resources.get(resource_id)
+        return list(members.values())
@@ -0,0 +1,21 @@
+"""モデルの基底クラスモジュール
+
+生成したモデルの基底クラスです。
+検証用のスキーマはクラスの定義時ではなく、最初に検証やシリアライズを行う時点で作成します。
+使わないモデルのスキーマを作らないため、インポートが速くなります
+
+"""
+from typing import TypeVar
+
+import pydantic
+from pydantic import ConfigDict
+
+_RootType = TypeVar("_RootType")
+
+
+class BaseModel(pydantic.BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+
+class RootModel(pydantic.RootModel[_RootType]):
+    model_config = ConfigDict(defer_build=True)
@@ -0,0 +1,431 @@
+# generated by vpsc.models.gen_compact:
+#   python -m vpsc.models.gen_compact > vpsc/models/compact.py && black -l 119 vpsc/models/compact.py
+"""コンパクトモデルモジュール
+
+レスポンスを読み取り専用の NamedTuple として保持するモジュールです。
+pydantic のモデルよりメモリの使用量が少なく、変換も高速ですが、値の検証は行いません。
+一覧は tuple になります。 ``to_model`` で pydantic のモデルに、 ``from_model`` でコンパクトな型に変換できます。
+
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Literal, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from . import generated
+
+_new = tuple.__new__
+
+
+class StorageItem(NamedTuple):
+    port: int
+    type: Literal["ssd", "hdd"]
+    size_gibibytes: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> StorageItem:
+        return _new(
+            cls,
+            (
+                data["port"],
+                data["type"],
+                data["size_gibibytes"],
+            ),
+        )
+
+
+class Zone(NamedTuple):
+    code: Literal["tk1", "tk2", "tk3", "os1", "os2", "os3", "is1"]
+    name: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Zone:
+        return _new(
+            cls,
+            (
+                data["code"],
+                data["name"],
+            ),
+        )
+
+
+class Ipv4(NamedTuple):
+    address: str
+    netmask: str
+    gateway: str
+    nameservers: Tuple[str, ...]
+    hostname: str
+    ptr: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Ipv4:
+        return _new(
+            cls,
+            (
+                data["address"],
+                data["netmask"],
+                data["gateway"],
+                tuple(data["nameservers"]),
+                data["hostname"],
+                data["ptr"],
+            ),
+        )
+
+
+class Ipv6(NamedTuple):
+    address: Optional[str]
+    prefixlen: Optional[int]
+    gateway: Optional[str]
+    nameservers: Tuple[str, ...]
+    hostname: Optional[str]
+    ptr: Optional[str]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Ipv6:
+        return _new(
+            cls,
+            (
+                data["address"],
+                data["prefixlen"],
+                data["gateway"],
+                tuple(data["nameservers"]),
+                data["hostname"],
+                data["ptr"],
+            ),
+        )
+
+
+class Contract(NamedTuple):
+    plan_code: int
+    plan_name: str
+    service_code: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Contract:
+        return _new(
+            cls,
+            (
+                data["plan_code"],
+                data["plan_name"],
+                data["service_code"],
+            ),
+        )
+
+
+class Server(NamedTuple):
+    id: int
+    name: str
+    description: str
+    service_type: Literal["linux", "windows"]
+    service_status: Literal["on_trial", "link_down_on_trial", "in_use", "link_down"]
+    cpu_cores: int
+    memory_mebibytes: int
+    storage: Tuple[StorageItem, ...]
+    zone: Zone
+    options: Tuple[str, ...]
+    version: str
+    ipv4: Ipv4
+    ipv6: Ipv6
+    contract: Contract
+    power_status: Literal["power_on", "in_shutdown", "power_off", "installing", "in_scaleup", "migration", "unknown"]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Server:
+        return _new(
+            cls,
+            (
+                data["id"],
+                data["name"],
+                data["description"],
+                data["service_type"],
+                data["service_status"],
+                data["cpu_cores"],
+                data["memory_mebibytes"],
+                tuple(map(StorageItem.from_dict, data["storage"])),
+                Zone.from_dict(data["zone"]),
+                tuple(data["options"]),
+                data["version"],
+                Ipv4.from_dict(data["ipv4"]),
+                Ipv6.from_dict(data["ipv6"]),
+                Contract.from_dict(data["contract"]),
+                data["power_status"],
+            ),
+        )
+
+
+class StorageItem1(NamedTuple):
+    type: Literal["ssd", "hdd"]
+    size_gibibytes: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> StorageItem1:
+        return _new(
+            cls,
+            (
+                data["type"],
+                data["size_gibibytes"],
+            ),
+        )
+
+
+class Ipv41(NamedTuple):
+    address: str
+    netmask: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Ipv41:
+        return _new(
+            cls,
+            (
+                data["address"],
+                data["netmask"],
+            ),
+        )
+
+
+class Contract1(NamedTuple):
+    plan_code: int
+    plan_name: str
+    service_code: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Contract1:
+        return _new(
+            cls,
+            (
+                data["plan_code"],
+                data["plan_name"],
+                data["service_code"],
+            ),
+        )
+
+
+class NfsServer(NamedTuple):
+    id: int
+    name: str
+    description: str
+    service_status: Literal["in_preparation", "on_trial", "link_down_on_trial", "in_use", "link_down"]
+    setting_status: Literal["done", "in_update", "failed"]
+    storage: Tuple[StorageItem1, ...]
+    zone: Zone
+    ipv4: Ipv41
+    contract: Contract1
+    power_status: Literal["power_on", "in_shutdown", "power_off", "unknown"]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> NfsServer:
+        return _new(
+            cls,
+            (
+                data["id"],
+                data["name"],
+                data["description"],
+                data["service_status"],
+                data["setting_status"],
+                tuple(map(StorageItem1.from_dict, data["storage"])),
+                Zone.from_dict(data["zone"]),
+                Ipv41.from_dict(data["ipv4"]),
+                Contract1.from_dict(data["contract"]),
+                data["power_status"],
+            ),
+        )
+
+
+class Service(NamedTuple):
+    service_category: str
+    service_name: str
+    switch_code: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Service:
+        return _new(
+            cls,
+            (
+                data["service_category"],
+                data["service_name"],
+                data["switch_code"],
+            ),
+        )
+
+
+class ExternalConnection(NamedTuple):
+    service_code: str
+    type: Literal["cloud", "sales", "localrouter", "awsdxcon"]
+    services: Tuple[Service, ...]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ExternalConnection:
+        return _new(
+            cls,
+            (
+                data["service_code"],
+                data["type"],
+                tuple(map(Service.from_dict, data["services"])),
+            ),
+        )
+
+
+class Switch(NamedTuple):
+    id: int
+    name: str
+    description: str
+    switch_code: str
+    zone: Zone
+    server_interfaces: Tuple[int, ...]
+    nfs_server_interfaces: Tuple[int, ...]
+    external_connection: Optional[ExternalConnection]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Switch:
+        return _new(
+            cls,
+            (
+                data["id"],
+                data["name"],
+                data["description"],
+                data["switch_code"],
+                Zone.from_dict(data["zone"]),
+                tuple(data["server_interfaces"]),
+                tuple(data["nfs_server_interfaces"]),
+                None
+                if data["external_connection"] is None
+                else ExternalConnection.from_dict(data["external_connection"]),
+            ),
+        )
+
+
+class ApiKey(NamedTuple):
+    id: int
+    name: str
+    role: int
+    token: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ApiKey:
+        return _new(
+            cls,
+            (
+                data["id"],
+                data["name"],
+                data["role"],
+                data["token"],
+            ),
+        )
+
+
+class AllowedResources(NamedTuple):
+    servers: Optional[Tuple[int, ...]] = None
+    switches: Optional[Tuple[int, ...]] = None
+    nfs_servers: Optional[Tuple[int, ...]] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> AllowedResources:
+        return _new(
+            cls,
+            (
+                None if data.get("servers") is None else tuple(data.get("servers")),
+                None if data.get("switches") is None else tuple(data.get("switches")),
+                None if data.get("nfs_servers") is None else tuple(data.get("nfs_servers")),
+            ),
+        )
+
+
+class Role(NamedTuple):
+    id: int
+    name: str
+    description: str
+    permission_filtering: Literal["enabled", "disabled"]
+    allowed_permissions: Tuple[str, ...]
+    resource_filtering: Literal["enabled", "disabled"]
+    allowed_resources: Optional[AllowedResources]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Role:
+        return _new(
+            cls,
+            (
+                data["id"],
+                data["name"],
+                data["description"],
+                data["permission_filtering"],
+                tuple(data["allowed_permissions"]),
+                data["resource_filtering"],
+                None if data["allowed_resources"] is None else AllowedResources.from_dict(data["allowed_resources"]),
+            ),
+        )
+
+
+class Permission(NamedTuple):
+    code: str
+    name: str
+    category: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Permission:
+        return _new(
+            cls,
+            (
+                data["code"],
+                data["name"],
+                data["category"],
+            ),
+        )
+
+
+# コンパクトな型 -> pydantic のモデル
+MODELS: Dict[Type[tuple], Type[BaseModel]] = {
+    StorageItem: generated.StorageItem,
+    Zone: generated.Zone,
+    Ipv4: generated.Ipv4,
+    Ipv6: generated.Ipv6,
+    Contract: generated.Contract,
+    Server: generated.Server,
+    StorageItem1: generated.StorageItem1,
+    Ipv41: generated.Ipv41,
+    Contract1: generated.Contract1,
+    NfsServer: generated.NfsServer,
+    Service: generated.Service,
+    ExternalConnection: generated.ExternalConnection,
+    Switch: generated.Switch,
+    ApiKey: generated.ApiKey,
+    AllowedResources: generated.AllowedResources,
+    Role: generated.Role,
+    Permission: generated.Permission,
+}
+# pydantic のモデル -> コンパクトな型
+COMPACT_TYPES: Dict[Type[BaseModel], Type[tuple]] = {model: compact for compact, model in MODELS.items()}
+
+
+def to_dict(value: Any) -> Any:
+    """
+    コンパクトな型をレスポンスと同じ形式の辞書に変換する
+
+    :param value: コンパクトな型の値
+    :return:
+    """
+    if isinstance(value, tuple):
+        if hasattr(value, "_fields"):
+            return {name: to_dict(item) for name, item in zip(value._fields, value)}
+        return [to_dict(item) for item in value]
+    return value
+
+
+def to_model(value: tuple) -> BaseModel:
+    """
+    コンパクトな型を pydantic のモデルに変換する
+
+    :param value: コンパクトな型の値
+    :return:
+    """
+    return MODELS[type(value)].model_validate(to_dict(value))
+
+
+def from_model(model: BaseModel) -> tuple:
+    """
+    pydantic のモデルをコンパクトな型に変換する
+
+    :param model: pydantic のモデル
+    :return:
+    """
+    return COMPACT_TYPES[type(model)].from_dict(model.model_dump(mode="json"))
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Literal, List, Optional
+from typing import Literal, List, Optional, Union
 
-from pydantic import BaseModel, Field, constr
+from pydantic import Field, constr
+
+from .base import BaseModel
 
 
 class UpdateServer(BaseModel):
@@ -115,3 +117,15 @@ server_sort_query = Literal[
     "ipv6_ptr",
     "-ipv6_ptr",
 ]
+
+# サーバー一覧の絞り込み条件と、レスポンスで対応する項目
+server_filter_fields = {
+    "name": ("name",),
+    "service_code": ("contract", "service_code"),
+    "zone_code": ("zone", "code"),
+    "hostname": ("ipv4", "hostname"),
+    "ipv4_address": ("ipv4", "address"),
+    "ipv6_address": ("ipv6", "address"),
+}
+
+per_page_query = Union[int, Literal["auto"]]
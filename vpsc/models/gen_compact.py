@@ -0,0 +1,197 @@
+"""コンパクトモデルの生成モジュール
+
+``generated.py`` のモデルから、読み取り専用のコンパクトな型 (``compact.py``) を生成するモジュールです。
+``generated.py`` を OpenAPI の定義から生成し直した後に実行してください。
+
+    $ python -m vpsc.models.gen_compact > vpsc/models/compact.py && black -l 119 vpsc/models/compact.py
+
+"""
+import sys
+from inspect import isclass
+from typing import Annotated, Any, Dict, List, Literal, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from . import generated
+
+# コンパクトな型を生成するモデル。入れ子のモデルは自動的に含まれます
+ROOTS = ("Server", "NfsServer", "Switch", "ApiKey", "Role", "Permission")
+
+HEADER = '''# generated by vpsc.models.gen_compact:
+#   python -m vpsc.models.gen_compact > vpsc/models/compact.py && black -l 119 vpsc/models/compact.py
+"""コンパクトモデルモジュール
+
+レスポンスを読み取り専用の NamedTuple として保持するモジュールです。
+pydantic のモデルよりメモリの使用量が少なく、変換も高速ですが、値の検証は行いません。
+一覧は tuple になります。 ``to_model`` で pydantic のモデルに、 ``from_model`` でコンパクトな型に変換できます。
+
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Literal, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from . import generated
+
+_new = tuple.__new__
+'''
+
+FOOTER = '''
+
+# コンパクトな型 -> pydantic のモデル
+MODELS: Dict[Type[tuple], Type[BaseModel]] = {{
+{models}
+}}
+# pydantic のモデル -> コンパクトな型
+COMPACT_TYPES: Dict[Type[BaseModel], Type[tuple]] = {{model: compact for compact, model in MODELS.items()}}
+
+
+def to_dict(value: Any) -> Any:
+    """
+    コンパクトな型をレスポンスと同じ形式の辞書に変換する
+
+    :param value: コンパクトな型の値
+    :return:
+    """
+    if isinstance(value, tuple):
+        if hasattr(value, "_fields"):
+            return {{name: to_dict(item) for name, item in zip(value._fields, value)}}
+        return [to_dict(item) for item in value]
+    return value
+
+
+def to_model(value: tuple) -> BaseModel:
+    """
+    コンパクトな型を pydantic のモデルに変換する
+
+    :param value: コンパクトな型の値
+    :return:
+    """
+    return MODELS[type(value)].model_validate(to_dict(value))
+
+
+def from_model(model: BaseModel) -> tuple:
+    """
+    pydantic のモデルをコンパクトな型に変換する
+
+    :param model: pydantic のモデル
+    :return:
+    """
+    return COMPACT_TYPES[type(model)].from_dict(model.model_dump(mode="json"))
+'''
+
+
+def _is_model(annotation: Any) -> bool:
+    return isclass(annotation) and issubclass(annotation, BaseModel)
+
+
+def _annotation(annotation: Any) -> str:
+    """
+    型ヒントをコンパクトな型の型ヒントの文字列にする
+    """
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _annotation(get_args(annotation)[0])
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        inner = _annotation(args[0]) if len(args) == 1 else f"Union[{', '.join(map(_annotation, args))}]"
+        return f"Optional[{inner}]" if len(args) < len(get_args(annotation)) else inner
+    if origin in (list, List):
+        return f"Tuple[{_annotation(get_args(annotation)[0])}, ...]"
+    if origin is Literal:
+        return f"Literal[{', '.join(map(repr, get_args(annotation)))}]"
+    if annotation is Any:
+        return "Any"
+    return annotation.__name__
+
+
+def _inner(annotation: Any) -> Any:
+    """
+    Optional や Annotated を外した型を返す
+    """
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _inner(get_args(annotation)[0])
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _inner(args[0]) if len(args) == 1 else annotation
+    return annotation
+
+
+def _is_optional(annotation: Any) -> bool:
+    return get_origin(annotation) is Union and type(None) in get_args(annotation)
+
+
+def _expression(annotation: Any, value: str) -> str:
+    """
+    レスポンスの値からコンパクトな型の値を作る式
+    """
+    inner = _inner(annotation)
+    if get_origin(inner) in (list, List):
+        item = _inner(get_args(inner)[0])
+        expression = f"tuple(map({item.__name__}.from_dict, {value}))" if _is_model(item) else f"tuple({value})"
+    elif _is_model(inner):
+        expression = f"{inner.__name__}.from_dict({value})"
+    else:
+        return value
+    if _is_optional(annotation):
+        return f"None if {value} is None else {expression}"
+    return expression
+
+
+def _collect(model: Type[BaseModel], found: Dict[str, Type[BaseModel]]):
+    """
+    入れ子のモデルを依存する順に集める
+    """
+    for field in model.model_fields.values():
+        inner = _inner(field.annotation)
+        if get_origin(inner) in (list, List):
+            inner = _inner(get_args(inner)[0])
+        if _is_model(inner) and inner.__name__ not in found:
+            _collect(inner, found)
+    found[model.__name__] = model
+
+
+def _render(model: Type[BaseModel]) -> str:
+    lines = ["", "", f"class {model.__name__}(NamedTuple):"]
+    arguments = []
+    for name, field in model.model_fields.items():
+        key = field.alias or name
+        if field.is_required():
+            lines.append(f"    {name}: {_annotation(field.annotation)}")
+            value = f'data["{key}"]'
+        else:
+            lines.append(f"    {name}: {_annotation(field.annotation)} = {field.default!r}")
+            value = f'data.get("{key}")' if field.default is None else f'data.get("{key}", {field.default!r})'
+        arguments.append(_expression(field.annotation, value))
+    lines += [
+        "",
+        "    @classmethod",
+        f"    def from_dict(cls, data: dict) -> {model.__name__}:",
+        "        return _new(",
+        "            cls,",
+        "            (",
+        *[f"                {argument}," for argument in arguments],
+        "            ),",
+        "        )",
+    ]
+    return "\n".join(lines)
+
+
+def generate() -> str:
+    """
+    ``compact.py`` のソースを生成する
+
+    :return:
+    """
+    found: Dict[str, Type[BaseModel]] = {}
+    for name in ROOTS:
+        _collect(getattr(generated, name), found)
+    body = "".join(_render(model) for model in found.values())
+    models = "\n".join(f"    {name}: generated.{name}," for name in found)
+    return HEADER + body + FOOTER.format(models=models)
+
+
+if __name__ == "__main__":
+    sys.stdout.write(generate())
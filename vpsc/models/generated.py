@@ -1,12 +1,14 @@
 # generated by datamodel-codegen:
 #   filename:  api-json.json
 #   timestamp: 2025-02-16T03:55:47+00:00
-# datamodel-codegen --input ./api-json.json --input-file-type openapi --output-model-type pydantic_v2.BaseModel --enum-field-as-literal all --reuse-model --strict-nullable --target-python-version 3.8 | sed -E "s/description='([^']+)'/description=\"\"\"\1\"\"\"/; s/\\\n/\n/g" > generated.py
+# datamodel-codegen --input ./api-json.json --input-file-type openapi --output-model-type pydantic_v2.BaseModel --enum-field-as-literal all --reuse-model --strict-nullable --target-python-version 3.8 --base-class vpsc.models.base.BaseModel | sed -E "s/description='([^']+)'/description=\"\"\"\1\"\"\"/; s/\\\n/\n/g; s/^(from pydantic import .*), RootModel/\1/; s/^from vpsc\\.models\\.base import BaseModel$/from .base import BaseModel, RootModel/" > generated.py
 from __future__ import annotations
 
 from typing import List, Literal, Optional, Union
 
-from pydantic import AnyUrl, AwareDatetime, BaseModel, Field, RootModel, conint, constr
+from pydantic import AnyUrl, AwareDatetime, Field, conint, constr
+
+from .base import BaseModel, RootModel
 
 
 class Pagination(BaseModel):
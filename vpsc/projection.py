@@ -0,0 +1,71 @@
+"""射影モジュール
+
+レスポンスのモデルから指定した項目だけを持つモデルを作るモジュールです。
+指定していない項目は検証もモデルの組み立ても行わないため、一覧を扱う際の処理時間とメモリを減らせます。
+
+"""
+from functools import lru_cache
+from inspect import isclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, create_model
+
+from .decode import _union_types
+
+
+def _annotation(annotation: Any, tree: Dict[str, dict], path: str) -> Any:
+    """
+    型ヒントの中のモデルを射影したモデルに置き換える
+    """
+    origin = get_origin(annotation)
+    if origin in _union_types:
+        args = tuple(arg if arg is type(None) else _annotation(arg, tree, path) for arg in get_args(annotation))
+        return Union[args]
+    if origin in (list, List):
+        return List[_annotation(get_args(annotation)[0], tree, path)]
+    if isclass(annotation) and issubclass(annotation, BaseModel):
+        return _build(annotation, tree, f"{path}.")
+    raise ValueError(f"{path} is not a model and has no sub fields")
+
+
+def _build(model: Type[BaseModel], tree: Dict[str, dict], prefix: str = "") -> Type[BaseModel]:
+    for name in tree:
+        if name not in model.model_fields:
+            raise ValueError(f"{model.__name__} has no field {prefix}{name}")
+    definitions = {}
+    # 元のモデルの項目の順序を保つ
+    for name, field in model.model_fields.items():
+        if name not in tree:
+            continue
+        path, children = f"{prefix}{name}", tree[name]
+        annotation = _annotation(field.annotation, children, path) if children else field.annotation
+        definitions[name] = (annotation, field)
+    return create_model(f"{model.__name__}Projection", __module__=model.__module__, **definitions)
+
+
+@lru_cache(maxsize=256)
+def _projected(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    tree: Dict[str, dict] = {}
+    for path in fields:
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return _build(model, tree)
+
+
+def project(model: Type[BaseModel], fields: Optional[Sequence[str]]) -> Type[BaseModel]:
+    """
+    指定した項目だけを持つモデルを作る
+
+    入れ子の項目は ``zone.code`` のようにドットで区切ります。
+    同じモデルと項目の組み合わせでは同じモデルを返します
+
+    :param model: 元のモデル
+    :param fields: 残す項目。None の場合は元のモデルをそのまま返します
+    :return:
+    """
+    if not fields:
+        return model
+    if isinstance(fields, str):
+        fields = [fields]
+    return _projected(model, tuple(sorted(set(fields))))
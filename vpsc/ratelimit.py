@@ -0,0 +1,133 @@
+"""レート制限モジュール
+
+APIへのリクエストをトークンバケットで一定の速度に抑えるモジュールです。
+同一プロセスのスレッド間で共有する ``TokenBucket`` と、
+ファイルロックで同一ホストのプロセス間でも共有できる ``FileTokenBucket`` があります。
+
+"""
+import os
+import threading
+import time
+from time import sleep
+from typing import Callable, Optional, TYPE_CHECKING
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+if TYPE_CHECKING:
+    from .client import APIConfig
+
+
+class RateLimiter:
+    """
+    レート制限の抽象クラス
+    """
+
+    def reserve(self) -> float:
+        """
+        トークンを1つ予約し、送信までに待つ秒数を返す
+
+        :return:
+        """
+        raise NotImplementedError()
+
+    def acquire(self):
+        """
+        送信できるまで待つ
+
+        :return:
+        """
+        delay = self.reserve()
+        if delay > 0:
+            sleep(delay)
+
+    @classmethod
+    def from_config(cls, config: "APIConfig") -> Optional["RateLimiter"]:
+        if config.rate_limit is None:
+            return None
+        if config.rate_limit_file:
+            return FileTokenBucket(config.rate_limit_file, rate=config.rate_limit, burst=config.rate_limit_burst)
+        return TokenBucket(rate=config.rate_limit, burst=config.rate_limit_burst)
+
+
+def _take(tokens: float, updated: float, now: float, rate: float, burst: int):
+    """
+    トークンを補充してから1つ取り出す
+
+    トークンが足りない場合はマイナスにして予約し、補充されるまでの秒数を返します
+    """
+    tokens = min(float(burst), tokens + max(0.0, now - updated) * rate)
+    tokens -= 1
+    delay = -tokens / rate if tokens < 0 else 0.0
+    return tokens, delay
+
+
+class TokenBucket(RateLimiter):
+    """
+    プロセス内で共有するトークンバケット
+
+    :param rate: 1秒あたりのリクエスト数
+    :param burst: 連続して送信できるリクエスト数
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = self.clock()
+            self._tokens, delay = _take(self._tokens, self._updated, now, self.rate, self.burst)
+            self._updated = now
+            return delay
+
+
+class FileTokenBucket(RateLimiter):
+    """
+    ファイルロックでプロセス間に共有するトークンバケット
+
+    バケットの状態は ``path`` のファイルに保存されるため、
+    同じファイルを指定したプロセス同士で同じ制限を共有します
+
+    :param path: 状態を保存するファイル
+    :param rate: 1秒あたりのリクエスト数
+    :param burst: 連続して送信できるリクエスト数
+    """
+
+    def __init__(self, path: str, rate: float, burst: int = 1, clock: Callable[[], float] = time.time):
+        if fcntl is None:
+            raise RuntimeError("FileTokenBucket requires fcntl")
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst must be at least 1")
+        self.path = os.path.expanduser(path)
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                now = self.clock()
+                try:
+                    tokens, updated = (float(value) for value in os.read(fd, 64).split())
+                except ValueError:
+                    tokens, updated = float(self.burst), now
+                tokens, delay = _take(tokens, updated, now, self.rate, self.burst)
+                state = f"{tokens} {now}".encode("ascii")
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, state)
+                return delay
+            finally:
+                os.close(fd)
@@ -0,0 +1,201 @@
+"""リトライモジュール
+
+429(throttled)や503(temporary_unavailable)などの一時的なエラーに対して、
+指数バックオフでリトライを行うためのモジュールです。
+
+"""
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterable, NamedTuple, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import APIConfig
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After ヘッダーを秒数に変換する
+
+    :param value: ヘッダーの値(秒数もしくはHTTP-date)
+    :return:
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryEvent(NamedTuple):
+    """
+    リトライの情報
+    """
+
+    method: str
+    url: str
+    attempt: int
+    delay: float
+    status: Optional[int] = None
+    error: Optional[Exception] = None
+
+
+class RetryStats:
+    """
+    リトライの統計情報
+
+    スレッド間で共有できます
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.give_ups = 0
+        self.wait_seconds = 0.0
+        self.by_status = Counter()
+
+    def record_retry(self, event: RetryEvent):
+        with self._lock:
+            self.retries += 1
+            self.wait_seconds += event.delay
+            self.by_status[event.status if event.status is not None else type(event.error).__name__] += 1
+
+    def record_give_up(self):
+        with self._lock:
+            self.give_ups += 1
+
+    def snapshot(self) -> dict:
+        """
+        現在の統計情報を取得する
+
+        :return:
+        """
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "give_ups": self.give_ups,
+                "wait_seconds": self.wait_seconds,
+                "by_status": dict(self.by_status),
+            }
+
+
+class RetryBudget:
+    """
+    1回の呼び出し(一覧の場合は全ページ)で使えるリトライの予算
+    """
+
+    def __init__(self, seconds: float):
+        self._lock = threading.Lock()
+        self.remaining = seconds
+
+    def consume(self, delay: float) -> bool:
+        with self._lock:
+            if delay > self.remaining:
+                return False
+            self.remaining -= delay
+            return True
+
+
+class RetryPolicy:
+    """
+    リトライの方針
+
+    冪等なメソッドのみリトライします。
+    post/put/delete は ``retry_unsafe`` を指定した場合のみリトライします
+    """
+
+    idempotent_methods = ["get", "head", "options"]
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        budget: float = 60.0,
+        statuses: Iterable[int] = (429, 503),
+        retry_unsafe: bool = False,
+        on_retry: Optional[Callable[[RetryEvent], None]] = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = budget
+        self.statuses = frozenset(statuses)
+        self.retry_unsafe = retry_unsafe
+        self.on_retry = on_retry
+        self.stats = RetryStats()
+
+    @classmethod
+    def from_config(cls, config: "APIConfig") -> "RetryPolicy":
+        return cls(
+            max_retries=config.max_retries,
+            backoff=config.retry_backoff,
+            max_backoff=config.retry_max_backoff,
+            budget=config.retry_budget,
+            statuses=config.retry_statuses,
+            retry_unsafe=config.retry_unsafe,
+        )
+
+    def new_budget(self) -> RetryBudget:
+        return RetryBudget(self.budget)
+
+    def compute_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        待ち時間を計算する
+
+        指数バックオフにフルジッターをかけ、Retry-After がある場合はそれ以上待ちます
+
+        :param attempt: 何回目のリトライか(0始まり)
+        :param retry_after: Retry-After ヘッダーの秒数
+        :return:
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * (2**attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def next_delay(
+        self,
+        method: str,
+        url: str,
+        attempt: int,
+        budget: RetryBudget,
+        status: Optional[int] = None,
+        retry_after: Optional[str] = None,
+        error: Optional[Exception] = None,
+        retry_unsafe: Optional[bool] = None,
+    ) -> Optional[float]:
+        """
+        リトライする場合の待ち時間を返す
+
+        :return: リトライしない場合は None
+        """
+        unsafe = self.retry_unsafe if retry_unsafe is None else retry_unsafe
+        if method.lower() not in self.idempotent_methods and not unsafe:
+            return None
+        if status is not None and status not in self.statuses:
+            return None
+        if attempt >= self.max_retries:
+            self.stats.record_give_up()
+            return None
+
+        delay = self.compute_delay(attempt, parse_retry_after(retry_after))
+        if not budget.consume(delay):
+            self.stats.record_give_up()
+            return None
+
+        event = RetryEvent(method=method, url=url, attempt=attempt + 1, delay=delay, status=status, error=error)
+        self.stats.record_retry(event)
+        if self.on_retry is not None:
+            self.on_retry(event)
+        return delay
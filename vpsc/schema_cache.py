@@ -0,0 +1,157 @@
+"""スキーマキャッシュモジュール
+
+モデルの検証用スキーマをファイルに保存し、次回以降のプロセスで再利用するモジュールです。
+cron やサーバーレス関数のように何度も起動する場合に、起動のたびにスキーマを作り直さずに済みます。
+保存したスキーマは Python と pydantic のバージョン、モデルのソースが一致する場合のみ使います。
+pydantic 2.10 より前のバージョンでは保存も読み込みも行いません。
+
+pickle で保存するため、他のユーザーが書き込めるファイルは指定しないでください
+
+"""
+import atexit
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from typing import Dict, Iterator, Optional, Type
+
+import pydantic
+import pydantic_core
+
+from .models import base, custom, generated
+
+# スキーマを保存するモデルのモジュール
+MODULES = (generated, custom)
+
+# 作成前のモデルに設定したスキーマを使って検証器を作るのは pydantic 2.10 以降の動作
+SUPPORTED = tuple(int(part) for part in pydantic.VERSION.split(".")[:2]) >= (2, 10)
+
+_caches: Dict[str, "SchemaCache"] = {}
+
+
+def _models() -> Iterator[Type[pydantic.BaseModel]]:
+    for module in MODULES:
+        for value in vars(module).values():
+            if (
+                isinstance(value, type)
+                and issubclass(value, pydantic.BaseModel)
+                and value.__module__ == module.__name__
+            ):
+                yield value
+
+
+def _name(model: Type[pydantic.BaseModel]) -> str:
+    return f"{model.__module__}.{model.__qualname__}"
+
+
+def cache_key() -> Optional[str]:
+    """
+    保存したスキーマを使えるかを判定するキー
+
+    Python と pydantic のバージョン、モデルのソースから作ります
+
+    :return: ソースが読めない場合は None
+    """
+    digest = hashlib.sha256(f"{sys.version_info[:2]} {pydantic.VERSION} {pydantic_core.__version__}".encode("utf-8"))
+    for module in (base, *MODULES):
+        try:
+            with open(module.__file__, "rb") as f:
+                digest.update(f.read())
+        except (OSError, TypeError):
+            return None
+    return digest.hexdigest()
+
+
+class SchemaCache:
+    """
+    ファイルに保存するモデルの検証用スキーマ
+
+    :param path: 保存先のファイル
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self.key = cache_key() if SUPPORTED else None
+        # モデル名と pickle したスキーマ
+        self.schemas: Dict[str, bytes] = {}
+
+    def load(self) -> int:
+        """
+        保存したスキーマをまだ作成していないモデルに設定する
+
+        設定したスキーマは最初に検証する時点で使われ、スキーマの作成を省略します
+
+        :return: スキーマを設定したモデルの数
+        """
+        if self.key is None:
+            return 0
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return 0
+        if not isinstance(data, dict) or data.get("key") != self.key:
+            return 0
+        self.schemas = data["schemas"]
+        loaded = 0
+        for model in _models():
+            schema = self.schemas.get(_name(model))
+            if schema is None or model.__pydantic_complete__:
+                continue
+            model.__pydantic_core_schema__ = pickle.loads(schema)
+            loaded += 1
+        return loaded
+
+    def save(self) -> int:
+        """
+        このプロセスで作成したスキーマを追加して保存する
+
+        pickle できないスキーマ(URLの型を含むものなど)は保存しません
+
+        :return: 追加したスキーマの数
+        """
+        if self.key is None:
+            return 0
+        added = 0
+        for model in _models():
+            name = _name(model)
+            if name in self.schemas or not model.__pydantic_complete__:
+                continue
+            try:
+                self.schemas[name] = pickle.dumps(model.__pydantic_core_schema__, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, AttributeError, TypeError):
+                continue
+            added += 1
+        if added:
+            self._write({"key": self.key, "schemas": self.schemas})
+        return added
+
+    def _write(self, data: dict):
+        # 同時に起動したプロセスが読み込み途中のファイルを読まないように、置き換えて保存する
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", prefix=".vpsc_schema")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except OSError:
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def enable(path: str) -> SchemaCache:
+    """
+    保存したスキーマを読み込み、プロセスの終了時に保存する
+
+    同じファイルに対して複数回呼び出した場合は、最初に作ったキャッシュを返します
+
+    :param path: 保存先のファイル
+    :return:
+    """
+    cache = _caches.get(path)
+    if cache is None:
+        cache = _caches[path] = SchemaCache(path)
+        cache.load()
+        atexit.register(cache.save)
+    return cache
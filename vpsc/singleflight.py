@@ -0,0 +1,58 @@
+"""リクエスト集約モジュール
+
+同じリクエストが同時に複数のスレッドから行われた場合に、
+通信を1回にまとめて結果を共有するモジュールです。
+
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    実行中の同じキーの呼び出しを1回にまとめる
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any], share: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        同じキーの呼び出しが実行中であればその結果を待ち、なければ実行する
+
+        :param key: 呼び出しを識別するキー
+        :param func: 実行する関数
+        :param share: 結果を待った呼び出しに渡す前に、結果に適用する関数
+        :return: 関数の結果。先に実行された呼び出しが例外を送出した場合は同じ例外を送出します
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return share(call.result) if share is not None else call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
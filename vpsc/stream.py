@@ -0,0 +1,247 @@
+"""ストリーミングモジュール
+
+一覧のレスポンスを受信しながら ``results`` の要素を1件ずつ読み込むモジュールです。
+ページ全体を読み込んでから変換しないため、メモリの使用量が1ページ分ではなく1件分で済み、
+最初の要素も早く取得できます。
+
+"""
+import codecs
+import json
+import threading
+from collections.abc import Iterator, Sized
+from typing import Any, Callable, Dict, Iterable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .api_request import APIRequest
+    from .decode import Decoder
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONScanner:
+    """
+    文字列のチャンクからJSONの値を1つずつ読み込む
+
+    値の読み込みには標準の json の ``raw_decode`` を使い、値ごとに1回だけC実装で解析します。
+    値の途中でチャンクが途切れた場合は、次のチャンクを読み込んでからその値を解析し直します
+
+    :param chunks: レスポンスのチャンク
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._eof = False
+        self.buf = ""
+        self.pos = 0
+
+    def _more(self) -> bool:
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            text = self._text.decode(chunk)
+            if text:
+                # 読み終わった部分を捨てて、バッファを1件分とチャンク1つ分に保つ
+                self.buf = self.buf[self.pos :] + text
+                self.pos = 0
+                return True
+        self._eof = True
+        text = self._text.decode(b"", final=True)
+        self.buf = self.buf[self.pos :] + text
+        self.pos = 0
+        return bool(text)
+
+    def peek(self) -> str:
+        """
+        空白を読み飛ばして次の文字を返す
+
+        :return:
+        """
+        while True:
+            buf = self.buf
+            while self.pos < len(buf) and buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(buf):
+                return buf[self.pos]
+            if not self._more():
+                raise ValueError("unexpected end of JSON")
+
+    def expect(self, char: str):
+        """
+        次の文字を読み込む。異なる場合は ValueError を送出します
+
+        :param char: 次の文字
+        :return:
+        """
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at {self.buf[self.pos:self.pos + 20]!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """
+        次の値を1つ読み込む
+
+        :return:
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._more():
+                    continue
+                raise
+            if end >= len(self.buf) and self._more():
+                # 数値はチャンクの境目で途切れていても解析できてしまうため、続きを読んでから解析し直す
+                continue
+            self.pos = end
+            return value
+
+
+class StreamingPage:
+    """
+    一覧の1ページを受信しながら読み込む
+
+    ``results`` より前にある ``count`` や ``next`` などの項目は ``open`` の時点で、
+    後ろにある項目は ``results`` を読み終えた時点で ``meta`` に入ります
+
+    :param chunks: レスポンスのチャンク
+    :param key: 要素の配列の項目名
+    """
+
+    def __init__(self, chunks: Iterable[bytes], key: str = "results"):
+        self.scanner = JSONScanner(chunks)
+        self.key = key
+        self.meta: Dict[str, Any] = {}
+        self.paged = False
+        self._opened = False
+
+    def open(self) -> "StreamingPage":
+        """
+        要素の配列の直前まで読み込む
+
+        要素の配列がない場合は全体を読み込み、 ``paged`` は False になります
+
+        :return:
+        """
+        if self._opened:
+            return self
+        self._opened = True
+        self.scanner.expect("{")
+        self.paged = self._read_members(stop_at_key=True)
+        return self
+
+    def _read_members(self, stop_at_key: bool) -> bool:
+        scanner = self.scanner
+        while True:
+            char = scanner.peek()
+            if char == "}":
+                scanner.pos += 1
+                return False
+            if char == ",":
+                scanner.pos += 1
+                continue
+            name = scanner.value()
+            if not isinstance(name, str):
+                raise ValueError(f"expected a key, got {name!r}")
+            scanner.expect(":")
+            if stop_at_key and name == self.key:
+                return True
+            self.meta[name] = scanner.value()
+
+    def results(self) -> Iterator:
+        """
+        要素を1件ずつ読み込む
+
+        :return:
+        """
+        self.open()
+        if not self.paged:
+            return
+        scanner = self.scanner
+        if scanner.peek() == "n":
+            # results が null の場合
+            scanner.value()
+        else:
+            scanner.expect("[")
+            while True:
+                char = scanner.peek()
+                if char == "]":
+                    scanner.pos += 1
+                    break
+                if char == ",":
+                    scanner.pos += 1
+                    continue
+                yield scanner.value()
+        self._read_members(stop_at_key=False)
+
+
+class StreamingResult(Iterator, Sized):
+    """
+    一覧取得の結果をストリーミングで読み込む
+
+    ページを受信しながら要素を1件ずつ返します。位置を指定した取得や並列取得には対応しません。
+    レスポンスの ``count`` が ``results`` より後ろにある場合、 ``len()`` は1ページ目の要素を読み終えるまで使えません
+
+    :param request: リクエスト
+    :param page: 1ページ目
+    :param response: 1ページ目のレスポンス
+    :param decoder: 要素をモデルに変換する Decoder
+    :param limit: 取得する最大件数
+    :param where: 要素を返すか判定する関数
+    """
+
+    def __init__(
+        self,
+        request: "APIRequest",
+        page: StreamingPage,
+        response,
+        decoder: "Decoder",
+        limit: Optional[int] = None,
+        where: Optional[Callable[[dict], bool]] = None,
+        **request_args,
+    ):
+        self.request = request
+        self.decoder = decoder
+        self.limit = limit
+        self.where = where
+        # count が results より後ろにある場合は、1ページ目の要素を読み終えた時点で入る
+        self._meta = page.meta
+        request_args.pop("params", None)
+        self.generator = self.__generator(page, response, **request_args)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        if self.where is not None:
+            raise TypeError("len() is not supported with filters")
+        count = self._meta.get("count")
+        if count is None:
+            raise TypeError("len() is not available until the count is received")
+        return count if self.limit is None else min(count, self.limit)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._lock:
+            return next(self.generator)
+
+    def __generator(self, page: StreamingPage, response, **request_args):
+        remaining = self.limit
+        while True:
+            try:
+                for item in page.results():
+                    if self.where is not None and not self.where(item):
+                        continue
+                    yield self.decoder(item)
+                    if remaining is not None:
+                        remaining -= 1
+                        if remaining <= 0:
+                            return
+            finally:
+                response.close()
+            next_url = page.meta.get("next")
+            if not next_url:
+                return
+            page, response = self.request._stream(**dict(request_args, url=next_url))
@@ -0,0 +1,119 @@
+"""トランスポートモジュール
+
+APIへのHTTP通信を担当するモジュールです。
+セッションを使い回すことで、接続(TCP/TLS)をリクエスト間で再利用します。
+
+"""
+from typing import Optional, Tuple, TYPE_CHECKING
+
+import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from .client import APIConfig
+
+
+class Transport:
+    """
+    HTTP通信の抽象クラス
+
+    独自の通信処理を利用したい場合はこのクラスを継承して ``APIRequest`` に渡してください
+    """
+
+    # リトライの対象とする通信エラー
+    retryable_exceptions = ()
+
+    def request(self, **req_data) -> requests.Response:
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    タイムアウトの既定値を持つアダプター
+    """
+
+    def __init__(self, timeout: Optional[Tuple[float, float]] = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class RequestsTransport(Transport):
+    """
+    requests.Session を利用したトランスポート
+
+    コネクションプールを持ち、keep-aliveで接続を再利用します
+    """
+
+    retryable_exceptions = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, config: "APIConfig"):
+        self.config = config
+        self.session = requests.Session()
+        adapter = TimeoutHTTPAdapter(
+            timeout=(config.connect_timeout, config.read_timeout),
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_size,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if not config.keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def request(self, **req_data) -> requests.Response:
+        return self.session.request(**req_data)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncTransport:
+    """
+    非同期HTTP通信の抽象クラス
+
+    独自の通信処理を利用したい場合はこのクラスを継承して ``AsyncAPIRequest`` に渡してください
+    """
+
+    retryable_exceptions = ()
+
+    async def request(self, **req_data):
+        raise NotImplementedError()
+
+    async def close(self):
+        pass
+
+
+class HttpxAsyncTransport(AsyncTransport):
+    """
+    httpx.AsyncClient を利用した非同期トランスポート
+
+    利用には ``pip install vpsc[async]`` で httpx をインストールしてください
+    """
+
+    def __init__(self, config: "APIConfig"):
+        import httpx
+
+        self.config = config
+        self.retryable_exceptions = (httpx.TransportError,)
+        limits = httpx.Limits(
+            max_connections=config.pool_size,
+            max_keepalive_connections=config.pool_size if config.keep_alive else 0,
+        )
+        timeout = httpx.Timeout(config.read_timeout, connect=config.connect_timeout)
+        self.session = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+    async def request(self, **req_data):
+        # requestsとの互換のため、bytesのボディは content として渡す
+        if "data" in req_data:
+            req_data["content"] = req_data.pop("data")
+        return await self.session.request(**req_data)
+
+    async def close(self):
+        await self.session.aclose()
@@ -0,0 +1,45 @@
+"""待機モジュール
+
+状態が目的の値になるまで、間隔を徐々に広げながらポーリングするモジュールです。
+
+"""
+import time
+from time import sleep
+from typing import Callable, TypeVar
+
+from .exceptions import WaitTimeout
+
+T = TypeVar("T")
+
+
+def wait_until(
+    fetch: Callable[[], T],
+    done: Callable[[T], bool],
+    timeout: float = 300.0,
+    interval: float = 1.0,
+    max_interval: float = 15.0,
+    factor: float = 1.5,
+) -> T:
+    """
+    条件を満たすまでポーリングする
+
+    最初は ``interval`` 秒間隔で確認し、確認するたびに ``factor`` 倍して ``max_interval`` まで広げます
+
+    :param fetch: 状態を取得する関数
+    :param done: 状態が目的の値になったか判定する関数
+    :param timeout: タイムアウト(秒)
+    :param interval: 最初の確認間隔(秒)
+    :param max_interval: 確認間隔の上限(秒)
+    :param factor: 確認間隔を広げる倍率
+    :return: 条件を満たした状態
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        value = fetch()
+        if done(value):
+            return value
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise WaitTimeout(timeout, value)
+        sleep(min(interval, remaining))
+        interval = min(interval * factor, max_interval)
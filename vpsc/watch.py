@@ -0,0 +1,128 @@
+"""変更監視モジュール
+
+一覧を一定間隔で取得して前回の一覧と比較し、追加・削除・変更されたリソースだけを返すモジュールです。
+リソースごとにフィンガープリントを保持し、変更のないリソースはモデルの検証を省略します。
+
+"""
+import hashlib
+import json
+from time import sleep
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Literal, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+
+class WatchEvent(NamedTuple):
+    """
+    リソースの変更
+
+    type が ``removed`` の場合、resource は最後に取得した状態です。
+    changes は ``changed`` の場合のみ、変更された項目ごとの (変更前, 変更後) を持ちます。
+    入れ子の項目は ``ipv4.ptr`` のようにドットで区切ります
+    """
+
+    type: Literal["added", "removed", "changed"]
+    id: Any
+    resource: BaseModel
+    changes: Dict[str, Tuple[Any, Any]] = {}
+
+
+class _Entry(NamedTuple):
+    fingerprint: bytes
+    raw: dict
+    resource: BaseModel
+
+
+def fingerprint(item: dict) -> bytes:
+    """
+    リソースのフィンガープリントを計算する
+
+    :param item: APIのレスポンスの辞書
+    :return:
+    """
+    canonical = json.dumps(item, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
+def diff(old: dict, new: dict, prefix: str = "") -> Dict[str, Tuple[Any, Any]]:
+    """
+    変更された項目を取り出す
+
+    :param old: 変更前の辞書
+    :param new: 変更後の辞書
+    :param prefix: 項目名の接頭辞
+    :return: 項目ごとの (変更前, 変更後)
+    """
+    changes = {}
+    for key in [*new, *(key for key in old if key not in new)]:
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(before, dict) and isinstance(after, dict):
+            changes.update(diff(before, after, prefix=f"{name}."))
+        else:
+            changes[name] = (before, after)
+    return changes
+
+
+class Watcher:
+    """
+    一覧の変更を監視する
+
+    :param fetch: 一覧を辞書のまま取得する関数
+    :param response_obj: リソースのモデル
+    :param key: リソースを識別する項目
+    """
+
+    def __init__(self, fetch: Callable[[], Iterable[dict]], response_obj: Type[BaseModel], key: str = "id"):
+        self.fetch = fetch
+        self.response_obj = response_obj
+        self.key = key
+        self._snapshot: Optional[Dict[Any, _Entry]] = None
+
+    def poll(self) -> List[WatchEvent]:
+        """
+        一覧を1回取得し、前回からの変更を返す
+
+        初回は全てのリソースを追加として返します
+
+        :return:
+        """
+        previous = self._snapshot or {}
+        snapshot = {}
+        events = []
+        for item in self.fetch():
+            resource_id = item[self.key]
+            digest = fingerprint(item)
+            entry = previous.get(resource_id)
+            if entry is not None and entry.fingerprint == digest:
+                # 変更がないリソースは前回のモデルをそのまま使う
+                snapshot[resource_id] = entry
+                continue
+            resource = self.response_obj(**item)
+            snapshot[resource_id] = _Entry(digest, item, resource)
+            if entry is None:
+                events.append(WatchEvent("added", resource_id, resource))
+            else:
+                events.append(WatchEvent("changed", resource_id, resource, diff(entry.raw, item)))
+        for resource_id, entry in previous.items():
+            if resource_id not in snapshot:
+                events.append(WatchEvent("removed", resource_id, entry.resource))
+        self._snapshot = snapshot
+        return events
+
+    def watch(self, interval: float = 5.0, initial: bool = True) -> Iterator[WatchEvent]:
+        """
+        一定間隔で一覧を取得し、変更を返し続ける
+
+        :param interval: 取得間隔(秒)
+        :param initial: 初回の一覧を追加として返すか
+        :return:
+        """
+        events = self.poll()
+        if initial:
+            yield from events
+        while True:
+            sleep(interval)
+            yield from self.poll()